@@ -10,10 +10,13 @@ from Backend import __version__, db
 from Backend.fastapi import server
 from Backend.fastapi.main import app
 from Backend.helper import subscription_task_manager
+from Backend.helper.ingest_pool import ingest_pool
 from Backend.helper.link_checker import DeadLinkChecker
+from Backend.helper.loop_monitor import loop_monitor
+from Backend.helper.metadata import parse_pool
 from Backend.helper.pinger import ping
 from Backend.helper.pyro import restart_notification, setup_bot_commands
-from Backend.helper.scan_manager import dbcheck_manager, duplicate_manager, scan_manager
+from Backend.helper.scan_manager import channel_sync_manager, dbcheck_manager, duplicate_manager, scan_manager
 from Backend.helper.session_auth import get_active_session_string
 from Backend.helper.settings_manager import SettingsManager
 from Backend.logger import LOGGER
@@ -28,21 +31,31 @@ loop = asyncio.get_event_loop()
 async def start_services():
     try:
         LOGGER.info(f"Initializing Telegram-Stremio v-{__version__}")
+        #----- Fork the parse workers while the process is still small and single-threaded
+        await parse_pool.start()
+        loop_monitor.start()
         await asyncio.sleep(1.2)
 
+        #----- Settings first, so connect() sizes every pool from them and never swaps at boot
+        await db.open_settings_store()
+        await SettingsManager.initialize(db)
+        loop_monitor.set_callback_timing(SettingsManager.current().loop_callback_timing)
         await db.connect()
         await asyncio.sleep(1.2)
 
-        await SettingsManager.initialize(db)
+        ingest_pool.start(SettingsManager.current().ingest_workers)
         app.add_middleware(SessionMiddleware, secret_key=SettingsManager.current().session_secret or secrets.token_hex(32))
         await asyncio.sleep(0.5)
 
         await scan_manager.load(db)
         dbcheck_manager.bind_db(db)
         duplicate_manager.bind_db(db)
+        channel_sync_manager.bind_db(db)
         await asyncio.sleep(0.3)
 
         await db.reload_extra_databases(SettingsManager.current().extra_databases)
+        if SettingsManager.current().episode_collection and not db.episode_store_ready:
+            db.start_episode_store_migration()
         await asyncio.sleep(0.5)
 
         await StreamBot.start()
@@ -78,6 +91,8 @@ async def start_services():
 
         link_checker_task = DeadLinkChecker(db, app, check_interval_hours=24)
         loop.create_task(link_checker_task.start())
+        db.start_counter_reconciler()
+        channel_sync_manager.schedule(StreamBot)
 
         await subscription_task_manager.sync(StreamBot)
 
@@ -92,6 +107,11 @@ async def stop_services():
     try:
         LOGGER.info("Stopping services...")
 
+        #----- Let queued ingest jobs finish before the tasks are torn down
+        await ingest_pool.drain()
+        parse_pool.shutdown()
+        loop_monitor.stop()
+
         pending_tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
         for task in pending_tasks:
             task.cancel()
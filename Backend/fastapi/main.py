@@ -17,6 +17,7 @@ from Backend.fastapi.routes.api_routes import (
     cancel_dbcheck_api,
     cancel_duplicate_check_api,
     cancel_scan_api,
+    channel_sync_status_api,
     clear_cache_api,
     clear_stream_analytics_api,
     create_custom_catalog_api,
@@ -38,9 +39,16 @@ from Backend.fastapi.routes.api_routes import (
     delete_tv_episode_api,
     delete_tv_quality_api,
     delete_tv_season_api,
+    discard_ingest_dead_letters_api,
     download_logs_api,
+    episode_store_status_api,
     get_admin_stats_api,
+    get_db_pool_metrics_api,
     get_db_stats_api,
+    get_ingest_dead_letters_api,
+    get_ingest_stats_api,
+    get_loop_stats_api,
+    reset_loop_stats_api,
     get_all_subscribers_api,
     get_all_tokens_api,
     get_auto_catalog_settings_api,
@@ -62,6 +70,7 @@ from Backend.fastapi.routes.api_routes import (
     request_search_api,
     request_submit_api,
     get_stream_analytics_api,
+    get_stream_series_api,
     get_subscription_plans_api,
     get_settings_api,
     get_logs_api,
@@ -82,12 +91,16 @@ from Backend.fastapi.routes.api_routes import (
     list_media_api,
     manage_subscriber_api,
     manual_add_media_api,
+    migrate_episode_store_api,
     list_manual_add_catalogs_api,
     resolve_manual_metadata_api,
     purge_dead_links_api,
     purge_duplicates_api,
+    reconcile_library_counters_api,
+    rebuild_stream_index_api,
     remove_custom_catalog_item_api,
     resolve_telegram_api,
+    retry_ingest_dead_letters_api,
     resolve_subtitle_api,
     list_subtitle_languages_api,
     list_subtitles_api,
@@ -102,8 +115,10 @@ from Backend.fastapi.routes.api_routes import (
     speed_test_api,
     speed_test_stream_api,
     start_dbcheck_api,
+    start_channel_sync_api,
     start_duplicate_check_api,
     start_scan_api,
+    stream_index_status_api,
     update_auto_catalog_settings_api,
     update_custom_catalog_api,
     update_media_api,
@@ -308,13 +323,21 @@ async def clear_cache(_: bool = Depends(require_auth)):
     return await clear_cache_api()
 
 @app.get("/api/admin/dead-links")
-async def get_dead_links(_: bool = Depends(require_auth)):
-    return await get_dead_links_api()
+async def get_dead_links(page: int = 1, per_page: int = 0, _: bool = Depends(require_auth)):
+    return await get_dead_links_api(page, per_page)
 
 @app.get("/api/admin/stream-analytics")
 async def get_stream_analytics(_: bool = Depends(require_auth)):
     return await get_stream_analytics_api()
 
+@app.get("/api/admin/stream-analytics/series")
+async def get_stream_series(
+    grain: str = "hour", span: int = 24,
+    client_index: int | None = None, dc_id: int | None = None, token: str | None = None,
+    _: bool = Depends(require_auth),
+):
+    return await get_stream_series_api(grain, span, client_index, dc_id, token)
+
 @app.get("/api/admin/user-activity")
 async def get_user_activity(page: int = 1, per_page: int = 12, _: bool = Depends(require_auth)):
     return await get_user_activity_api(page, per_page)
@@ -660,6 +683,34 @@ async def session_remove(_: bool = Depends(require_auth)):
 async def admin_db_stats(_: bool = Depends(require_auth)):
     return await get_db_stats_api()
 
+@app.get("/api/admin/db/pools")
+async def admin_db_pools(_: bool = Depends(require_auth)):
+    return await get_db_pool_metrics_api()
+
+@app.get("/api/admin/ingest")
+async def admin_ingest_stats(_: bool = Depends(require_auth)):
+    return await get_ingest_stats_api()
+
+@app.get("/api/admin/loop")
+async def admin_loop_stats(top: int = Query(20, ge=1, le=200), _: bool = Depends(require_auth)):
+    return await get_loop_stats_api(top)
+
+@app.post("/api/admin/loop/reset")
+async def admin_loop_reset(_: bool = Depends(require_auth)):
+    return await reset_loop_stats_api()
+
+@app.get("/api/admin/ingest/dead-letters")
+async def admin_ingest_dead_letters(page: int = 1, per_page: int = 50, _: bool = Depends(require_auth)):
+    return await get_ingest_dead_letters_api(page, per_page)
+
+@app.post("/api/admin/ingest/dead-letters/retry")
+async def admin_ingest_dead_letters_retry(payload: dict | None = None, _: bool = Depends(require_auth)):
+    return await retry_ingest_dead_letters_api(payload)
+
+@app.post("/api/admin/ingest/dead-letters/discard")
+async def admin_ingest_dead_letters_discard(payload: dict | None = None, _: bool = Depends(require_auth)):
+    return await discard_ingest_dead_letters_api(payload)
+
 @app.get("/api/admin/health")
 async def admin_health(_: bool = Depends(require_auth)):
     return await health_api()
@@ -747,6 +798,14 @@ async def tools_scan_cancel(_: bool = Depends(require_auth)):
 async def tools_scan_status(_: bool = Depends(require_auth)):
     return await scan_status_api()
 
+@app.post("/api/admin/tools/sync/start")
+async def tools_sync_start(payload: dict | None = None, _: bool = Depends(require_auth)):
+    return await start_channel_sync_api(payload)
+
+@app.get("/api/admin/tools/sync/status")
+async def tools_sync_status(_: bool = Depends(require_auth)):
+    return await channel_sync_status_api()
+
 @app.post("/api/admin/tools/dbcheck/start")
 async def tools_dbcheck_start(_: bool = Depends(require_auth)):
     return await start_dbcheck_api()
@@ -763,6 +822,26 @@ async def tools_dbcheck_status(_: bool = Depends(require_auth)):
 async def tools_purge_dead_links(payload: dict | None = None, _: bool = Depends(require_auth)):
     return await purge_dead_links_api(payload)
 
+@app.post("/api/admin/tools/stream-index/rebuild")
+async def tools_stream_index_rebuild(_: bool = Depends(require_auth)):
+    return await rebuild_stream_index_api()
+
+@app.get("/api/admin/tools/stream-index/status")
+async def tools_stream_index_status(_: bool = Depends(require_auth)):
+    return await stream_index_status_api()
+
+@app.post("/api/admin/tools/library-counters/reconcile")
+async def tools_library_counters_reconcile(_: bool = Depends(require_auth)):
+    return await reconcile_library_counters_api()
+
+@app.post("/api/admin/tools/episode-store/migrate")
+async def tools_episode_store_migrate(_: bool = Depends(require_auth)):
+    return await migrate_episode_store_api()
+
+@app.get("/api/admin/tools/episode-store/status")
+async def tools_episode_store_status(_: bool = Depends(require_auth)):
+    return await episode_store_status_api()
+
 @app.post("/api/admin/tools/duplicates/start")
 async def tools_duplicates_start(_: bool = Depends(require_auth)):
     return await start_duplicate_check_api()
@@ -772,8 +851,8 @@ async def tools_duplicates_cancel(_: bool = Depends(require_auth)):
     return await cancel_duplicate_check_api()
 
 @app.get("/api/admin/tools/duplicates/status")
-async def tools_duplicates_status(_: bool = Depends(require_auth)):
-    return await duplicate_check_status_api()
+async def tools_duplicates_status(page: int = 1, per_page: int = 50, _: bool = Depends(require_auth)):
+    return await duplicate_check_status_api(page, per_page)
 
 @app.post("/api/admin/tools/duplicates/purge")
 async def tools_duplicates_purge(payload: dict | None = None, _: bool = Depends(require_auth)):
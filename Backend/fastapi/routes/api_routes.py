@@ -28,8 +28,10 @@ from Backend.helper.auto_catalog import (
 )
 from Backend.helper.backup import export_config, import_config
 from Backend.helper.custom_dl import ByteStreamer, _speed_test_single_client, run_speed_test
-from Backend.helper.encrypt import decode_string, encode_string
+from Backend.helper.encrypt import decode_cache_stats, decode_string, encode_string
 from Backend.helper.health import run_health_checks
+from Backend.helper.ingest_pool import ingest_pool
+from Backend.helper.loop_monitor import loop_monitor
 from Backend.helper.manual_add import resolve_telegram_message, stamp_caption_by_ref
 from Backend.helper.requests_manager import (
     delete_request,
@@ -44,6 +46,8 @@ from Backend.helper.metadata import (
     fetch_selected_movie_metadata,
     fetch_selected_tv_metadata,
     gradient_cover_path,
+    metadata_batcher,
+    parse_pool,
     resolve_cover_url,
     search_any_candidates,
     search_movie_candidates,
@@ -51,7 +55,7 @@ from Backend.helper.metadata import (
 )
 from Backend.helper.passwords import hash_password, verify_password
 from Backend.helper.pyro import get_readable_file_size, get_readable_time
-from Backend.helper.scan_manager import dbcheck_manager, duplicate_manager, scan_manager
+from Backend.helper.scan_manager import channel_sync_manager, dbcheck_manager, duplicate_manager, scan_manager
 from Backend.helper.session_auth import (
     disconnect_session,
     get_session_status,
@@ -157,18 +161,13 @@ async def list_media_api(
         #----- Custom (manually added) titles carry a negative synthetic tmdb_id
         extra_filter = {"tmdb_id": {"$lt": 0}} if custom else None
         if search:
-            result = await db.search_documents(search, page, page_size)
-            filtered_results = [
-                item for item in result['results']
-                if item.get('media_type') == media_type and (not custom or int(item.get('tmdb_id') or 0) < 0)
-            ]
-            total_filtered = len(filtered_results)
-            start_index = (page - 1) * page_size
+            result = await db.search_documents(search, page, page_size, extra_filter=extra_filter, media_type=media_type)
+            total_count = result.get("total_count", 0)
             resp = {
-                "total_count": total_filtered,
+                "total_count": total_count,
                 "current_page": page,
-                "total_pages": (total_filtered + page_size - 1) // page_size,
-                key: filtered_results[start_index:start_index + page_size],
+                "total_pages": (total_count + page_size - 1) // page_size,
+                key: result.get("results", []),
             }
         elif media_type == "movie":
             resp = await db.sort_movies([], page, page_size, extra_filter=extra_filter)
@@ -571,6 +570,7 @@ async def get_admin_stats_api() -> dict:
 
     return {
         "cache_size": cache_size,
+        "stream_id_cache": decode_cache_stats(),
         "total_bots": len(multi_clients),
         "bot_workloads": bot_stats
     }
@@ -586,9 +586,12 @@ async def clear_cache_api() -> dict:
     return {"status": "success", "message": f"{total_cleared} cached items cleared."}
 
 
-#----- List dead links recorded in the DB
-async def get_dead_links_api() -> dict:
+#----- List dead links recorded in the DB (one page when per_page is given, else all of them)
+async def get_dead_links_api(page: int = 1, per_page: int = 0) -> dict:
     try:
+        if per_page:
+            result = await db.get_dead_links_page(page, per_page)
+            return {"status": "success", "data": result.pop("items"), **result}
         dead_links = await db.get_all_dead_links()
         return {"status": "success", "data": dead_links}
     except Exception as e:
@@ -605,15 +608,27 @@ async def get_stream_analytics_api() -> dict:
         return {"status": "error", "message": str(e)}
 
 
+#----- Bucketed stream series (minute / hour / day rollups)
+async def get_stream_series_api(
+    grain: str = "hour", span: int = 24,
+    client_index: int | None = None, dc_id: int | None = None, token: str | None = None,
+) -> dict:
+    try:
+        data = await db.get_stream_series(grain, min(max(1, span), 1440), client_index, dc_id, token)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "success", "data": data}
+
+
 #----- Purge all stream analytics records
 async def clear_stream_analytics_api() -> dict:
     try:
-        result = await db.dbs["tracking"]["stream_analytics"].delete_many({})
-        LOGGER.info(f"Admin cleared stream analytics ({result.deleted_count} records deleted).")
+        deleted = await db.clear_stream_analytics()
+        LOGGER.info(f"Admin cleared stream analytics ({deleted} records deleted).")
 
         return {
             "status": "success",
-            "message": f"{result.deleted_count} analytics records cleared."
+            "message": f"{deleted} analytics records cleared."
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -1526,8 +1541,8 @@ async def search_catalog_media_api(
         return {"results": [], "total_count": 0}
 
     try:
-        result = await db.search_documents(query, page, page_size)
         normalized_type = _normalize_media_type(media_type)
+        result = await db.search_documents(query, page, page_size, media_type=normalized_type)
         filtered = [item for item in result.get("results", []) if item.get("media_type") == normalized_type]
         return {"results": filtered, "total_count": len(filtered)}
     except Exception as e:
@@ -1729,6 +1744,8 @@ async def get_settings_api() -> dict:
     data["admin_password"] = ""
     data["session_secret_set"] = bool(data.get("session_secret"))
     data["session_secret"] = ""
+    data["stream_id_key"] = ""
+    data.pop("stream_id_previous_keys", None)
 
     try:
         data["database_list"] = db.get_database_list()
@@ -1763,9 +1780,12 @@ async def update_settings_api(payload: dict) -> dict:
         del payload["admin_password"]
     if "session_secret" in payload and not str(payload["session_secret"]).strip():
         del payload["session_secret"]
+    #----- The stream id key only changes through a backup restore; replaced keys are server-managed
+    payload.pop("stream_id_key", None)
+    payload.pop("stream_id_previous_keys", None)
 
     #----- Type coercion and validation
-    bool_keys = {"replace_mode", "duplicate_protection", "hide_catalog", "subscription", "show_proxy_and_non_proxy_both", "mediaflow_proxy", "announce_new_content", "delete_on_metadata_fail", "better_poster_enabled", "rpdb_enabled", "fanart_enabled", "fanart_shuffle", "fanart_low_res_poster"}
+    bool_keys = {"replace_mode", "duplicate_protection", "hide_catalog", "subscription", "show_proxy_and_non_proxy_both", "mediaflow_proxy", "announce_new_content", "delete_on_metadata_fail", "better_poster_enabled", "rpdb_enabled", "fanart_enabled", "fanart_shuffle", "fanart_low_res_poster", "episode_collection", "db_retry_writes", "storage_secondary_reads", "signed_stream_ids", "require_signed_stream_ids", "loop_callback_timing"}
     for key in bool_keys:
         if key in payload:
             payload[key] = bool(payload[key])
@@ -1794,6 +1814,48 @@ async def update_settings_api(payload: dict) -> dict:
         except (ValueError, TypeError):
             payload["fanart_shuffle_interval"] = 5
 
+    if "channel_sync_interval" in payload:
+        try:
+            payload["channel_sync_interval"] = max(0, min(1440, int(payload["channel_sync_interval"])))
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="'channel_sync_interval' must be a whole number.")
+
+    if "storage_quota_mb" in payload:
+        try:
+            payload["storage_quota_mb"] = max(1, int(payload["storage_quota_mb"]))
+        except (ValueError, TypeError):
+            payload["storage_quota_mb"] = 512
+
+    if "ingest_workers" in payload:
+        try:
+            payload["ingest_workers"] = max(1, min(32, int(payload["ingest_workers"])))
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="'ingest_workers' must be a whole number.")
+
+    pool_int_keys = {
+        "tracking_max_pool_size": 1, "tracking_min_pool_size": 0,
+        "storage_max_pool_size": 1, "storage_min_pool_size": 0,
+        "db_wait_queue_timeout_ms": 0,
+    }
+    for key, low in pool_int_keys.items():
+        if key in payload:
+            try:
+                payload[key] = max(low, int(payload[key]))
+            except (ValueError, TypeError):
+                raise HTTPException(status_code=400, detail=f"'{key}' must be a whole number.")
+    for role in ("tracking", "storage"):
+        low = payload.get(f"{role}_min_pool_size")
+        high = payload.get(f"{role}_max_pool_size")
+        if low is not None and high is not None and low > high:
+            raise HTTPException(status_code=400, detail=f"{role.title()} min pool size can't exceed its max pool size.")
+
+    if "db_compressors" in payload:
+        names = [n.strip().lower() for n in str(payload["db_compressors"] or "").split(",") if n.strip()]
+        unknown = [n for n in names if n not in ("zstd", "snappy", "zlib")]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown compressor(s): {', '.join(unknown)}")
+        payload["db_compressors"] = ",".join(names)
+
     if len([k for k in ("better_poster_enabled", "rpdb_enabled", "fanart_enabled") if payload.get(k)]) > 1:
         raise HTTPException(status_code=400, detail="Enable only one poster provider at a time")
 
@@ -2238,6 +2300,24 @@ async def scan_status_api() -> dict:
     return {"status": "success", "data": scan_manager.get_status()}
 
 
+#----- Incremental sync: replay new/edited/deleted messages since each channel's last sync
+async def start_channel_sync_api(payload: dict | None = None) -> dict:
+    client = _scan_client()
+    if client is None:
+        raise HTTPException(status_code=503, detail="No Telegram client is connected yet.")
+    channels = (payload or {}).get("channels") or []
+    if not isinstance(channels, list):
+        raise HTTPException(status_code=400, detail="'channels' must be a list.")
+    result = await channel_sync_manager.start(client, channels)
+    if not result.get("ok"):
+        raise HTTPException(status_code=409, detail=result.get("message", "Could not start channel sync."))
+    return {"status": "success", **result}
+
+
+async def channel_sync_status_api() -> dict:
+    return {"status": "success", "data": channel_sync_manager.get_status()}
+
+
 async def start_dbcheck_api() -> dict:
     client = _scan_client()
     if client is None:
@@ -2257,6 +2337,92 @@ async def dbcheck_status_api() -> dict:
     return {"status": "success", "data": dbcheck_manager.get_status()}
 
 
+#----- ── Stream-id index (tracking.stream_index) ──
+async def rebuild_stream_index_api() -> dict:
+    if not db.start_stream_index_rebuild():
+        raise HTTPException(status_code=409, detail="A stream index rebuild is already running.")
+    return {"status": "success", "message": "Stream index rebuild started."}
+
+
+async def stream_index_status_api() -> dict:
+    return {"status": "success", "data": await db.get_stream_index_status()}
+
+
+#----- Recount library counters from the documents (runs on a schedule too)
+async def reconcile_library_counters_api() -> dict:
+    result = await db.reconcile_library_counters()
+    if not result.get("ok"):
+        raise HTTPException(status_code=409, detail=result.get("message", "Could not recount."))
+    return {"status": "success", **result}
+
+
+#----- Connection pool metrics per database role (tracking / storage)
+async def get_db_pool_metrics_api() -> dict:
+    return {"status": "success", "data": db.get_pool_metrics()}
+
+
+#----- Ingest worker pool: queue depth, in-flight jobs, per-shard progress, metadata batching and parse workers
+async def get_ingest_stats_api() -> dict:
+    return {
+        "status": "success",
+        "data": {
+            **ingest_pool.stats(),
+            "metadata_batches": metadata_batcher.stats(),
+            "parse_pool": parse_pool.stats(),
+        },
+    }
+
+
+#----- Event-loop lag histogram and the callbacks that blocked the loop longest in total
+async def get_loop_stats_api(top: int = 20) -> dict:
+    return {"status": "success", "data": loop_monitor.stats(top=top)}
+
+
+async def reset_loop_stats_api() -> dict:
+    loop_monitor.reset()
+    return {"status": "success", "message": "Loop monitor counters reset."}
+
+
+#----- Ingest journal dead letters (files whose metadata/insert retries ran out)
+async def get_ingest_dead_letters_api(page: int = 1, per_page: int = 50) -> dict:
+    data = await db.get_ingest_dead_letters(page, per_page)
+    data["counts"] = await db.get_ingest_journal_counts()
+    return {"status": "success", "data": data}
+
+
+def _dead_letter_ids(payload: dict | None) -> list | None:
+    payload = payload or {}
+    if payload.get("all"):
+        return None
+    ids = payload.get("ids")
+    if not isinstance(ids, list) or not ids:
+        raise HTTPException(status_code=400, detail="Provide 'ids' or set 'all'.")
+    return [str(i) for i in ids]
+
+
+async def retry_ingest_dead_letters_api(payload: dict | None = None) -> dict:
+    count = await db.requeue_ingest(_dead_letter_ids(payload))
+    return {"status": "success", "requeued": count, "message": f"{count} file(s) queued for another attempt."}
+
+
+async def discard_ingest_dead_letters_api(payload: dict | None = None) -> dict:
+    count = await db.discard_ingest(_dead_letter_ids(payload))
+    return {"status": "success", "discarded": count, "message": f"{count} dead letter(s) discarded."}
+
+
+#----- ── Normalized episode store (storage_N.episodes) ──
+async def migrate_episode_store_api() -> dict:
+    if not SettingsManager.current().episode_collection:
+        raise HTTPException(status_code=400, detail="Enable the episode collection in Settings first.")
+    if not db.start_episode_store_migration():
+        raise HTTPException(status_code=409, detail="An episode store migration is already running.")
+    return {"status": "success", "message": "Episode store migration started."}
+
+
+async def episode_store_status_api() -> dict:
+    return {"status": "success", "data": await db.get_episode_store_status()}
+
+
 #----- ── Duplicate check & cleanup ──
 async def start_duplicate_check_api() -> dict:
     result = await duplicate_manager.start()
@@ -2270,8 +2436,8 @@ async def cancel_duplicate_check_api() -> dict:
     return {"status": "success" if result.get("ok") else "error", **result}
 
 
-async def duplicate_check_status_api() -> dict:
-    return {"status": "success", "data": duplicate_manager.get_status()}
+async def duplicate_check_status_api(page: int = 1, per_page: int = 50) -> dict:
+    return {"status": "success", "data": duplicate_manager.get_status(page, per_page)}
 
 
 #----- Remove selected duplicate streams, or (delete_all) keep the newest per group
@@ -2315,28 +2481,14 @@ LOG_FILE = "log.txt"
 #----- Aggregate content + system metrics across all storage DBs (was /stats)
 async def get_db_stats_api() -> dict:
     try:
-        total_movies = total_tv = total_episodes = total_streams = total_db_size = 0
-
-        for i in range(1, db.current_db_index + 1):
-            storage = db.dbs.get(f"storage_{i}")
-            if storage is None:
-                continue
-
-            total_movies += await storage["movie"].count_documents({})
-            async for movie in storage["movie"].find({}, {"telegram": 1}):
-                total_streams += len(movie.get("telegram", []))
-
-            total_tv += await storage["tv"].count_documents({})
-            async for show in storage["tv"].find({}, {"seasons": 1}):
-                for season in show.get("seasons", []):
-                    for episode in season.get("episodes", []):
-                        total_episodes += 1
-                        total_streams += len(episode.get("telegram", []))
-
-            try:
-                total_db_size += (await storage.command("dbStats")).get("dataSize", 0)
-            except Exception:
-                pass
+        #----- O(1): maintained per-shard counters + cached dbStats (no document scans)
+        totals = await db.get_library_totals()
+        fill = await db.refresh_shard_fill()
+        total_movies = totals["movies"]
+        total_tv = totals["shows"]
+        total_episodes = totals["episodes"]
+        total_streams = totals["streams"]
+        total_db_size = sum(shard.get("data_bytes", 0) for shard in fill.values())
 
         return {
             "status": "success",
@@ -184,7 +184,7 @@ async def thumb_handler(id: str):
         data = cached[0]
     else:
         try:
-            decoded = await decode_string(id)
+            decoded = await decode_string(id, strict=True)
             chat_id = int(f"-100{decoded['chat_id']}")
             msg_id = int(decoded["msg_id"])
         except Exception:
@@ -227,7 +227,7 @@ _SUBTITLE_MIME = {
 @router.get("/sub/{token}/{id}/{name}")
 async def subtitle_handler(token: str, id: str, name: str, token_data: dict = Depends(verify_token)):
     try:
-        decoded = await decode_string(id)
+        decoded = await decode_string(id, strict=True)
         chat_id = int(f"-100{decoded['chat_id']}")
         msg_id = int(decoded["msg_id"])
     except Exception:
@@ -264,7 +264,10 @@ async def stream_handler(request: Request, token: str, id: str, name: str, token
             client_ip_from(request),
             request.headers.get("user-agent", ""),
         ))
-    decoded = await decode_string(id)
+    try:
+        decoded = await decode_string(id, strict=True)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid stream id")
 
     if decoded.get("global"):
         if decoded.get("zip"):
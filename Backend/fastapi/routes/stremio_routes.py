@@ -1,4 +1,5 @@
 import asyncio
+import json
 import re
 import time
 from datetime import datetime, timedelta, timezone
@@ -7,6 +8,7 @@ from urllib.parse import quote, unquote
 
 import PTN
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response
 from fastapi.templating import Jinja2Templates
 from pyrogram.enums import ChatMemberStatus
 from pyrogram.errors import UserNotParticipant
@@ -62,6 +64,52 @@ def invalidate_membership_cache(user_id: int | None = None) -> None:
         _membership_cache.pop(key, None)
 
 
+#----- Materialized catalog pages: pre-serialised JSON keyed by
+#----- (type, catalog id, genre, skip, visibility class). Entries die with the
+#----- library listing generation (bumped on every write) or a settings change.
+_catalog_page_cache: dict = {}
+_CATALOG_CACHE_TTL = 600
+_CATALOG_CACHE_MAX = 2000
+
+
+#----- Tokens that see the same catalog pages share one visibility class
+async def _visibility_class(token_data: dict) -> str:
+    user_id = token_data.get("user_id")
+    try:
+        if user_id is not None and int(user_id) == int(Telegram.OWNER_ID):
+            return "owner"
+    except (TypeError, ValueError):
+        pass
+    token = token_data.get("token")
+    restricted = await db.get_restricted_tokens()
+    if restricted is None or token in restricted:
+        return f"token:{token}"
+    if SettingsManager.current().subscription and token_data.get("subscription_expired"):
+        return "expired"
+    return "public"
+
+
+def _catalog_cache_get(key: tuple) -> Optional[bytes]:
+    entry = _catalog_page_cache.get(key)
+    if not entry:
+        return None
+    body, generation, settings, expires = entry
+    if generation != db.listing_generation or settings is not SettingsManager.current() or time.time() >= expires:
+        _catalog_page_cache.pop(key, None)
+        return None
+    return body
+
+
+def _catalog_cache_put(key: tuple, body: bytes, generation: int) -> None:
+    if len(_catalog_page_cache) >= _CATALOG_CACHE_MAX:
+        _catalog_page_cache.pop(next(iter(_catalog_page_cache)), None)
+    _catalog_page_cache[key] = (body, generation, SettingsManager.current(), time.time() + _CATALOG_CACHE_TTL)
+
+
+def _json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+
 #----- Effective (mode, allowed_tokens) for a title, honouring per-item overrides
 def _effective_visibility(catalog: dict, item: dict) -> tuple:
     if item.get("visibility") in ("public", "tokens", "owner"):
@@ -169,11 +217,11 @@ def _parse_stremio_id(id: str):
     }
 
 
-async def _title_allowed(imdb_id: str = None, token_data: dict = None, kitsu_id: int = None) -> bool:
-    doc = await db.get_media_details(imdb_id=imdb_id, kitsu_id=kitsu_id)
-    if not doc:
+#----- Titles not in the library are always allowed (global search results)
+def _title_allowed(access: Optional[dict], token_data: dict = None) -> bool:
+    if not access:
         return True
-    return _token_can_view(doc.get("visibility") or "public", doc.get("allowed_tokens") or [], token_data)
+    return _token_can_view(access.get("visibility") or "public", access.get("allowed_tokens") or [], token_data)
 
 
 #----- Available catalog genres
@@ -559,6 +607,14 @@ async def get_catalog(token: str, media_type: str, id: str, extra: Optional[str]
 
     page = (stremio_skip // PAGE_SIZE) + 1
 
+    cache_key = None
+    generation = db.listing_generation
+    if not search_query:
+        cache_key = (media_type, id, genre_filter, stremio_skip, await _visibility_class(token_data))
+        cached = _catalog_cache_get(cache_key)
+        if cached is not None:
+            return _json_response(cached)
+
     try:
         if id.startswith("custom_"):
             catalog_id = id.removeprefix("custom_")
@@ -580,10 +636,9 @@ async def get_catalog(token: str, media_type: str, id: str, extra: Optional[str]
             search_results = await db.search_documents(
                 query=search_query, page=page, page_size=PAGE_SIZE,
                 extra_filter=_merge_filters(_visibility_query(token_data), _not_exclusive_clause(allow_searchable=True)),
+                media_type=media_type,
             )
-            all_items = search_results.get("results", [])
-            db_media_type = "tv" if media_type == "series" else "movie"
-            items = [item for item in all_items if item.get("media_type") == db_media_type]
+            items = search_results.get("results", [])
         else:
             if "latest" in id:
                 sort_params = [("updated_on", "desc")]
@@ -594,10 +649,10 @@ async def get_catalog(token: str, media_type: str, id: str, extra: Optional[str]
 
             vis_filter = _merge_filters(_visibility_query(token_data), _not_exclusive_clause())
             if media_type == "movie":
-                data = await db.sort_movies(sort_params, page, PAGE_SIZE, genre_filter=genre_filter, extra_filter=vis_filter)
+                data = await db.sort_movies(sort_params, page, PAGE_SIZE, genre_filter=genre_filter, extra_filter=vis_filter, skip=stremio_skip)
                 items = data.get("movies", [])
             else:
-                data = await db.sort_tv_shows(sort_params, page, PAGE_SIZE, genre_filter=genre_filter, extra_filter=vis_filter)
+                data = await db.sort_tv_shows(sort_params, page, PAGE_SIZE, genre_filter=genre_filter, extra_filter=vis_filter, skip=stremio_skip)
                 items = data.get("tv_shows", [])
     except Exception:
         return {"metas": []}
@@ -605,7 +660,11 @@ async def get_catalog(token: str, media_type: str, id: str, extra: Optional[str]
     metas = [convert_to_stremio_meta(item) for item in items]
     if SettingsManager.current().fanart_enabled:
         await asyncio.gather(*(_apply_fanart(m, it) for m, it in zip(metas, items)))
-    return {"metas": metas}
+    if cache_key is None:
+        return {"metas": metas}
+    body = json.dumps({"metas": metas}, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+    _catalog_cache_put(cache_key, body, generation)
+    return _json_response(body)
 
 
 @router.get("/{token}/meta/{media_type}/{id}.json")
@@ -617,7 +676,7 @@ async def get_meta(token: str, media_type: str, id: str, token_data: dict = Depe
     imdb_id = parsed["imdb_id"] if not parsed["is_kitsu"] else None
     kitsu_id = parsed["kitsu_id"]
 
-    media = await db.get_media_details(imdb_id=imdb_id, kitsu_id=kitsu_id)
+    media = await db.get_title_meta(imdb_id=imdb_id, kitsu_id=kitsu_id)
     if not media:
         return {"meta": {}}
 
@@ -734,6 +793,17 @@ async def get_subtitles(token: str, media_type: str, id: str, extra: Optional[st
 
 
 async def _kitsu_title_year(kitsu_id: int) -> tuple:
+    #----- Library copy first: a projected read beats a Kitsu round-trip
+    try:
+        local = await db.get_title_access(kitsu_id=int(kitsu_id))
+    except Exception:
+        local = None
+    if local and local.get("title"):
+        try:
+            year = int(str(local.get("release_year"))[:4]) if local.get("release_year") else None
+        except (TypeError, ValueError):
+            year = None
+        return local["title"], year
     try:
         from Backend.helper.metadata.providers.kitsu import get_anizip_mappings, _get_client, KITSU_URL
         client = await _get_client()
@@ -1011,16 +1081,16 @@ async def get_streams(
     if is_kitsu and kitsu_id is None:
         raise HTTPException(status_code=400, detail="Invalid Kitsu ID format")
 
-    if not await _title_allowed(imdb_id=imdb_id, token_data=token_data, kitsu_id=kitsu_id):
-        return {"streams": []}
-
-    media_details = await db.get_media_details(
+    #----- One projected lookup answers both the visibility check and the stream list
+    media_details = await db.get_title_streams(
         imdb_id=imdb_id,
         season_number=season_num,
         episode_number=episode_num,
         kitsu_id=kitsu_id,
         absolute_episode=absolute_episode,
     )
+    if not _title_allowed(media_details, token_data):
+        return {"streams": []}
 
     streams = []
 
@@ -515,6 +515,7 @@ async def _flush_quick_items(db, catalog_items: Dict[str, List[dict]]) -> None:
                     "$inc": {"item_count": 1},
                 },
             )
+    db.invalidate_listings()
 
 
 async def _rebuild_auto_catalogs(db, catalog_items: Dict[str, List[dict]], enabled_names: Set[str]) -> None:
@@ -557,6 +558,7 @@ async def _rebuild_auto_catalogs(db, catalog_items: Dict[str, List[dict]], enabl
         {"auto": True, "auto_key": {"$nin": list(active_keys)}},
         {"$set": {"visible": False, "items": [], "item_count": 0, "updated_at": now}},
     )
+    db.invalidate_listings()
 
 
 async def _write_status(db, data: dict) -> None:
@@ -9,6 +9,7 @@ from Backend.logger import LOGGER
 
 #----- Never export/restore credentials; everything else (incl. extra DBs and
 #----- bot tokens) is included so a backup can fully migrate a deployment.
+#----- stream_id_key stays in: signed stream ids in the library only verify with it
 _SETTINGS_EXCLUDE = {"admin_password", "session_secret"}
 
 #----- backup section -> tracking collection
@@ -79,6 +80,8 @@ async def import_config(payload: dict) -> dict:
     settings = payload.get("settings")
     if isinstance(settings, dict):
         clean = {k: v for k, v in settings.items() if k not in _SETTINGS_EXCLUDE and k != "_id"}
+        if not clean.get("stream_id_key"):
+            clean.pop("stream_id_key", None)
         if clean:
             reinit = await SettingsManager.update(db, clean)
             result["settings"] = f"{len(clean)} keys applied"
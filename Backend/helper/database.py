@@ -1,22 +1,159 @@
+import heapq
+import json
 import re
 import secrets
 import string
-from asyncio import create_task
+import threading
+import time
+from asyncio import FIRST_COMPLETED, Event, TimeoutError as AsyncTimeoutError, create_task, gather, wait, wait_for
+from asyncio import sleep as asyncio_sleep
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
 import motor.motor_asyncio
 from bson import ObjectId
 from pydantic import ValidationError
-from pymongo import ASCENDING, DESCENDING
+from pymongo import ASCENDING, DESCENDING, TEXT, DeleteMany, ReadPreference, ReturnDocument, UpdateOne, monitoring
+from rapidfuzz import fuzz
 
 from Backend.config import Telegram
-from Backend.helper.encrypt import decode_string, encode_string
+from Backend.helper.encrypt import decode_string, encode_string, stream_id_variants
 from Backend.helper.modal import Episode, MovieSchema, QualityDetail, QualityPart, Season, TVShowSchema
 from Backend.helper.settings_manager import SettingsManager
 from Backend.helper.task_manager import delete_message
 from Backend.logger import LOGGER
 
+#----- Per-call budget for storage fan-out; shards slower than this are skipped for that call
+_FANOUT_DEADLINE = 8.0
+_FANOUT_WRITE_DEADLINE = 30.0
+_FANOUT_SCAN_DEADLINE = 120.0
+
+#----- Connection pools: replaced clients are closed only after in-flight calls had time to finish
+_POOL_SWAP_GRACE = 30
+
+#----- Shard router: in-memory route cache size; shard fill is re-measured at most every TTL seconds
+_ROUTE_CACHE_MAX = 50000
+_SHARD_FILL_TTL = 300
+_SHARD_FILL_LIMIT = 0.9
+
+#----- Library counters: maintained per shard, recounted from the docs on a slow schedule
+_COUNTER_FIELDS = ("movies", "shows", "episodes", "streams", "bytes")
+_COUNTER_PROJECTIONS = {
+    "movie": {"tmdb_id": 1, "telegram.size": 1, "telegram.parts.size_bytes": 1},
+    "tv": {
+        "tmdb_id": 1, "seasons.episodes.episode_number": 1,
+        "seasons.episodes.telegram.size": 1, "seasons.episodes.telegram.parts.size_bytes": 1,
+    },
+}
+_COUNTER_RECONCILE_DELAY = 600
+_COUNTER_RECONCILE_INTERVAL = 6 * 3600
+_COUNTER_SEED_RETRY = 30
+_SIZE_UNITS = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3, "TB": 1024 ** 4}
+
+#----- Dead-link listing: flattened server-side, streamed back in cursor batches
+_AGG_BATCH_SIZE = 500
+_DEAD_LINK_FIELDS = ("id", "quality", "size", "date_added", "is_dead")
+_DEAD_LINK_PIPELINES = {
+    "movie": [
+        {"$match": {"telegram.is_dead": True}},
+        {"$sort": {"_id": 1}},
+        {"$project": {
+            "_id": 0, "tmdb_id": 1, "db_index": 1, "title": 1, "year": 1, "poster": 1,
+            **{f"telegram.{f}": 1 for f in _DEAD_LINK_FIELDS},
+        }},
+        {"$unwind": "$telegram"},
+        {"$match": {"telegram.is_dead": True}},
+        {"$addFields": {"quality": "$telegram"}},
+        {"$project": {"telegram": 0}},
+    ],
+    "tv": [
+        {"$match": {"seasons.episodes.telegram.is_dead": True}},
+        {"$sort": {"_id": 1}},
+        {"$project": {
+            "_id": 0, "tmdb_id": 1, "db_index": 1, "title": 1, "year": 1, "poster": 1,
+            "seasons.season_number": 1, "seasons.episodes.episode_number": 1,
+            **{f"seasons.episodes.telegram.{f}": 1 for f in _DEAD_LINK_FIELDS},
+        }},
+        {"$unwind": "$seasons"},
+        {"$unwind": "$seasons.episodes"},
+        {"$unwind": "$seasons.episodes.telegram"},
+        {"$match": {"seasons.episodes.telegram.is_dead": True}},
+        {"$addFields": {
+            "season": "$seasons.season_number",
+            "episode": "$seasons.episodes.episode_number",
+            "quality": "$seasons.episodes.telegram",
+        }},
+        {"$project": {"seasons": 0}},
+    ],
+}
+
+#----- Stream analytics: raw records expire; rollups (grain x client x DC x token) and
+#----- all-time counters (total / client / title / user) are bumped on every logged stream
+_ANALYTICS_RAW_TTL = 30 * 86400
+_ROLLUP_GRAINS = {
+    "minute": ("%Y-%m-%dT%H:%M", timedelta(days=2)),
+    "hour": ("%Y-%m-%dT%H", timedelta(days=90)),
+    "day": ("%Y-%m-%d", None),
+}
+_ROLLUP_SUMS = ("streams", "total_bytes", "duration_sum", "mbps_sum")
+_ROLLUP_MAXES = ("peak_mbps",)
+
+#----- Ingest journal: failures back off exponentially until they land in the dead letters
+_INGEST_DONE_TTL = 7 * 86400
+_INGEST_MAX_ATTEMPTS = 5
+_INGEST_BACKOFF_BASE = 60
+_INGEST_BACKOFF_MAX = 6 * 3600
+
+#----- Listing caches (shard counts + keyset cursors), dropped on every library write
+_LISTING_CACHE_TTL = 600
+_LISTING_CACHE_MAX = 2000
+_LISTING_CURSORS_PER_QUERY = 500
+
+#----- Ingest merges only need ids + the season/episode/quality skeleton, not cast/overviews
+_MERGE_PROJECTION = {
+    "cast": 0, "description": 0,
+    "seasons.episodes.overview": 0, "seasons.episodes.episode_backdrop": 0,
+}
+
+#----- Edits touching these fields resync the title's tracking.stream_index entries
+_STREAM_INDEX_FIELDS = {"tmdb_id", "imdb_id", "title", "telegram", "seasons"}
+
+#----- Normalized episode store: per-episode fields copied from seasons[].episodes[],
+#----- plus show-level fields that, when edited, resync the title's episode docs
+_EPISODE_FIELDS = ("episode_number", "absolute_episode", "title", "overview", "episode_backdrop", "released", "telegram")
+_EPISODE_SHOW_FIELDS = {"kitsu_id", "is_anime"}
+
+#----- Stremio hot paths: access checks read these; meta pages skip every telegram list
+_ACCESS_PROJECTION = {
+    "_id": 0, "tmdb_id": 1, "imdb_id": 1, "kitsu_id": 1, "title": 1, "release_year": 1,
+    "is_anime": 1, "media_type": 1, "visibility": 1, "allowed_tokens": 1,
+}
+_META_PROJECTION = {
+    "movie": {"_id": 0, "telegram": 0},
+    "tv": {"_id": 0, "seasons.episodes.telegram": 0},
+}
+
+#----- Search: one weighted text index per collection (titles outrank file names)
+_SEARCH_TITLE_FIELDS = ("title", "title_english", "original_title")
+_SEARCH_INDEX_FIELDS = {
+    "movie": _SEARCH_TITLE_FIELDS + ("telegram.name",),
+    "tv": _SEARCH_TITLE_FIELDS + ("seasons.episodes.telegram.name",),
+}
+_SEARCH_WEIGHTS = {"title": 10, "title_english": 10, "original_title": 8, "telegram.name": 1, "seasons.episodes.telegram.name": 1}
+_SEARCH_PROJECTIONS = {
+    "movie": {
+        "_id": 1, "tmdb_id": 1, "title": 1, "genres": 1, "rating": 1,
+        "release_year": 1, "release_year_end": 1, "poster": 1, "backdrop": 1, "description": 1,
+        "media_type": 1, "db_index": 1, "imdb_id": 1, "logo": 1, "telegram": 1, "title_english": 1, "original_title": 1,
+    },
+    "tv": {
+        "_id": 1, "tmdb_id": 1, "title": 1, "genres": 1, "rating": 1, "imdb_id": 1,
+        "release_year": 1, "release_year_end": 1, "poster": 1, "backdrop": 1, "description": 1, "logo": 1,
+        "media_type": 1, "db_index": 1, "seasons": 1, "title_english": 1, "original_title": 1,
+    },
+}
+
 
 
 def convert_objectid_to_str(document: Dict[str, Any]) -> Dict[str, Any]:
@@ -30,6 +167,110 @@ def convert_objectid_to_str(document: Dict[str, Any]) -> Dict[str, Any]:
     return document
 
 
+#----- Bytes behind a quality: summed split parts, else its "1.4 GB" size label
+def _quality_bytes(quality: dict) -> int:
+    total = 0
+    for part in quality.get("parts") or []:
+        try:
+            total += int(part.get("size_bytes") or 0)
+        except (TypeError, ValueError):
+            pass
+    if total:
+        return total
+    match = re.match(r"([\d.]+)\s*([KMGT]?B)", str(quality.get("size") or "").strip().upper())
+    if not match:
+        return 0
+    return int(float(match.group(1)) * _SIZE_UNITS.get(match.group(2), 1))
+
+
+#----- Mongo's cross-type sort order, so in-process merges agree with per-shard sorts
+def _bson_sort_key(value) -> tuple:
+    if value is None:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (8, value)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    if isinstance(value, datetime):
+        return (9, value)
+    return (3, str(value))
+
+
+#----- CMAP listener: per-role connection pool counters (pymongo calls it from its own threads)
+class _PoolMetrics(monitoring.ConnectionPoolListener):
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.pools = 0
+        self.connections = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.checkouts = 0
+        self.checkout_failures: Dict[str, int] = {}
+        self.cleared = 0
+
+    def _bump(self, **deltas) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self.peak_waiting = max(self.peak_waiting, self.waiting)
+
+    def pool_created(self, event) -> None:
+        self._bump(pools=1)
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        self._bump(cleared=1)
+
+    def pool_closed(self, event) -> None:
+        self._bump(pools=-1)
+
+    def connection_created(self, event) -> None:
+        self._bump(connections=1)
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        self._bump(connections=-1)
+
+    def connection_check_out_started(self, event) -> None:
+        self._bump(waiting=1)
+
+    def connection_check_out_failed(self, event) -> None:
+        with self._lock:
+            self.waiting -= 1
+            reason = str(getattr(event, "reason", "unknown"))
+            self.checkout_failures[reason] = self.checkout_failures.get(reason, 0) + 1
+
+    def connection_checked_out(self, event) -> None:
+        self._bump(waiting=-1, in_use=1, checkouts=1)
+
+    def connection_checked_in(self, event) -> None:
+        self._bump(in_use=-1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "pools": self.pools,
+                "connections": self.connections,
+                "in_use": self.in_use,
+                "idle": max(0, self.connections - self.in_use),
+                "peak_in_use": self.peak_in_use,
+                "waiting": self.waiting,
+                "peak_waiting": self.peak_waiting,
+                "checkouts": self.checkouts,
+                "checkout_failures": dict(self.checkout_failures),
+                "cleared": self.cleared,
+            }
+
+
 class Database:
     def __init__(self, db_name: str = "dbFyvio"):
         self.db_uris = Telegram.DATABASE
@@ -40,16 +281,93 @@ class Database:
 
         self.clients: Dict[str, motor.motor_asyncio.AsyncIOMotorClient] = {}
         self.dbs: Dict[str, motor.motor_asyncio.AsyncIOMotorDatabase] = {}
+        self.read_dbs: Dict[str, motor.motor_asyncio.AsyncIOMotorDatabase] = {}
+
+        #----- Per-role pool tuning (tracking = write-heavy, storage = read-mostly)
+        self.pool_metrics = {"tracking": _PoolMetrics(), "storage": _PoolMetrics()}
+        self._pool_options: Dict[str, dict] = {}
+        self._long_jobs: set = set()
 
         self.current_db_index = 1
 
+        self.listing_generation = 0
+        self._count_cache: Dict[tuple, Tuple[int, float]] = {}
+        self._page_cursors: Dict[tuple, Dict[int, tuple]] = {}
+        self._restricted_tokens: Optional[Tuple[int, set]] = None
+
+        self.stream_index_ready = False
+        self._stream_index_task = None
+
+        self.episode_store_ready = False
+        self._episode_store_task = None
+
+        self.routes_ready = False
+        self._route_cache: Dict[tuple, List[Tuple[str, int]]] = {}
+        self._derived_failures = 0
+        self._shard_fill: Dict[int, dict] = {}
+        self._shard_fill_at = 0.0
+        self._counter_task = None
+        self._rollup_task = None
+
+    #----- Client kwargs for a role, from settings (defaults before SettingsManager has loaded)
+    @staticmethod
+    def _client_options(role: str) -> dict:
+        s = SettingsManager.current()
+        options = {
+            "maxPoolSize": s.tracking_max_pool_size if role == "tracking" else s.storage_max_pool_size,
+            "minPoolSize": s.tracking_min_pool_size if role == "tracking" else s.storage_min_pool_size,
+            "retryWrites": s.db_retry_writes,
+        }
+        options["minPoolSize"] = min(options["minPoolSize"], options["maxPoolSize"])
+        if s.db_wait_queue_timeout_ms:
+            options["waitQueueTimeoutMS"] = s.db_wait_queue_timeout_ms
+        if s.db_compressors:
+            options["compressors"] = ",".join(s.db_compressors)
+        return options
+
+    def _new_client(self, uri: str, role: str) -> motor.motor_asyncio.AsyncIOMotorClient:
+        options = self._client_options(role)
+        self._pool_options[role] = options
+        return motor.motor_asyncio.AsyncIOMotorClient(
+            uri, event_listeners=[self.pool_metrics[role]], **options
+        )
+
+    #----- Register a client under db_key; storage shards also get a read view that
+    #----- prefers secondaries (catalog + stream lookups) when that's switched on
+    def _attach_client(self, db_key: str, client) -> None:
+        self.clients[db_key] = client
+        self.dbs[db_key] = client[self.db_name]
+        if db_key.startswith("storage_") and SettingsManager.current().storage_secondary_reads:
+            self.read_dbs[db_key] = client.get_database(
+                self.db_name, read_preference=ReadPreference.SECONDARY_PREFERRED
+            )
+        else:
+            self.read_dbs.pop(db_key, None)
+
+    #----- Storage DB for read-only lookups (secondaryPreferred view when enabled)
+    def _reader(self, db_index: int):
+        db_key = f"storage_{db_index}"
+        return self.read_dbs.get(db_key) or self.dbs[db_key]
+
+    #----- Tracking client only, so settings can load before the pools are sized from them
+    async def open_settings_store(self) -> None:
+        if "tracking" not in self.clients:
+            self._attach_client("tracking", self._new_client(self.db_uris[0], "tracking"))
+
     async def connect(self):
         try:
             for index, uri in enumerate(self.db_uris):
-                client = motor.motor_asyncio.AsyncIOMotorClient(uri)
                 db_key = "tracking" if index == 0 else f"storage_{index}"
-                self.clients[db_key] = client
-                self.dbs[db_key] = client[self.db_name]
+                role = "tracking" if index == 0 else "storage"
+                existing = self.clients.get(db_key)
+                if existing is not None and self._pool_options.get(role) == self._client_options(role):
+                    client = existing
+                else:
+                    #----- Only the settings read ran on a pre-settings client; nothing else holds it
+                    if existing is not None:
+                        existing.close()
+                    client = self._new_client(uri, role)
+                self._attach_client(db_key, client)
                 db_type = "Tracking" if index == 0 else f"Storage {index}"
 
                 masked_uri = re.sub(r"://(.*?):.*?@", r"://\1:*****@", uri)
@@ -68,6 +386,17 @@ class Database:
 
             await self.ensure_indexes()
 
+            index_state = await self.dbs["tracking"]["state"].find_one({"_id": "stream_index"}) or {}
+            self.stream_index_ready = bool(index_state.get("built"))
+            self.routes_ready = self.stream_index_ready and bool(index_state.get("routes"))
+            if not self.routes_ready:
+                self.start_stream_index_rebuild()
+
+            episode_state = await self.dbs["tracking"]["state"].find_one({"_id": "episode_store"}) or {}
+            self.episode_store_ready = bool(episode_state.get("built"))
+
+            await self.prepare_stream_analytics()
+
         except Exception as e:
             LOGGER.error(f"Database connection error: {e}")
 
@@ -82,6 +411,14 @@ class Database:
                     [("items.tmdb_id", ASCENDING), ("items.media_type", ASCENDING)]
                 )
                 await self._ensure_subtitle_indexes(tracking)
+                await tracking["stream_index"].create_index([("refs.chat_id", ASCENDING), ("refs.msg_id", ASCENDING)])
+                await tracking["stream_index"].create_index(
+                    [("collection", ASCENDING), ("tmdb_id", ASCENDING), ("season", ASCENDING), ("episode", ASCENDING)]
+                )
+                for field in ("tmdb_id", "imdb_id", "kitsu_id"):
+                    await tracking["shard_routes"].create_index([(field, ASCENDING)])
+                await tracking["ingest_journal"].create_index([("status", ASCENDING), ("next_at", ASCENDING)])
+                await tracking["ingest_journal"].create_index([("done_at", ASCENDING)], expireAfterSeconds=_INGEST_DONE_TTL)
             except Exception as e:
                 LOGGER.error(f"Failed creating tracking indexes: {e}")
 
@@ -109,7 +446,7 @@ class Database:
         await subs.create_index([("imdb_id", ASCENDING), ("season", ASCENDING), ("episode", ASCENDING)])
 
     #----- Ensure per-storage-DB indexes on the movie/tv collections.
-    #----- tmdb_id + imdb_id drive catalog hydration and stream lookups.
+    #----- tmdb_id + imdb_id drive catalog hydration and stream lookups; search_text backs search_documents.
     async def _ensure_storage_indexes(self, db_key: str) -> None:
         db = self.dbs.get(db_key)
         if db is None:
@@ -119,14 +456,97 @@ class Database:
                 await db[collection_name].create_index([("tmdb_id", ASCENDING)])
                 await db[collection_name].create_index([("imdb_id", ASCENDING)])
                 await db[collection_name].create_index([("kitsu_id", ASCENDING)])
+                await db[collection_name].create_index(
+                    [(field, TEXT) for field in _SEARCH_INDEX_FIELDS[collection_name]],
+                    name="search_text",
+                    weights={field: _SEARCH_WEIGHTS[field] for field in _SEARCH_INDEX_FIELDS[collection_name]},
+                    default_language="none",
+                )
             except Exception as e:
                 LOGGER.error(f"Failed creating index on {db_key}/{collection_name}: {e}")
+        try:
+            episodes = db["episodes"]
+            for id_field in ("tmdb_id", "imdb_id", "kitsu_id"):
+                await episodes.create_index(
+                    [(id_field, ASCENDING), ("season_number", ASCENDING), ("episode_number", ASCENDING)]
+                )
+            for id_field in ("imdb_id", "kitsu_id"):
+                await episodes.create_index([(id_field, ASCENDING), ("absolute_episode", ASCENDING)])
+        except Exception as e:
+            LOGGER.error(f"Failed creating index on {db_key}/episodes: {e}")
 
     async def disconnect(self):
         for client in self.clients.values():
             client.close()
         LOGGER.info("All database connections closed.")
 
+    #----- Rebuild clients whose pool options no longer match the settings.
+    #----- New clients take over immediately; old ones close after a grace period.
+    async def apply_pool_settings(self) -> Dict[str, Any]:
+        changed = []
+        for role in ("tracking", "storage"):
+            if self._pool_options.get(role) == self._client_options(role):
+                continue
+            changed.append(role)
+
+        secondary = SettingsManager.current().storage_secondary_reads
+        retired = []
+        for index, uri in enumerate(self.db_uris):
+            db_key = "tracking" if index == 0 else f"storage_{index}"
+            role = "tracking" if index == 0 else "storage"
+            if db_key not in self.clients:
+                continue
+            if role in changed:
+                retired.append(self.clients[db_key])
+                self._attach_client(db_key, self._new_client(uri, role))
+            elif role == "storage" and secondary != (db_key in self.read_dbs):
+                self._attach_client(db_key, self.clients[db_key])
+
+        if retired:
+            create_task(self._close_clients_later(retired, list(self._long_jobs)))
+            LOGGER.info(f"[DB] Rebuilt connection pools for: {', '.join(changed)}")
+        return {"rebuilt": changed, "secondary_reads": secondary}
+
+    #----- Cursors opened before the swap keep using the retired client; wait out the grace
+    #----- period and any long job that was already running when the pool was replaced
+    async def _close_clients_later(self, clients: list, jobs: list) -> None:
+        await asyncio_sleep(_POOL_SWAP_GRACE)
+        if jobs:
+            await gather(*(job.wait() for job in jobs))
+        for client in clients:
+            try:
+                client.close()
+            except Exception as e:
+                LOGGER.error(f"[DB] Failed closing a retired client: {e}")
+
+    #----- Mark a long cursor-driven job (rebuilds, migrations, scans) so a pool swap
+    #----- doesn't close its client underneath it
+    @asynccontextmanager
+    async def long_job(self):
+        done = Event()
+        self._long_jobs.add(done)
+        try:
+            yield
+        finally:
+            done.set()
+            self._long_jobs.discard(done)
+
+    async def _run_long_job(self, coro):
+        async with self.long_job():
+            return await coro
+
+    def get_pool_metrics(self) -> Dict[str, Any]:
+        result = {}
+        for role, metrics in self.pool_metrics.items():
+            options = dict(self._pool_options.get(role) or {})
+            result[role] = {
+                **metrics.snapshot(),
+                "options": options,
+                "clients": sum(1 for key in self.clients if (key == "tracking") == (role == "tracking")),
+            }
+        result["storage"]["secondary_reads"] = bool(self.read_dbs)
+        return result
+
     async def update_current_db_index(self):
         await self.dbs["tracking"]["state"].update_one(
             {"_id": "db_index"},
@@ -172,12 +592,11 @@ class Database:
 
     async def connect_storage_db(self, uri: str, index: int) -> bool:
         try:
-            client = motor.motor_asyncio.AsyncIOMotorClient(uri)
+            client = self._new_client(uri, "tracking" if index == 0 else "storage")
             await client.admin.command("ping")
 
             db_key = "tracking" if index == 0 else f"storage_{index}"
-            self.clients[db_key] = client
-            self.dbs[db_key] = client[self.db_name]
+            self._attach_client(db_key, client)
 
             db_type = "Tracking" if index == 0 else f"Storage {index}"
             masked_uri = re.sub(r"://(.*?):.*?@", r"://\1:*****@", uri).split('?')[0]
@@ -193,6 +612,7 @@ class Database:
         db_key = f"storage_{index}"
         client = self.clients.pop(db_key, None)
         self.dbs.pop(db_key, None)
+        self.read_dbs.pop(db_key, None)
         if client:
             client.close()
             LOGGER.info(f"Disconnected {db_key}.")
@@ -566,6 +986,7 @@ class Database:
             "created_at": now,
             "updated_at": now,
         })
+        self.invalidate_listings()
         return str(result.inserted_id)
 
     async def get_custom_catalogs(self, visible_only: bool = False) -> List[dict]:
@@ -630,6 +1051,7 @@ class Database:
             )
         except Exception:
             return False
+        self.invalidate_listings()
 
         catalog = await self.dbs["tracking"]["custom_catalogs"].find_one({"_id": ObjectId(catalog_id)})
         items = catalog.get("items", []) if catalog else []
@@ -670,6 +1092,7 @@ class Database:
                 )
             except Exception as e:
                 LOGGER.error(f"_apply_visibility_to_docs failed for {db_key}.{collection}: {e}")
+        self.invalidate_listings()
 
     #----- Group catalog items into {(db_index, collection): [tmdb_id, ...]}
     def _group_items_by_storage(self, items: List[dict]) -> Dict[Tuple[int, str], List[int]]:
@@ -697,6 +1120,7 @@ class Database:
                 )
             except Exception as e:
                 LOGGER.error(f"_apply_exclusivity_to_docs failed for {db_key}.{collection}: {e}")
+        self.invalidate_listings()
 
     #----- Unlock the given titles so they return to default/auto/other catalogs
     async def _clear_exclusivity_from_docs(self, items: List[dict]) -> None:
@@ -714,6 +1138,7 @@ class Database:
                 )
             except Exception as e:
                 LOGGER.error(f"_clear_exclusivity_from_docs failed for {db_key}.{collection}: {e}")
+        self.invalidate_listings()
 
     #----- Remove the given titles from every catalog except the one that owns them
     async def purge_items_from_other_catalogs(self, catalog_id: str, items: List[dict]) -> None:
@@ -738,6 +1163,7 @@ class Database:
                 )
             except Exception as e:
                 LOGGER.error(f"purge_items_from_other_catalogs failed: {e}")
+        self.invalidate_listings()
 
     #----- Mark a single freshly-added title exclusive to its catalog
     async def mark_item_exclusive(self, catalog_id: str, tmdb_id: int, db_index: int, media_type: str, searchable: bool) -> None:
@@ -768,6 +1194,7 @@ class Database:
                     "updated_at": datetime.utcnow(),
                 }},
             )
+            self.invalidate_listings()
             return result.modified_count > 0
         except Exception:
             return False
@@ -793,6 +1220,7 @@ class Database:
                 )
             except Exception as e:
                 LOGGER.error(f"set_media_visibility doc update failed: {e}")
+            self.invalidate_listings()
 
         #----- Keep any catalog items in sync so custom-catalog filtering matches
         try:
@@ -821,6 +1249,7 @@ class Database:
     async def delete_custom_catalog(self, catalog_id: str) -> bool:
         try:
             result = await self.dbs["tracking"]["custom_catalogs"].delete_one({"_id": ObjectId(catalog_id)})
+            self.invalidate_listings()
             return result.deleted_count > 0
         except Exception:
             return False
@@ -857,6 +1286,7 @@ class Database:
                     "$set": {"updated_at": datetime.utcnow()},
                 }
             )
+            self.invalidate_listings()
             return result.modified_count > 0
         except Exception:
             return False
@@ -879,6 +1309,7 @@ class Database:
                     "$set": {"updated_at": datetime.utcnow()},
                 }
             )
+            self.invalidate_listings()
             return result.modified_count > 0
         except Exception:
             return False
@@ -891,15 +1322,16 @@ class Database:
         except (TypeError, ValueError):
             return None
 
-        for i in range(1, self.current_db_index + 1):
-            db_key = f"storage_{i}"
-            if db_key not in self.dbs:
-                continue
-            doc = await self.dbs[db_key][collection_name].find_one({"tmdb_id": tmdb_id})
+        async def _lookup(i, db):
+            doc = await db[collection_name].find_one({"tmdb_id": tmdb_id})
             if doc:
                 doc["db_index"] = i
                 return doc, i
-        return None
+            return None
+
+        routed = await self._route_indexes(tmdb_id=tmdb_id, collection_name=collection_name)
+        indexes = sorted(routed) if routed is not None else None
+        return await self.fan_out(_lookup, first_match=True, indexes=indexes, label="find media doc")
 
     async def purge_media_from_catalogs(self, tmdb_id: int, media_type: str) -> int:
         #----- Remove a media item from every catalog (auto + manual) by tmdb_id + media_type
@@ -941,6 +1373,7 @@ class Database:
                 ],
             )
             if result.modified_count:
+                self.invalidate_listings()
                 LOGGER.info(
                     f"Purged {media_type} tmdb_id {tmdb_id} from "
                     f"{result.modified_count} catalog(s)."
@@ -1009,60 +1442,237 @@ class Database:
             return {sort_field: DESCENDING if sort_direction.lower() == "desc" else ASCENDING}
         return {"updated_on": DESCENDING}
 
+    def _storage_indexes(self, newest_first: bool = False) -> List[int]:
+        indexes = [i for i in range(1, self.current_db_index + 1) if f"storage_{i}" in self.dbs]
+        return indexes[::-1] if newest_first else indexes
+
+    #----- Run fn(db_index, db) on every storage DB concurrently within one deadline.
+    #----- first_match: the first non-None result in shard order (later shards are cancelled
+    #----- once every earlier one has answered); otherwise [(db_index, result)] of the shards
+    #----- that finished in time. Failed or late shards are logged and skipped, unless
+    #----- strict (write paths, where a missed shard could mean a duplicate insert).
+    #----- reads: hand fn the shard's read view (may be served by a secondary).
+    async def fan_out(
+        self,
+        fn,
+        *,
+        first_match: bool = False,
+        newest_first: bool = False,
+        indexes: Optional[List[int]] = None,
+        deadline: float = _FANOUT_DEADLINE,
+        label: str = "fan-out",
+        strict: bool = False,
+        reads: bool = False,
+    ):
+        order = indexes if indexes is not None else self._storage_indexes(newest_first)
+        pick = self._reader if reads else (lambda i: self.dbs[f"storage_{i}"])
+        tasks = [(i, create_task(fn(i, pick(i)))) for i in order]
+        if not tasks:
+            return None if first_match else []
+        stop_at = time.monotonic() + deadline
+
+        try:
+            if first_match:
+                for i, task in tasks:
+                    try:
+                        result = await wait_for(task, max(stop_at - time.monotonic(), 0))
+                    except AsyncTimeoutError:
+                        LOGGER.warning(f"[DB] {label}: storage_{i} missed the {deadline:.0f}s deadline")
+                        if strict:
+                            raise
+                        continue
+                    except Exception as e:
+                        LOGGER.error(f"[DB] {label}: storage_{i} failed: {e}")
+                        if strict:
+                            raise
+                        continue
+                    if result is not None:
+                        return result
+                return None
+
+            pending = {task for _, task in tasks}
+            while pending:
+                remaining = stop_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                _, pending = await wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            results = []
+            for i, task in tasks:
+                if not task.done():
+                    LOGGER.warning(f"[DB] {label}: storage_{i} missed the {deadline:.0f}s deadline")
+                    continue
+                if task.exception() is not None:
+                    LOGGER.error(f"[DB] {label}: storage_{i} failed: {task.exception()}")
+                    continue
+                results.append((i, task.result()))
+            return results
+        finally:
+            for _, task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    #----- Drop cached counts/cursors for one collection (None = all); bumps the generation other
+    #----- listing caches key on. A write that moves at most one row (ingest adding a file or a
+    #----- title) keeps them: a keyset cursor stays a valid boundary, and the count is at most a
+    #----- few rows short until its TTL, instead of every ingest write re-counting every shard.
+    def invalidate_listings(self, collection_name: Optional[str] = None, single_row: bool = False) -> None:
+        self.listing_generation += 1
+        if single_row:
+            return
+        if collection_name is None:
+            self._count_cache.clear()
+            self._page_cursors.clear()
+            return
+        for cache in (self._count_cache, self._page_cursors):
+            for key in [key for key in cache if key[0] == collection_name]:
+                del cache[key]
+
+    #----- Tokens that unlock restricted titles/catalogs; None when unknown (cached per generation)
+    async def get_restricted_tokens(self) -> Optional[set]:
+        cached = self._restricted_tokens
+        if cached and cached[0] == self.listing_generation:
+            return cached[1]
+        generation = self.listing_generation
+        tokens = set()
+        try:
+            for i in range(1, self.current_db_index + 1):
+                for collection_name in ("movie", "tv"):
+                    tokens.update(await self.dbs[f"storage_{i}"][collection_name].distinct(
+                        "allowed_tokens", {"visibility": "tokens"}
+                    ))
+            catalogs = self.dbs["tracking"]["custom_catalogs"]
+            tokens.update(await catalogs.distinct("allowed_tokens"))
+            tokens.update(await catalogs.distinct("items.allowed_tokens"))
+        except Exception as e:
+            LOGGER.error(f"get_restricted_tokens failed: {e}")
+            return None
+        self._restricted_tokens = (generation, tokens)
+        return tokens
+
+    @staticmethod
+    def _listing_key(collection_name: str, sort_spec: List[Tuple[str, int]], filter_dict: dict) -> tuple:
+        return (collection_name, tuple(sort_spec), json.dumps(filter_dict, sort_keys=True, default=str))
+
+    #----- Keyset predicate: everything strictly after (value, _id) in sort order
+    @staticmethod
+    def _keyset_clause(field: str, direction: int, value, last_id) -> dict:
+        id_op = "$lt" if direction == DESCENDING else "$gt"
+        tie = {field: value, "_id": {id_op: last_id}}
+        if value is None:
+            #----- Nulls sort lowest: tail of a descending walk, head of an ascending one
+            if direction == DESCENDING:
+                return tie
+            return {"$or": [tie, {field: {"$ne": None}}]}
+        op = "$lt" if direction == DESCENDING else "$gt"
+        clauses = [tie, {field: {op: value}}]
+        if direction == DESCENDING:
+            clauses.append({field: None})
+        return {"$or": clauses}
+
+    #----- K-way merge of per-shard sorted lists into one globally sorted [(db_index, doc)]
+    @staticmethod
+    def _merge_shards(shard_docs: List[Tuple[int, List[dict]]], sort_field: str, direction: int) -> List[Tuple[int, dict]]:
+        streams = [[(db_index, doc) for doc in docs] for db_index, docs in shard_docs]
+        return list(heapq.merge(
+            *streams,
+            key=lambda item: (_bson_sort_key(item[1].get(sort_field)), item[1]["_id"]),
+            reverse=direction == DESCENDING,
+        ))
+
+    async def _cached_total(self, collection_name: str, filter_dict: dict, query_key: tuple) -> int:
+        now = time.time()
+        cached = self._count_cache.get(query_key)
+        if cached and now < cached[1]:
+            return cached[0]
+        async def _count(_, db):
+            return await db[collection_name].count_documents(filter_dict)
+
+        counts = await self.fan_out(_count, label="listing count", reads=True)
+        total = sum(count for _, count in counts)
+        #----- A shard missed the deadline: serve the partial total but don't cache it
+        if len(counts) < len(self._storage_indexes()):
+            return total
+        if len(self._count_cache) >= _LISTING_CACHE_MAX:
+            self._count_cache.pop(next(iter(self._count_cache)))
+        self._count_cache[query_key] = (total, now + _LISTING_CACHE_TTL)
+        return total
+
+    #----- Closest remembered cursor at or before offset -> (base_offset, cursor or None)
+    def _nearest_cursor(self, query_key: tuple, offset: int) -> Tuple[int, Optional[tuple]]:
+        cursors = self._page_cursors.get(query_key) or {}
+        best = max((o for o in cursors if o <= offset), default=0)
+        return best, cursors.get(best)
+
+    def _remember_cursor(self, query_key: tuple, offset: int, cursor: tuple) -> None:
+        cursors = self._page_cursors.get(query_key)
+        if cursors is None:
+            if len(self._page_cursors) >= _LISTING_CACHE_MAX:
+                self._page_cursors.pop(next(iter(self._page_cursors)))
+            cursors = self._page_cursors[query_key] = {}
+        if len(cursors) >= _LISTING_CURSORS_PER_QUERY:
+            cursors.pop(next(iter(cursors)))
+        cursors[offset] = cursor
+
+    #----- Cross-shard paginator: globally sorted by the sort key (+ _id tiebreak).
+    #----- Pages resume from a keyset cursor remembered for their offset (Stremio's skip),
+    #----- so each page is one limit(page_size) query per shard regardless of depth.
     async def _paginate_collection(
         self,
         collection_name: str,
         sort_dict: Dict[str, int],
         page: int,
         page_size: int,
-        filter_dict: Optional[dict] = None
+        filter_dict: Optional[dict] = None,
+        offset: Optional[int] = None,
     ):
         filter_dict = filter_dict or {}
-        skip = (page - 1) * page_size
-        results = []
-        dbs_checked = []
-        total_count = 0
-
-        db_counts = []
-        for i in range(1, self.current_db_index + 1):
-            db_key = f"storage_{i}"
-            db = self.dbs[db_key]
-            count = await db[collection_name].count_documents(filter_dict)
-            db_counts.append((i, count))
-            total_count += count
-
-        start_db_index = None
-        for db_index, count in reversed(db_counts):
-            if skip < count:
-                start_db_index = db_index
-                break
-            skip -= count
-
-        if not start_db_index:
+        sort_field, direction = next(iter(sort_dict.items()))
+        sort_spec = [(sort_field, direction), ("_id", direction)]
+        query_key = self._listing_key(collection_name, sort_spec, filter_dict)
+        if offset is None:
+            offset = (page - 1) * page_size
+        offset = max(0, int(offset))
+
+        total_count = await self._cached_total(collection_name, filter_dict, query_key)
+        if offset >= total_count:
             return [], [], total_count
 
-        for db_index, count in reversed(db_counts):
-            if db_index < start_db_index:
-                continue
-
-            db_key = f"storage_{db_index}"
-            db = self.dbs[db_key]
-            dbs_checked.append(db_index)
-
-            cursor = (
-                db[collection_name]
-                .find(filter_dict)
-                .sort(sort_dict)
-                .skip(skip if db_index == start_db_index else 0)
-                .limit(page_size - len(results))
-            )
-
-            docs = await cursor.to_list(None)
-            results.extend(docs)
-
-            if len(results) >= page_size:
-                break
-
+        base_offset, cursor = self._nearest_cursor(query_key, offset)
+        gap = offset - base_offset
+        window = gap + page_size
+        page_filter = filter_dict
+        if cursor is not None:
+            page_filter = {"$and": [filter_dict, self._keyset_clause(sort_field, direction, *cursor)]}
+
+        #----- Warm cursor: fetch the page directly. Cold/deep offset: walk light
+        #----- (sort key, _id) heads up to the window, then hydrate only the slice.
+        projection = None if gap == 0 else {sort_field: 1}
+        storage_indexes = list(range(1, self.current_db_index + 1))
+        shard_lists = await gather(*(
+            self._reader(i)[collection_name]
+            .find(page_filter, projection)
+            .sort(sort_spec)
+            .limit(window)
+            .to_list(window)
+            for i in storage_indexes
+        ))
+        picked = self._merge_shards(list(zip(storage_indexes, shard_lists)), sort_field, direction)[gap:window]
+
+        if projection is not None and picked:
+            ids_by_shard: Dict[int, List[Any]] = {}
+            for db_index, doc in picked:
+                ids_by_shard.setdefault(db_index, []).append(doc["_id"])
+            full_docs: Dict[Any, dict] = {}
+            for db_index, ids in ids_by_shard.items():
+                async for doc in self._reader(db_index)[collection_name].find({"_id": {"$in": ids}}):
+                    full_docs[doc["_id"]] = doc
+            picked = [(db_index, full_docs[doc["_id"]]) for db_index, doc in picked if doc["_id"] in full_docs]
+
+        results = [doc for _, doc in picked]
+        if results:
+            last = results[-1]
+            self._remember_cursor(query_key, offset + len(results), (last.get(sort_field), last["_id"]))
+        dbs_checked = sorted({db_index for db_index, _ in picked}, reverse=True)
         return results, dbs_checked, total_count
 
     async def _move_document(
@@ -1078,6 +1688,9 @@ class Database:
             return True
         except Exception as e:
             LOGGER.error(f"Error moving document to {current_db_key}: {e}")
+            #----- A full target shard is the caller's to handle (advance current_db_index)
+            if any(keyword in str(e).lower() for keyword in ["storage", "quota"]):
+                raise
             return False
 
     async def _handle_storage_error(self, func, *args, total_storage_dbs: int) -> Optional[Any]:
@@ -1105,31 +1718,690 @@ class Database:
             return False
         doc["updated_on"] = datetime.utcnow()
         result = await self.dbs[db_key][collection_name].replace_one({"tmdb_id": tmdb_id}, doc)
+        self.invalidate_listings(collection_name)
+        await self._sync_derived(collection_name, doc, db_index)
         return result.modified_count > 0
 
     #----- Locate an existing doc across storage DBs by imdb_id, then tmdb_id, then title+year
     async def _find_existing_media(
-        self, collection_name: str, imdb_id, tmdb_id, title, release_year, total_storage_dbs: int, kitsu_id=None
+        self, collection_name: str, imdb_id, tmdb_id, title, release_year, total_storage_dbs: int, kitsu_id=None,
+        projection: Optional[dict] = None,
     ) -> Tuple[Optional[dict], Optional[str], Optional[int]]:
-        for db_index in range(1, total_storage_dbs + 1):
-            col = self.dbs[f"storage_{db_index}"][collection_name]
+        async def _lookup(db_index, db):
+            col = db[collection_name]
             doc = None
             if imdb_id:
-                doc = await col.find_one({"imdb_id": imdb_id})
+                doc = await col.find_one({"imdb_id": imdb_id}, projection)
             if not doc and tmdb_id:
-                doc = await col.find_one({"tmdb_id": tmdb_id})
+                doc = await col.find_one({"tmdb_id": tmdb_id}, projection)
             if not doc and kitsu_id:
                 try:
                     kid = int(kitsu_id)
-                    doc = await col.find_one({"kitsu_id": kid})
+                    doc = await col.find_one({"kitsu_id": kid}, projection)
                 except (TypeError, ValueError):
                     pass
             if not doc and title and release_year:
-                doc = await col.find_one({"title": title, "release_year": release_year})
-            if doc:
-                return doc, f"storage_{db_index}", db_index
-        return None, None, None
+                doc = await col.find_one({"title": title, "release_year": release_year}, projection)
+            return (doc, f"storage_{db_index}", db_index) if doc else None
+
+        async def _by_title(db_index, db):
+            doc = await db[collection_name].find_one({"title": title, "release_year": release_year}, projection)
+            return (doc, f"storage_{db_index}", db_index) if doc else None
+
+        indexes = [i for i in range(1, total_storage_dbs + 1) if f"storage_{i}" in self.dbs]
+        routed = await self._route_indexes(imdb_id, kitsu_id, tmdb_id, collection_name=collection_name, match_any=True)
+        if routed is not None:
+            #----- Router knows every id-bearing title: probe only its shards, then title+year everywhere
+            found = None
+            if routed:
+                found = await self.fan_out(
+                    _lookup, first_match=True, indexes=sorted(routed), deadline=_FANOUT_WRITE_DEADLINE,
+                    label="find existing media", strict=True,
+                )
+            if not found and title and release_year:
+                found = await self.fan_out(
+                    _by_title, first_match=True, indexes=indexes, deadline=_FANOUT_WRITE_DEADLINE,
+                    label="find existing media", strict=True,
+                )
+            return found or (None, None, None)
+
+        found = await self.fan_out(
+            _lookup, first_match=True, indexes=indexes, deadline=_FANOUT_WRITE_DEADLINE,
+            label="find existing media", strict=True,
+        )
+        return found or (None, None, None)
+
+
+    #-----
+    #----- Stream-id index (tracking.stream_index)
+    #----- _id = quality id -> {db_index, collection, tmdb_id, imdb_id, title, season, episode, refs[{chat_id, msg_id}]}
+    #-----
+    async def _stream_refs(self, quality: dict) -> List[dict]:
+        parts = quality.get("parts")
+        if parts:
+            return [{"chat_id": p.get("chat_id"), "msg_id": p.get("msg_id")} for p in parts]
+        try:
+            decoded = await decode_string(quality.get("id"))
+        except Exception:
+            return []
+        if not isinstance(decoded, dict):
+            return []
+        if decoded.get("parts"):
+            return [{"chat_id": p.get("chat_id"), "msg_id": p.get("msg_id")} for p in decoded["parts"]]
+        if "chat_id" in decoded and "msg_id" in decoded:
+            return [{"chat_id": decoded["chat_id"], "msg_id": decoded["msg_id"]}]
+        return []
+
+    @staticmethod
+    def _doc_streams(collection_name: str, doc: dict, scope: Optional[set] = None) -> Dict[str, tuple]:
+        streams: Dict[str, tuple] = {}
+        if collection_name == "movie":
+            for q in doc.get("telegram") or []:
+                if q.get("id"):
+                    streams[q["id"]] = (None, None, q)
+            return streams
+        for season in doc.get("seasons") or []:
+            for episode in season.get("episodes") or []:
+                key = (season.get("season_number"), episode.get("episode_number"))
+                if scope is not None and key not in scope:
+                    continue
+                for q in episode.get("telegram") or []:
+                    if q.get("id"):
+                        streams[q["id"]] = (key[0], key[1], q)
+        return streams
+
+    #----- Diff a doc's qualities against the index (optionally scoped to (season, episode) pairs)
+    async def _index_doc_streams(self, collection_name: str, doc: dict, db_index: int, scope: Optional[set] = None) -> None:
+        tmdb_id = doc.get("tmdb_id")
+        if tmdb_id is None:
+            return
+        coll = self.dbs["tracking"]["stream_index"]
+        try:
+            streams = self._doc_streams(collection_name, doc, scope)
+            existing_filter = {"collection": collection_name, "tmdb_id": tmdb_id}
+            if scope is not None:
+                if not scope:
+                    return
+                existing_filter["$or"] = [{"season": s, "episode": e} for s, e in scope]
+            existing = set(await coll.distinct("_id", existing_filter))
+
+            ops = []
+            stale = [sid for sid in existing if sid not in streams]
+            if stale:
+                ops.append(DeleteMany({"_id": {"$in": stale}}))
+            for sid, (season, episode, quality) in streams.items():
+                if sid in existing:
+                    continue
+                ops.append(UpdateOne({"_id": sid}, {"$set": {
+                    "db_index": db_index,
+                    "collection": collection_name,
+                    "tmdb_id": tmdb_id,
+                    "imdb_id": doc.get("imdb_id"),
+                    "title": doc.get("title"),
+                    "season": season,
+                    "episode": episode,
+                    "refs": await self._stream_refs(quality),
+                }}, upsert=True))
+            if ops:
+                await coll.bulk_write(ops, ordered=False)
+        except Exception as e:
+            LOGGER.error(f"Stream index update failed for {collection_name} {tmdb_id}: {e}")
+            await self._derived_write_failed()
+
+    #----- Full resync of one title: placement/title refresh + diff, or drop it when the doc is gone
+    async def _reindex_title(self, collection_name: str, tmdb_id, db_index: int) -> None:
+        coll = self.dbs["tracking"]["stream_index"]
+        try:
+            doc = await self.dbs[f"storage_{int(db_index)}"][collection_name].find_one({"tmdb_id": tmdb_id})
+            if not doc:
+                await coll.delete_many({"collection": collection_name, "tmdb_id": tmdb_id})
+                await self._unroute_title(collection_name, tmdb_id)
+                if collection_name == "tv":
+                    await self._drop_episode_docs(tmdb_id)
+                return
+            await coll.update_many(
+                {"collection": collection_name, "tmdb_id": tmdb_id},
+                {"$set": {"db_index": int(db_index), "title": doc.get("title"), "imdb_id": doc.get("imdb_id")}},
+            )
+            if collection_name == "tv":
+                await self._drop_episode_docs(tmdb_id, keep_db_index=int(db_index))
+            await self._sync_derived(collection_name, doc, int(db_index))
+        except Exception as e:
+            LOGGER.error(f"Stream index resync failed for {collection_name} {tmdb_id}: {e}")
+
+    #----- A missed index/route write makes both incomplete: stop trusting them (lookups scan or
+    #----- probe every shard) and rebuild. A failure during a rebuild keeps it from going ready.
+    async def _derived_write_failed(self) -> None:
+        self._derived_failures += 1
+        if not (self.stream_index_ready or self.routes_ready):
+            return
+        self.stream_index_ready = False
+        self.routes_ready = False
+        self._route_cache.clear()
+        try:
+            await self.dbs["tracking"]["state"].update_one(
+                {"_id": "stream_index"}, {"$set": {"built": False, "routes": False}}, upsert=True
+            )
+        except Exception as e:
+            LOGGER.error(f"Failed marking the stream index stale: {e}")
+        if self.start_stream_index_rebuild():
+            LOGGER.warning("Stream index marked stale after a failed write; rebuilding it.")
+
+    async def lookup_stream(self, stream_id: str) -> Optional[dict]:
+        return await self.dbs["tracking"]["stream_index"].find_one({"_id": stream_id})
+
+    async def lookup_stream_ref(self, chat_id: int, msg_id: int) -> Optional[dict]:
+        return await self.dbs["tracking"]["stream_index"].find_one(
+            {"refs": {"$elemMatch": {"chat_id": chat_id, "msg_id": msg_id}}}
+        )
+
+    #----- Message ids of one chat in [lo, hi] that are already indexed, in a single query on the
+    #----- refs index (covers every storage DB). None while the stream index is not ready.
+    async def indexed_msg_ids(self, chat_id: int, lo: int, hi: int) -> Optional[set]:
+        if not self.stream_index_ready:
+            return None
+        found = set()
+        entries = self.dbs["tracking"]["stream_index"].find(
+            {"refs": {"$elemMatch": {"chat_id": chat_id, "msg_id": {"$gte": lo, "$lte": hi}}}},
+            {"_id": 0, "refs": 1},
+        )
+        async for entry in entries:
+            for ref in entry.get("refs") or []:
+                msg_id = ref.get("msg_id")
+                if ref.get("chat_id") == chat_id and isinstance(msg_id, int) and lo <= msg_id <= hi:
+                    found.add(msg_id)
+        return found
+
+    #----- Rebuild tracking.stream_index from every storage DB (lookups fall back to scans meanwhile)
+    async def rebuild_stream_index(self) -> Dict[str, Any]:
+        state = self.dbs["tracking"]["state"]
+        coll = self.dbs["tracking"]["stream_index"]
+        self.stream_index_ready = False
+        self.routes_ready = False
+        await state.update_one({"_id": "stream_index"}, {"$set": {"built": False, "routes": False}}, upsert=True)
+        indexed = 0
+        self._derived_failures = 0
+        try:
+            await coll.delete_many({})
+            await self.dbs["tracking"]["shard_routes"].delete_many({})
+            await self.dbs["tracking"]["library_counters"].delete_many({})
+            self._route_cache.clear()
+            for i in range(1, self.current_db_index + 1):
+                db_key = f"storage_{i}"
+                if db_key not in self.dbs:
+                    continue
+                for collection_name in ("movie", "tv"):
+                    async for doc in self.dbs[db_key][collection_name].find({}):
+                        await self._index_doc_streams(collection_name, doc, i)
+                        await self._route_title(collection_name, doc, i)
+                        indexed += len(self._doc_streams(collection_name, doc))
+        except Exception as e:
+            LOGGER.error(f"Stream index rebuild failed: {e}")
+            return {"ok": False, "message": str(e), "indexed": indexed}
+        if self._derived_failures:
+            message = f"{self._derived_failures} index write(s) failed; lookups keep scanning every shard"
+            LOGGER.error(f"Stream index rebuild incomplete: {message}")
+            return {"ok": False, "message": message, "indexed": indexed}
+
+        await state.update_one(
+            {"_id": "stream_index"},
+            {"$set": {"built": True, "routes": True, "built_at": datetime.utcnow(), "entries": indexed}},
+            upsert=True,
+        )
+        self.stream_index_ready = True
+        self.routes_ready = True
+        LOGGER.info(f"Stream index rebuilt: {indexed} entries.")
+        return {"ok": True, "indexed": indexed}
+
+    def start_stream_index_rebuild(self) -> bool:
+        if self._stream_index_task and not self._stream_index_task.done():
+            return False
+        self._stream_index_task = create_task(self._run_long_job(self.rebuild_stream_index()))
+        return True
+
+    async def get_stream_index_status(self) -> Dict[str, Any]:
+        doc = await self.dbs["tracking"]["state"].find_one({"_id": "stream_index"}) or {}
+        return {
+            "ready": self.stream_index_ready,
+            "running": bool(self._stream_index_task and not self._stream_index_task.done()),
+            "built_at": doc.get("built_at").isoformat() if doc.get("built_at") else None,
+            "entries": await self.dbs["tracking"]["stream_index"].estimated_document_count(),
+            "routes": await self.dbs["tracking"]["shard_routes"].estimated_document_count(),
+        }
+
+    #-----
+    #----- Shard router (tracking.shard_routes), cached in memory
+    #----- _id = "collection:tmdb_id" -> {collection, tmdb_id, imdb_id, kitsu_id, db_index}
+    #-----
+    def _forget_routes(self, *routes: Optional[dict]) -> None:
+        for route in routes:
+            if not route:
+                continue
+            self._route_cache.pop(("tmdb_id", route.get("tmdb_id")), None)
+            self._route_cache.pop(("imdb_id", route.get("imdb_id")), None)
+            self._route_cache.pop(("kitsu_id", route.get("kitsu_id")), None)
+
+    async def _route_title(self, collection_name: str, doc: dict, db_index: int) -> None:
+        tmdb_id = doc.get("tmdb_id")
+        if tmdb_id is None:
+            return
+        route = {
+            "collection": collection_name,
+            "tmdb_id": tmdb_id,
+            "imdb_id": doc.get("imdb_id"),
+            "kitsu_id": doc.get("kitsu_id"),
+            "db_index": int(db_index),
+            "totals": self._title_totals(collection_name, doc),
+        }
+        try:
+            old = await self.dbs["tracking"]["shard_routes"].find_one_and_replace(
+                {"_id": f"{collection_name}:{tmdb_id}"}, route, upsert=True
+            )
+            self._forget_routes(old, route)
+            await self._shift_counters(old, route)
+        except Exception as e:
+            LOGGER.error(f"Shard route update failed for {collection_name} {tmdb_id}: {e}")
+            await self._derived_write_failed()
+
+    async def _unroute_title(self, collection_name: str, tmdb_id) -> None:
+        if tmdb_id is None:
+            return
+        try:
+            old = await self.dbs["tracking"]["shard_routes"].find_one_and_delete({"_id": f"{collection_name}:{tmdb_id}"})
+            self._forget_routes(old)
+            await self._shift_counters(old, None)
+        except Exception as e:
+            LOGGER.error(f"Shard route removal failed for {collection_name} {tmdb_id}: {e}")
+
+    async def _routes_for(self, field: str, value) -> List[Tuple[str, int]]:
+        key = (field, value)
+        cached = self._route_cache.get(key)
+        if cached is None:
+            cursor = self.dbs["tracking"]["shard_routes"].find({field: value}, {"collection": 1, "db_index": 1})
+            cached = [(route["collection"], route["db_index"]) async for route in cursor]
+            if len(self._route_cache) >= _ROUTE_CACHE_MAX:
+                self._route_cache.pop(next(iter(self._route_cache)))
+            self._route_cache[key] = cached
+        return cached
+
+    #----- Owning shards for a title, newest first. None while the router is unbuilt (probe every shard).
+    #----- Readers route by imdb_id, else kitsu_id, else tmdb_id; match_any unions every id given.
+    async def _route_indexes(
+        self,
+        imdb_id: Optional[str] = None,
+        kitsu_id: Optional[int] = None,
+        tmdb_id: Optional[int] = None,
+        collection_name: Optional[str] = None,
+        match_any: bool = False,
+    ) -> Optional[List[int]]:
+        if not self.routes_ready:
+            return None
+        keys = []
+        if imdb_id:
+            keys.append(("imdb_id", imdb_id))
+        if kitsu_id is not None and (match_any or not keys):
+            try:
+                keys.append(("kitsu_id", int(kitsu_id)))
+            except (TypeError, ValueError):
+                pass
+        if tmdb_id is not None and (match_any or not keys):
+            keys.append(("tmdb_id", tmdb_id))
+        try:
+            indexes = set()
+            for field, value in keys:
+                for collection, db_index in await self._routes_for(field, value):
+                    if collection_name in (None, collection) and f"storage_{db_index}" in self.dbs:
+                        indexes.add(db_index)
+            return sorted(indexes, reverse=True)
+        except Exception as e:
+            LOGGER.error(f"Shard route lookup failed: {e}")
+            return None
+
+    #----- Measured fill (dataSize + indexSize vs the configured quota) per storage DB
+    async def refresh_shard_fill(self, force: bool = False) -> Dict[int, dict]:
+        if not force and time.monotonic() - self._shard_fill_at < _SHARD_FILL_TTL:
+            return self._shard_fill
+        quota = SettingsManager.current().storage_quota_mb * 1024 * 1024
+
+        async def _measure(_, db):
+            stats = await db.command("dbStats")
+            used = int(stats.get("dataSize", 0)) + int(stats.get("indexSize", 0))
+            return {"used_bytes": used, "data_bytes": int(stats.get("dataSize", 0)), "fill": used / quota}
+
+        indexes = sorted(int(key.split("_")[1]) for key in self.dbs.keys() if key.startswith("storage_"))
+        measured = await self.fan_out(_measure, indexes=indexes, label="shard fill")
+        self._shard_fill = {i: fill for i, fill in measured}
+        self._shard_fill_at = time.monotonic()
+        return self._shard_fill
+
+    #----- Quota changed: drop the measured fill so the next write re-measures every shard
+    def reset_shard_fill(self) -> None:
+        self._shard_fill_at = 0.0
+
+    def _shard_full(self, db_index: int) -> bool:
+        return (self._shard_fill.get(db_index) or {}).get("fill", 0) >= _SHARD_FILL_LIMIT
+
+    #----- Advance the active shard before it hits its quota instead of waiting for a write error
+    async def _maybe_advance_shard(self) -> None:
+        try:
+            await self.refresh_shard_fill()
+        except Exception as e:
+            LOGGER.error(f"Shard fill refresh failed: {e}")
+            return
+        while self._shard_full(self.current_db_index) and f"storage_{self.current_db_index + 1}" in self.dbs:
+            fill = self._shard_fill[self.current_db_index]["fill"]
+            self.current_db_index += 1
+            await self.update_current_db_index()
+            LOGGER.info(f"storage_{self.current_db_index - 1} is {fill:.0%} full; new titles go to storage_{self.current_db_index}")
+
+    #-----
+    #----- Library counters (tracking.library_counters), one doc per storage DB
+    #----- _id = "storage_N" -> {movies, shows, episodes, streams, bytes}. Each route carries its
+    #----- title's totals, so every route write $inc's the owning shard(s) by the difference.
+    #-----
+    @staticmethod
+    def _title_totals(collection_name: str, doc: dict) -> Dict[str, int]:
+        totals = {"movies": 0, "shows": 0, "episodes": 0, "streams": 0, "bytes": 0}
+        if collection_name == "movie":
+            totals["movies"] = 1
+            qualities = doc.get("telegram") or []
+        else:
+            totals["shows"] = 1
+            qualities = []
+            for season in doc.get("seasons") or []:
+                for episode in season.get("episodes") or []:
+                    totals["episodes"] += 1
+                    qualities.extend(episode.get("telegram") or [])
+        totals["streams"] = len(qualities)
+        totals["bytes"] = sum(_quality_bytes(q) for q in qualities)
+        return totals
+
+    async def _shift_counters(self, old_route: Optional[dict], new_route: Optional[dict]) -> None:
+        deltas: Dict[int, Dict[str, int]] = {}
+        for route, sign in ((old_route, -1), (new_route, 1)):
+            if not route or not route.get("totals"):
+                continue
+            bucket = deltas.setdefault(int(route["db_index"]), {})
+            for field, value in route["totals"].items():
+                bucket[field] = bucket.get(field, 0) + sign * int(value or 0)
+        coll = self.dbs["tracking"]["library_counters"]
+        for db_index, inc in deltas.items():
+            inc = {field: value for field, value in inc.items() if value}
+            if inc:
+                await coll.update_one(
+                    {"_id": f"storage_{db_index}"},
+                    {"$inc": inc, "$set": {"updated_at": datetime.utcnow()}},
+                    upsert=True,
+                )
 
+    async def get_library_counters(self) -> Dict[int, Dict[str, int]]:
+        counters: Dict[int, Dict[str, int]] = {}
+        async for doc in self.dbs["tracking"]["library_counters"].find({}):
+            try:
+                db_index = int(str(doc["_id"]).split("_")[1])
+            except (IndexError, ValueError):
+                continue
+            counters[db_index] = {field: int(doc.get(field) or 0) for field in _COUNTER_FIELDS}
+        return counters
+
+    async def get_library_totals(self) -> Dict[str, int]:
+        totals = dict.fromkeys(_COUNTER_FIELDS, 0)
+        for shard in (await self.get_library_counters()).values():
+            for field in _COUNTER_FIELDS:
+                totals[field] += shard[field]
+        return totals
+
+    #----- Recount every shard from the docs and rewrite route totals + counters (drift repair)
+    async def reconcile_library_counters(self) -> Dict[str, Any]:
+        async with self.long_job():
+            return await self._reconcile_library_counters()
+
+    async def _reconcile_library_counters(self) -> Dict[str, Any]:
+        if self._stream_index_task and not self._stream_index_task.done():
+            return {"ok": False, "message": "Stream index rebuild in progress"}
+        routes = self.dbs["tracking"]["shard_routes"]
+        counters = self.dbs["tracking"]["library_counters"]
+        fixed = 0
+        try:
+            for i in self._storage_indexes():
+                shard = dict.fromkeys(_COUNTER_FIELDS, 0)
+                for collection_name in ("movie", "tv"):
+                    projection = _COUNTER_PROJECTIONS[collection_name]
+                    stored = {
+                        r["_id"]: r.get("totals")
+                        async for r in routes.find({"collection": collection_name, "db_index": i}, {"totals": 1})
+                    }
+                    ops = []
+                    async for doc in self.dbs[f"storage_{i}"][collection_name].find({}, projection):
+                        if doc.get("tmdb_id") is None:
+                            continue
+                        totals = self._title_totals(collection_name, doc)
+                        for field in _COUNTER_FIELDS:
+                            shard[field] += totals[field]
+                        route_id = f"{collection_name}:{doc['tmdb_id']}"
+                        if stored.get(route_id) != totals:
+                            ops.append(UpdateOne({"_id": route_id}, {"$set": {"totals": totals}}))
+                        if len(ops) >= 500:
+                            await routes.bulk_write(ops, ordered=False)
+                            fixed += len(ops)
+                            ops = []
+                    if ops:
+                        await routes.bulk_write(ops, ordered=False)
+                        fixed += len(ops)
+                await counters.replace_one(
+                    {"_id": f"storage_{i}"}, {**shard, "updated_at": datetime.utcnow()}, upsert=True
+                )
+        except Exception as e:
+            LOGGER.error(f"Library counter reconciliation failed: {e}")
+            return {"ok": False, "message": str(e)}
+        if fixed:
+            LOGGER.info(f"Library counters reconciled ({fixed} title totals corrected).")
+        return {"ok": True, "fixed": fixed}
+
+    async def _counter_reconcile_loop(self) -> None:
+        #----- First boot has no counters yet: seed them as soon as the stream index allows
+        try:
+            seeded = await self.dbs["tracking"]["library_counters"].estimated_document_count() > 0
+        except Exception as e:
+            LOGGER.warning(f"Library counter check failed: {e}")
+            seeded = True
+        while not seeded:
+            seeded = (await self.reconcile_library_counters()).get("ok")
+            if not seeded:
+                await asyncio_sleep(_COUNTER_SEED_RETRY)
+        await asyncio_sleep(_COUNTER_RECONCILE_DELAY)
+        while True:
+            await self.reconcile_library_counters()
+            await asyncio_sleep(_COUNTER_RECONCILE_INTERVAL)
+
+    def start_counter_reconciler(self) -> None:
+        if self._counter_task is None or self._counter_task.done():
+            self._counter_task = create_task(self._counter_reconcile_loop())
+
+    #-----
+    #----- Normalized episode store (storage_N.episodes, opt-in via Settings.episode_collection)
+    #----- The TV doc stays the source of truth; each episode is mirrored as its own small doc
+    #----- _id = "tmdb_id:season:episode" -> {show ids, show_title, is_anime, season_number, episode fields}
+    #-----
+    def episode_reads_ready(self) -> bool:
+        return self.episode_store_ready and SettingsManager.current().episode_collection
+
+    #----- Mirror a TV doc's episodes (optionally scoped to (season, episode) pairs) into its shard
+    async def _sync_episode_docs(self, doc: dict, db_index: int, scope: Optional[set] = None) -> None:
+        if not SettingsManager.current().episode_collection:
+            return
+        tmdb_id = doc.get("tmdb_id")
+        if tmdb_id is None or (scope is not None and not scope):
+            return
+        coll = self.dbs[f"storage_{int(db_index)}"]["episodes"]
+        try:
+            show = {
+                "tmdb_id": tmdb_id,
+                "imdb_id": doc.get("imdb_id"),
+                "kitsu_id": doc.get("kitsu_id"),
+                "show_title": doc.get("title"),
+                "is_anime": doc.get("is_anime"),
+                "db_index": int(db_index),
+            }
+            wanted: Dict[str, dict] = {}
+            for season in doc.get("seasons") or []:
+                for episode in season.get("episodes") or []:
+                    key = (season.get("season_number"), episode.get("episode_number"))
+                    if scope is not None and key not in scope:
+                        continue
+                    #----- Only $set what the caller holds (ingest merges load a projected doc)
+                    fields = {k: episode[k] for k in _EPISODE_FIELDS if k in episode}
+                    fields.update(show)
+                    fields["season_number"] = key[0]
+                    wanted[f"{tmdb_id}:{key[0]}:{key[1]}"] = fields
+
+            existing_filter: Dict[str, Any] = {"tmdb_id": tmdb_id}
+            if scope is not None:
+                existing_filter["_id"] = {"$in": [f"{tmdb_id}:{s}:{e}" for s, e in scope]}
+            existing = set(await coll.distinct("_id", existing_filter))
+
+            ops = []
+            stale = [eid for eid in existing if eid not in wanted]
+            if stale:
+                ops.append(DeleteMany({"_id": {"$in": stale}}))
+            for eid, fields in wanted.items():
+                ops.append(UpdateOne({"_id": eid}, {"$set": fields}, upsert=True))
+            if ops:
+                await coll.bulk_write(ops, ordered=False)
+        except Exception as e:
+            LOGGER.error(f"Episode store sync failed for tv {tmdb_id} in storage_{db_index}: {e}")
+
+    #----- Drop a show's episode docs from every shard (or every shard but keep_db_index)
+    async def _drop_episode_docs(self, tmdb_id, keep_db_index: Optional[int] = None) -> None:
+        if tmdb_id is None or not SettingsManager.current().episode_collection:
+            return
+        for db_key in list(self.dbs.keys()):
+            if not db_key.startswith("storage_") or db_key == f"storage_{keep_db_index}":
+                continue
+            try:
+                await self.dbs[db_key]["episodes"].delete_many({"tmdb_id": tmdb_id})
+            except Exception as e:
+                LOGGER.error(f"Episode store cleanup failed for tv {tmdb_id} in {db_key}: {e}")
+
+    #----- Every derived index a media write must keep in step with the doc
+    async def _sync_derived(self, collection_name: str, doc: dict, db_index: int, scope: Optional[set] = None) -> None:
+        await self._index_doc_streams(collection_name, doc, db_index, scope=scope)
+        await self._route_title(collection_name, doc, db_index)
+        if collection_name == "tv":
+            await self._sync_episode_docs(doc, db_index, scope=scope)
+
+    #----- Episode-level get_media_details answered from the episode store (same result shape)
+    async def _episode_store_details(
+        self, imdb_id, kitsu_id, season_number: Optional[int], episode_number: Optional[int], absolute_episode: Optional[int]
+    ) -> Optional[dict]:
+        if imdb_id:
+            ident = {"imdb_id": imdb_id}
+        elif kitsu_id is not None:
+            ident = {"kitsu_id": int(kitsu_id)}
+        else:
+            return None
+
+        async def _lookup(db_idx, db):
+            coll = db["episodes"]
+            doc = None
+            if absolute_episode is not None:
+                doc = await coll.find_one({**ident, "absolute_episode": absolute_episode})
+                if not doc and season_number is None and episode_number is None:
+                    doc = await coll.find_one({**ident, "season_number": 1, "episode_number": absolute_episode})
+                    if doc:
+                        doc["absolute_episode"] = absolute_episode
+            if not doc and season_number is not None and episode_number is not None:
+                doc = await coll.find_one({**ident, "season_number": season_number, "episode_number": episode_number})
+            if not doc:
+                return None
+
+            details = {k: doc[k] for k in _EPISODE_FIELDS if k in doc}
+            details.update({
+                "imdb_id": doc.get("imdb_id") or imdb_id,
+                "kitsu_id": doc.get("kitsu_id") or kitsu_id,
+                "type": "tv",
+                "title": doc.get("show_title"),
+                "is_anime": doc.get("is_anime"),
+                "season_number": doc.get("season_number"),
+                "episode_number": doc.get("episode_number"),
+                "absolute_episode": doc.get("absolute_episode"),
+                "backdrop": doc.get("episode_backdrop"),
+                "db_index": db_idx
+            })
+            return details
+
+        routed = await self._route_indexes(imdb_id, kitsu_id, collection_name="tv")
+        return await self.fan_out(_lookup, first_match=True, newest_first=True, indexes=routed, label="episode store", reads=True)
+
+    #----- Copy every TV doc into the episode store (reads stay on TV docs until it finishes)
+    async def migrate_episode_store(self) -> Dict[str, Any]:
+        state = self.dbs["tracking"]["state"]
+        self.episode_store_ready = False
+        await state.update_one({"_id": "episode_store"}, {"$set": {"built": False}}, upsert=True)
+        shows = 0
+        episodes = 0
+        try:
+            for i in range(1, self.current_db_index + 1):
+                db_key = f"storage_{i}"
+                if db_key not in self.dbs:
+                    continue
+                await self.dbs[db_key]["episodes"].delete_many({})
+                async for doc in self.dbs[db_key]["tv"].find({}, {"cast": 0, "description": 0}):
+                    await self._sync_episode_docs(doc, i)
+                    shows += 1
+                    episodes += sum(len(s.get("episodes") or []) for s in doc.get("seasons") or [])
+        except Exception as e:
+            LOGGER.error(f"Episode store migration failed: {e}")
+            return {"ok": False, "message": str(e), "shows": shows, "episodes": episodes}
+
+        if not SettingsManager.current().episode_collection:
+            return {"ok": False, "message": "Episode collection was disabled during migration", "shows": shows, "episodes": episodes}
+
+        await state.update_one(
+            {"_id": "episode_store"},
+            {"$set": {"built": True, "built_at": datetime.utcnow(), "shows": shows, "episodes": episodes}},
+            upsert=True,
+        )
+        self.episode_store_ready = True
+        LOGGER.info(f"Episode store migrated: {episodes} episodes across {shows} shows.")
+        return {"ok": True, "shows": shows, "episodes": episodes}
+
+    def start_episode_store_migration(self) -> bool:
+        if self._episode_store_task and not self._episode_store_task.done():
+            return False
+        self._episode_store_task = create_task(self._run_long_job(self.migrate_episode_store()))
+        return True
+
+    #----- Stop reading/maintaining the store and free its space (TV docs were never changed)
+    async def retire_episode_store(self) -> None:
+        self.episode_store_ready = False
+        await self.dbs["tracking"]["state"].update_one(
+            {"_id": "episode_store"}, {"$set": {"built": False}}, upsert=True
+        )
+        for db_key in list(self.dbs.keys()):
+            if db_key.startswith("storage_"):
+                try:
+                    await self.dbs[db_key]["episodes"].delete_many({})
+                except Exception as e:
+                    LOGGER.error(f"Episode store cleanup failed in {db_key}: {e}")
+
+    async def get_episode_store_status(self) -> Dict[str, Any]:
+        doc = await self.dbs["tracking"]["state"].find_one({"_id": "episode_store"}) or {}
+        total = 0
+        for db_key in list(self.dbs.keys()):
+            if db_key.startswith("storage_"):
+                try:
+                    total += await self.dbs[db_key]["episodes"].estimated_document_count()
+                except Exception:
+                    pass
+        return {
+            "enabled": SettingsManager.current().episode_collection,
+            "ready": self.episode_store_ready,
+            "running": bool(self._episode_store_task and not self._episode_store_task.done()),
+            "built_at": doc.get("built_at").isoformat() if doc.get("built_at") else None,
+            "shows": doc.get("shows", 0),
+            "episodes": total,
+        }
 
     #-----
     #----- Multi Database Method for insert/update/delete/list
@@ -1150,9 +2422,15 @@ class Database:
         self, channel: int, msg_id: int
     ) -> Optional[Tuple[Optional[str], Optional[int]]]:
         try:
-            legacy_hash = await encode_string({"chat_id": channel, "msg_id": msg_id})
+            legacy_hashes = await stream_id_variants(channel, msg_id)
         except Exception:
-            legacy_hash = None
+            legacy_hashes = []
+
+        if self.stream_index_ready:
+            entry = await self.lookup_stream_ref(channel, msg_id)
+            if not entry:
+                return None
+            return entry.get("imdb_id"), entry.get("tmdb_id")
 
         part_match = {"$elemMatch": {"chat_id": channel, "msg_id": msg_id}}
         projection = {"imdb_id": 1, "tmdb_id": 1}
@@ -1162,9 +2440,9 @@ class Database:
 
             movie_or = [{"telegram.parts": part_match}]
             tv_or = [{"seasons.episodes.telegram.parts": part_match}]
-            if legacy_hash:
-                movie_or.append({"telegram.id": legacy_hash})
-                tv_or.append({"seasons.episodes.telegram.id": legacy_hash})
+            if legacy_hashes:
+                movie_or.append({"telegram.id": {"$in": legacy_hashes}})
+                tv_or.append({"seasons.episodes.telegram.id": {"$in": legacy_hashes}})
 
             doc = await db["movie"].find_one({"$or": movie_or}, projection)
             if not doc:
@@ -1176,18 +2454,28 @@ class Database:
 
     async def remove_media_part(self, channel: int, msg_id: int) -> bool:
         try:
-            legacy_hash = await encode_string({"chat_id": channel, "msg_id": msg_id})
-            if await self.delete_media_by_stream_id(legacy_hash):
-                return True
+            for legacy_hash in await stream_id_variants(channel, msg_id):
+                if await self.delete_media_by_stream_id(legacy_hash):
+                    return True
         except Exception as e:
             LOGGER.error(f"remove_media_part: legacy lookup failed: {e}")
 
-        for i in range(1, self.current_db_index + 1):
+        if self.stream_index_ready:
+            entry = await self.lookup_stream_ref(channel, msg_id)
+            if not entry:
+                return False
+            targets = [(entry["db_index"], entry["collection"])]
+        else:
+            targets = [(i, c) for i in range(1, self.current_db_index + 1) for c in ("movie", "tv")]
+
+        for i, collection_name in targets:
             db = self.dbs[f"storage_{i}"]
 
-            movie = await db["movie"].find_one(
-                {"telegram.parts": {"$elemMatch": {"chat_id": channel, "msg_id": msg_id}}}
-            )
+            movie = None
+            if collection_name == "movie":
+                movie = await db["movie"].find_one(
+                    {"telegram.parts": {"$elemMatch": {"chat_id": channel, "msg_id": msg_id}}}
+                )
             if movie:
                 new_telegram = []
                 for q in movie.get("telegram", []):
@@ -1209,11 +2497,15 @@ class Database:
                     movie["telegram"] = new_telegram
                     movie["updated_on"] = datetime.utcnow()
                     await db["movie"].replace_one({"_id": movie["_id"]}, movie)
+                self.invalidate_listings("movie")
+                await self._reindex_title("movie", movie.get("tmdb_id"), i)
                 return True
 
-            tv = await db["tv"].find_one(
-                {"seasons.episodes.telegram.parts": {"$elemMatch": {"chat_id": channel, "msg_id": msg_id}}}
-            )
+            tv = None
+            if collection_name == "tv":
+                tv = await db["tv"].find_one(
+                    {"seasons.episodes.telegram.parts": {"$elemMatch": {"chat_id": channel, "msg_id": msg_id}}}
+                )
             if tv:
                 for season in tv.get("seasons", []):
                     for episode in season.get("episodes", []):
@@ -1239,10 +2531,83 @@ class Database:
                 else:
                     tv["updated_on"] = datetime.utcnow()
                     await db["tv"].replace_one({"_id": tv["_id"]}, tv)
+                self.invalidate_listings("tv")
+                await self._reindex_title("tv", tv.get("tmdb_id"), i)
                 return True
 
         return False
 
+    #----- Drop every quality backed by one channel (rescan), keeping the stream index, router,
+    #----- counters, episode mirror and listing caches in step. Returns the qualities removed.
+    async def purge_channel(self, channel: int) -> int:
+        try:
+            await self.dbs["tracking"]["subtitles"].delete_many({"chat_id": channel})
+        except Exception as e:
+            LOGGER.warning(f"Subtitle purge failed for {channel}: {e}")
+
+        stream_index = self.dbs["tracking"]["stream_index"]
+        if self.stream_index_ready:
+            titles = set()
+            async for entry in stream_index.find(
+                {"refs.chat_id": channel}, {"db_index": 1, "collection": 1, "tmdb_id": 1}
+            ):
+                titles.add((entry["db_index"], entry["collection"], entry["tmdb_id"]))
+            targets = [
+                (db_index, collection_name, {"tmdb_id": tmdb_id})
+                for db_index, collection_name, tmdb_id in sorted(titles, key=str)
+            ]
+        else:
+            targets = [(i, c, {}) for i in range(1, self.current_db_index + 1) for c in ("movie", "tv")]
+
+        purged = 0
+        for db_index, collection_name, query in targets:
+            db = self.dbs.get(f"storage_{db_index}")
+            if db is None:
+                continue
+            async for doc in db[collection_name].find(query):
+                removed = await self._strip_channel(collection_name, doc, channel)
+                if not removed:
+                    continue
+                purged += removed
+                if collection_name == "movie":
+                    empty = not doc.get("telegram")
+                else:
+                    empty = not doc.get("seasons")
+                if empty:
+                    await db[collection_name].delete_one({"_id": doc["_id"]})
+                    await self.purge_media_from_catalogs(doc.get("tmdb_id"), collection_name)
+                else:
+                    doc["updated_on"] = datetime.utcnow()
+                    await db[collection_name].replace_one({"_id": doc["_id"]}, doc)
+                await self._reindex_title(collection_name, doc.get("tmdb_id"), db_index)
+
+        #----- Anything still pointing at the channel (refs the docs no longer carry) would read as a dup
+        await stream_index.delete_many({"refs.chat_id": channel})
+        self.invalidate_listings()
+        return purged
+
+    async def _strip_channel(self, collection_name: str, doc: dict, channel: int) -> int:
+        async def _keep(qualities: list) -> Tuple[list, int]:
+            kept = []
+            for q in qualities or []:
+                refs = await self._stream_refs(q)
+                if any(ref.get("chat_id") == channel for ref in refs):
+                    continue
+                kept.append(q)
+            return kept, len(qualities or []) - len(kept)
+
+        if collection_name == "movie":
+            doc["telegram"], removed = await _keep(doc.get("telegram"))
+            return removed
+        removed = 0
+        for season in doc.get("seasons", []):
+            for episode in season.get("episodes", []):
+                episode["telegram"], dropped = await _keep(episode.get("telegram"))
+                removed += dropped
+            season["episodes"] = [e for e in season.get("episodes", []) if e.get("telegram")]
+        doc["seasons"] = [s for s in doc.get("seasons", []) if s.get("episodes")]
+        return removed
+
     async def insert_media(
         self, metadata_info: dict,
         channel: int, msg_id: int, size: str, name: str, raw_size: int = 0,
@@ -1313,7 +2678,7 @@ class Database:
                 origin_country=metadata_info.get('origin_country', []) or [],
                 telegram=[quality_detail]
             )
-            return await self.update_movie(media, status)
+            result = await self.update_movie(media, status)
         else:
             tv_show = TVShowSchema(
                 tmdb_id=metadata_info['tmdb_id'],
@@ -1350,7 +2715,10 @@ class Database:
                     )]
                 )]
             )
-            return await self.update_tv_show(tv_show, status)
+            result = await self.update_tv_show(tv_show, status)
+
+        self.invalidate_listings("movie" if metadata_info['media_type'] == "movie" else "tv", single_row=True)
+        return result
 
     async def _delete_split_part(self, part: dict) -> None:
         try:
@@ -1481,11 +2849,13 @@ class Database:
 
         quality_to_update = movie_dict["telegram"][0]
 
+        await self._maybe_advance_shard()
         current_db_key = f"storage_{self.current_db_index}"
         total_storage_dbs = len(self.dbs) - 1
 
         existing_movie, existing_db_key, existing_db_index = await self._find_existing_media(
-            "movie", imdb_id, tmdb_id, title, release_year, total_storage_dbs, kitsu_id=kitsu_id
+            "movie", imdb_id, tmdb_id, title, release_year, total_storage_dbs, kitsu_id=kitsu_id,
+            projection=_MERGE_PROJECTION,
         )
 
         #----- INSERT NEW MOVIE ----------------
@@ -1493,6 +2863,7 @@ class Database:
             try:
                 movie_dict["db_index"] = self.current_db_index
                 result = await self.dbs[current_db_key]["movie"].insert_one(movie_dict)
+                await self._sync_derived("movie", movie_dict, self.current_db_index)
                 return result.inserted_id
             except Exception as e:
                 LOGGER.error(f"Insertion failed in {current_db_key}: {e}")
@@ -1500,43 +2871,29 @@ class Database:
                     return await self._handle_storage_error(self.update_movie, movie_data, total_storage_dbs=total_storage_dbs)
                 return None
 
-        #----- UPDATE MOVIE ----------------
+        #----- UPDATE MOVIE (targeted $set of the identity fields + quality list) ----------------
         movie_id = existing_movie["_id"]
-
-        if imdb_id and not existing_movie.get("imdb_id"):
-            existing_movie["imdb_id"] = imdb_id
-        if tmdb_id and not existing_movie.get("tmdb_id"):
-            existing_movie["tmdb_id"] = tmdb_id
-        if kitsu_id and not existing_movie.get("kitsu_id"):
-            existing_movie["kitsu_id"] = kitsu_id
-        if movie_dict.get("is_anime"):
-            existing_movie["is_anime"] = True
-
-        existing_qualities = existing_movie.get("telegram", [])
+        set_fields = self._identity_backfill(existing_movie, imdb_id, tmdb_id, kitsu_id, movie_dict.get("is_anime"))
 
         existing_qualities = await self._apply_quality_update(
-            existing_qualities, quality_to_update, self._is_personal_tmdb(tmdb_id), status
+            existing_movie.get("telegram", []), quality_to_update, self._is_personal_tmdb(tmdb_id), status
         )
-
         existing_movie["telegram"] = existing_qualities
-        existing_movie["updated_on"] = datetime.utcnow()
-
-        if existing_db_index != self.current_db_index:
-            try:
-                if await self._move_document("movie", existing_movie, existing_db_index):
-                    return movie_id
-            except Exception as e:
-                LOGGER.error(f"Error moving movie to {current_db_key}: {e}")
-                if any(keyword in str(e).lower() for keyword in ["storage", "quota"]):
-                    return await self._handle_storage_error(self.update_movie, movie_data, total_storage_dbs=total_storage_dbs)
+        set_fields["telegram"] = existing_qualities
+        set_fields["updated_on"] = datetime.utcnow()
 
         try:
-            await self.dbs[existing_db_key]["movie"].replace_one({"_id": movie_id}, existing_movie)
-            return movie_id
+            await self.dbs[existing_db_key]["movie"].update_one({"_id": movie_id}, {"$set": set_fields})
+            await self._sync_derived("movie", existing_movie, existing_db_index)
         except Exception as e:
             LOGGER.error(f"Failed to update movie {tmdb_id} in {existing_db_key}: {e}")
             if any(keyword in str(e).lower() for keyword in ["storage", "quota"]):
                 return await self._handle_storage_error(self.update_movie, movie_data, total_storage_dbs=total_storage_dbs)
+            return None
+
+        if existing_db_index != self.current_db_index and self._shard_full(existing_db_index):
+            await self._relocate_to_current("movie", movie_id, existing_db_index, total_storage_dbs)
+        return movie_id
 
     async def update_tv_show(self, tv_show_data: TVShowSchema, status: Optional[dict] = None) -> Optional[ObjectId]:
         try:
@@ -1551,11 +2908,13 @@ class Database:
         title = tv_show_dict["title"]
         release_year = tv_show_dict["release_year"]
 
+        await self._maybe_advance_shard()
         current_db_key = f"storage_{self.current_db_index}"
         total_storage_dbs = len(self.dbs) - 1
 
         existing_tv, existing_db_key, existing_db_index = await self._find_existing_media(
-            "tv", imdb_id, tmdb_id, title, release_year, total_storage_dbs, kitsu_id=kitsu_id
+            "tv", imdb_id, tmdb_id, title, release_year, total_storage_dbs, kitsu_id=kitsu_id,
+            projection=_MERGE_PROJECTION,
         )
 
         #----- INSERT NEW TV ----------------
@@ -1563,6 +2922,7 @@ class Database:
             try:
                 tv_show_dict["db_index"] = self.current_db_index
                 result = await self.dbs[current_db_key]["tv"].insert_one(tv_show_dict)
+                await self._sync_derived("tv", tv_show_dict, self.current_db_index)
                 return result.inserted_id
             except Exception as e:
                 LOGGER.error(f"Insertion failed in {current_db_key}: {e}")
@@ -1570,27 +2930,25 @@ class Database:
                     return await self._handle_storage_error(self.update_tv_show, tv_show_data, total_storage_dbs=total_storage_dbs)
                 return None
 
-        #----- UPDATE TV ----------------
+        #----- UPDATE TV (merge in memory, persist only the touched seasons/episodes) ----------------
         tv_id = existing_tv["_id"]
+        set_fields = self._identity_backfill(existing_tv, imdb_id, tmdb_id, kitsu_id, tv_show_dict.get("is_anime"))
+        existing_tv.setdefault("seasons", [])
 
-        if imdb_id and not existing_tv.get("imdb_id"):
-            existing_tv["imdb_id"] = imdb_id
-        if tmdb_id and not existing_tv.get("tmdb_id"):
-            existing_tv["tmdb_id"] = tmdb_id
-        if kitsu_id and not existing_tv.get("kitsu_id"):
-            existing_tv["kitsu_id"] = kitsu_id
-        if tv_show_dict.get("is_anime"):
-            existing_tv["is_anime"] = True
-
+        ops: List[UpdateOne] = []
+        touched = set()
         for season in tv_show_dict["seasons"]:
+            season_number = season["season_number"]
             existing_season = next(
                 (s for s in existing_tv["seasons"]
-                if s["season_number"] == season["season_number"]),
+                if s["season_number"] == season_number),
                 None
             )
 
             if not existing_season:
                 existing_tv["seasons"].append(season)
+                ops.append(UpdateOne({"_id": tv_id}, {"$push": {"seasons": season}}))
+                touched.update((season_number, e["episode_number"]) for e in season["episodes"])
                 continue
 
             for episode in season["episodes"]:
@@ -1610,10 +2968,22 @@ class Database:
 
                 if not existing_episode:
                     existing_season["episodes"].append(episode)
+                    ops.append(UpdateOne(
+                        {"_id": tv_id},
+                        {"$push": {"seasons.$[s].episodes": episode}},
+                        array_filters=[{"s.season_number": season_number}],
+                    ))
+                    touched.add((season_number, episode["episode_number"]))
                     continue
 
+                episode_number = existing_episode["episode_number"]
+                touched.add((season_number, episode_number))
+                path = "seasons.$[s].episodes.$[e]"
+                episode_set = {}
+
                 if episode.get("absolute_episode") is not None and not existing_episode.get("absolute_episode"):
                     existing_episode["absolute_episode"] = episode["absolute_episode"]
+                    episode_set[f"{path}.absolute_episode"] = episode["absolute_episode"]
 
                 existing_episode.setdefault("telegram", [])
 
@@ -1621,35 +2991,69 @@ class Database:
                     existing_episode["telegram"] = await self._apply_quality_update(
                         existing_episode["telegram"], quality, self._is_personal_tmdb(tmdb_id), status
                     )
+                episode_set[f"{path}.telegram"] = existing_episode["telegram"]
 
-        existing_tv["updated_on"] = datetime.utcnow()
+                ops.append(UpdateOne(
+                    {"_id": tv_id},
+                    {"$set": episode_set},
+                    array_filters=[{"s.season_number": season_number}, {"e.episode_number": episode_number}],
+                ))
 
-        #----- MOVE DB IF NEEDED ----------------
-        if existing_db_index != self.current_db_index:
-            try:
-                if await self._move_document("tv", existing_tv, existing_db_index):
-                    return tv_id
-            except Exception as e:
-                LOGGER.error(f"Error moving TV show to {current_db_key}: {e}")
-                if any(keyword in str(e).lower() for keyword in ["storage", "quota"]):
-                    return await self._handle_storage_error(self.update_tv_show, tv_show_data, total_storage_dbs=total_storage_dbs)
-            return tv_id
+        set_fields["updated_on"] = datetime.utcnow()
+        ops.append(UpdateOne({"_id": tv_id}, {"$set": set_fields}))
 
         try:
-            await self.dbs[existing_db_key]["tv"].replace_one({"_id": tv_id}, existing_tv)
-            return tv_id
+            await self.dbs[existing_db_key]["tv"].bulk_write(ops, ordered=True)
+            await self._sync_derived("tv", existing_tv, existing_db_index, scope=touched)
         except Exception as e:
             LOGGER.error(f"Failed to update TV show {tmdb_id} in {existing_db_key}: {e}")
             if any(keyword in str(e).lower() for keyword in ["storage", "quota"]):
                 return await self._handle_storage_error(self.update_tv_show, tv_show_data, total_storage_dbs=total_storage_dbs)
-    
-    async def sort_movies(self, sort_params, page, page_size, genre_filter=None, extra_filter=None):
+            return None
+
+        #----- MOVE DB IF NEEDED (the router finds titles anywhere; only drain shards near their quota) ----------------
+        if existing_db_index != self.current_db_index and self._shard_full(existing_db_index):
+            await self._relocate_to_current("tv", tv_id, existing_db_index, total_storage_dbs)
+        return tv_id
+
+    #----- Fill ids the stored doc lacks; mirrors them onto the in-memory copy too
+    @staticmethod
+    def _identity_backfill(existing: dict, imdb_id, tmdb_id, kitsu_id, is_anime) -> dict:
+        set_fields = {}
+        for field, value in (("imdb_id", imdb_id), ("tmdb_id", tmdb_id), ("kitsu_id", kitsu_id)):
+            if value and not existing.get(field):
+                existing[field] = value
+                set_fields[field] = value
+        if is_anime and not existing.get("is_anime"):
+            existing["is_anime"] = True
+            set_fields["is_anime"] = True
+        return set_fields
+
+    #----- Move an already-updated doc into the active storage DB (full read only on this rare path)
+    async def _relocate_to_current(
+        self, collection_name: str, doc_id, old_db_index: int, total_storage_dbs: int
+    ) -> None:
+        if old_db_index == self.current_db_index:
+            return
+        try:
+            document = await self.dbs[f"storage_{old_db_index}"][collection_name].find_one({"_id": doc_id})
+            if document and await self._move_document(collection_name, document, old_db_index):
+                await self._reindex_title(collection_name, document.get("tmdb_id"), self.current_db_index)
+        except Exception as e:
+            LOGGER.error(f"Error moving {collection_name} {doc_id} to storage_{self.current_db_index}: {e}")
+            if any(keyword in str(e).lower() for keyword in ["storage", "quota"]):
+                await self._handle_storage_error(
+                    self._relocate_to_current, collection_name, doc_id, old_db_index, total_storage_dbs,
+                    total_storage_dbs=total_storage_dbs,
+                )
+
+    async def sort_movies(self, sort_params, page, page_size, genre_filter=None, extra_filter=None, skip=None):
         sort_dict = self._get_sort_dict(sort_params)
         filter_dict = {"genres": {"$in": [genre_filter]}} if genre_filter else {}
         if extra_filter:
             filter_dict.update(extra_filter)
         results, dbs_checked, total_count = await self._paginate_collection(
-            "movie", sort_dict, page, page_size, filter_dict=filter_dict
+            "movie", sort_dict, page, page_size, filter_dict=filter_dict, offset=skip
         )
         total_pages = (total_count + page_size - 1) // page_size
         return {
@@ -1660,13 +3064,13 @@ class Database:
             "movies": [convert_objectid_to_str(result) for result in results],
         }
 
-    async def sort_tv_shows(self, sort_params, page, page_size, genre_filter=None, extra_filter=None):
+    async def sort_tv_shows(self, sort_params, page, page_size, genre_filter=None, extra_filter=None, skip=None):
         sort_dict = self._get_sort_dict(sort_params)
         filter_dict = {"genres": {"$in": [genre_filter]}} if genre_filter else {}
         if extra_filter:
             filter_dict.update(extra_filter)
         results, dbs_checked, total_count = await self._paginate_collection(
-            "tv", sort_dict, page, page_size, filter_dict=filter_dict
+            "tv", sort_dict, page, page_size, filter_dict=filter_dict, offset=skip
         )
         total_pages = (total_count + page_size - 1) // page_size
         return {
@@ -1678,94 +3082,84 @@ class Database:
         }
 
     async def search_documents(
-            self, 
-            query: str, 
-            page: int, 
-            page_size: int,
-            extra_filter: Optional[dict] = None
-        ) -> dict:
-
-            skip = (page - 1) * page_size
-            
-            words = query.split()
-            regex_query = {
-                '$regex': '.*' + '.*'.join(words) + '.*', 
-                '$options': 'i'
-            }
+        self,
+        query: str,
+        page: int,
+        page_size: int,
+        extra_filter: Optional[dict] = None,
+        media_type: Optional[str] = None,
+    ) -> dict:
+        query = (query or "").strip()
+        if not query:
+            return {"total_count": 0, "results": []}
 
-            tv_match = {"$or": [
-                {"title": regex_query},
-                {"title_english": regex_query},
-                {"original_title": regex_query},
-                {"seasons.episodes.telegram.name": regex_query}
-            ]}
-            movie_match = {"$or": [
-                {"title": regex_query},
-                {"title_english": regex_query},
-                {"original_title": regex_query},
-                {"telegram.name": regex_query}
-            ]}
+        skip = (page - 1) * page_size
+        window = skip + page_size
+        collections = [self._collection_for(media_type)] if media_type else ["tv", "movie"]
+        storage_indexes = list(range(1, self.current_db_index + 1))
+
+        #----- Ranked $text lookup on the search_text index of every shard, in parallel.
+        #----- Bare terms are ORed and stopwords stay indexed ("the office" would match every
+        #----- "the"); quoting each term makes all of them required.
+        terms = list(dict.fromkeys(t for t in query.replace('"', " ").split() if t))
+        if not terms:
+            return {"total_count": 0, "results": []}
+        text_match = {"$text": {"$search": " ".join(f'"{t}"' for t in terms)}}
+        if extra_filter:
+            text_match["$and"] = [extra_filter]
+        projection = {"score": {"$meta": "textScore"}}
+        jobs = [
+            (collection_name, self.dbs[f"storage_{i}"][collection_name])
+            for i in storage_indexes for collection_name in collections
+        ]
+        try:
+            hits = await gather(*(
+                col.find(text_match, {**_SEARCH_PROJECTIONS[collection_name], **projection})
+                .sort([("score", {"$meta": "textScore"})])
+                .limit(window)
+                .to_list(window)
+                for collection_name, col in jobs
+            ))
+            counts = await gather(*(col.count_documents(text_match) for _, col in jobs))
+        except Exception as e:
+            LOGGER.error(f"Text search failed for '{query}': {e}")
+            hits, counts = [], []
+        candidates = [doc for docs in hits for doc in docs]
+        total_count = sum(counts)
+
+        #----- Some term isn't a whole token (partial words like "breaking ba"): substring match on titles only
+        if not candidates:
+            pattern = {"$regex": ".*".join(re.escape(w) for w in terms), "$options": "i"}
+            regex_match = {"$or": [{field: pattern} for field in _SEARCH_TITLE_FIELDS]}
             if extra_filter:
-                tv_match = {"$and": [tv_match, extra_filter]}
-                movie_match = {"$and": [movie_match, extra_filter]}
-
-            tv_pipeline = [
-                {"$match": tv_match},
-                {"$project": {
-                    "_id": 1, "tmdb_id": 1, "title": 1, "genres": 1, "rating": 1, "imdb_id": 1,
-                    "release_year": 1, "release_year_end": 1, "poster": 1, "backdrop": 1, "description": 1, "logo": 1,
-                    "media_type": 1, "db_index": 1, "seasons": 1, "title_english": 1, "original_title": 1
-                }}
-            ]
-            
-            movie_pipeline = [
-                {"$match": movie_match},
-                {"$project": {
-                    "_id": 1, "tmdb_id": 1, "title": 1, "genres": 1, "rating": 1,
-                    "release_year": 1, "release_year_end": 1, "poster": 1, "backdrop": 1, "description": 1,
-                    "media_type": 1, "db_index": 1, "imdb_id": 1, "logo": 1, "telegram": 1, "title_english": 1, "original_title": 1
-                }}
-            ]
-            
-            results = []
-            dbs_checked = []
-            
-            active_db_key = f"storage_{self.current_db_index}"
-            active_db = self.dbs[active_db_key]
-            dbs_checked.append(self.current_db_index)
-            
-            tv_results = await active_db["tv"].aggregate(tv_pipeline).to_list(None)
-            movie_results = await active_db["movie"].aggregate(movie_pipeline).to_list(None)
-            combined = tv_results + movie_results
-            results.extend(combined)
-            
-            if len(results) < page_size:
-                previous_db_index = self.current_db_index - 1
-                while previous_db_index > 0 and len(results) < page_size:
-                    prev_db_key = f"storage_{previous_db_index}"
-                    prev_db = self.dbs[prev_db_key]
-                    tv_results_prev = await prev_db["tv"].aggregate(tv_pipeline).to_list(None)
-                    movie_results_prev = await prev_db["movie"].aggregate(movie_pipeline).to_list(None)
-                    combined_prev = tv_results_prev + movie_results_prev
-                    results.extend(combined_prev)
-                    dbs_checked.append(previous_db_index)
-                    previous_db_index -= 1
-
-            total_count = 0
-            for db_index in dbs_checked:
-                key = f"storage_{db_index}"
-                db = self.dbs[key]
-                tv_count = await db["tv"].count_documents(tv_match)
-                movie_count = await db["movie"].count_documents(movie_match)
-                total_count += (tv_count + movie_count)
-            
-            paged_results = results[skip:skip + page_size]
+                regex_match = {"$and": [regex_match, extra_filter]}
+            hits = await gather(*(
+                col.find(regex_match, _SEARCH_PROJECTIONS[collection_name]).limit(window).to_list(window)
+                for collection_name, col in jobs
+            ))
+            counts = await gather(*(col.count_documents(regex_match) for _, col in jobs))
+            candidates = [doc for docs in hits for doc in docs]
+            total_count = sum(counts)
+
+        #----- Re-rank the merged window: index score first, then fuzzy title closeness
+        needle = query.lower()
+
+        def _rank(doc: dict) -> tuple:
+            closeness = max(
+                (fuzz.WRatio(needle, str(doc.get(field) or "").lower()) for field in _SEARCH_TITLE_FIELDS),
+                default=0,
+            )
+            return (round(doc.get("score") or 0, 2) + closeness / 100, doc.get("rating") or 0)
 
-            return {
-                "total_count": total_count,
-                "results": [convert_objectid_to_str(doc) for doc in paged_results]
-            }
+        candidates.sort(key=_rank, reverse=True)
+        paged_results = candidates[skip:window]
+        for doc in paged_results:
+            doc.pop("score", None)
 
+        return {
+            "total_count": total_count,
+            "results": [convert_objectid_to_str(doc) for doc in paged_results]
+        }
 
     async def get_media_details(
         self, 
@@ -1783,7 +3177,14 @@ class Database:
                 return col.find_one({"kitsu_id": int(kitsu_id)})
             return None
 
-        for db_idx in range(self.current_db_index, 0, -1):
+        #----- Episode lookups read one episode doc when the normalized store is on
+        episode_query = absolute_episode is not None or (season_number is not None and episode_number is not None)
+        if episode_query and self.episode_reads_ready():
+            details = await self._episode_store_details(imdb_id, kitsu_id, season_number, episode_number, absolute_episode)
+            if details:
+                return details
+
+        async def _from_shard(db_idx, _):
             db_key = f"storage_{db_idx}"
 
             if absolute_episode is not None and (kitsu_id is not None or imdb_id):
@@ -1876,9 +3277,176 @@ class Database:
                     movie_doc["type"] = "movie"
                     movie_doc["db_index"] = db_idx
                     return movie_doc
-        
+            return None
+
+        routed = await self._route_indexes(imdb_id, kitsu_id)
+        return await self.fan_out(_from_shard, first_match=True, newest_first=True, indexes=routed, label="media details", reads=True)
+
+    #-----
+    #----- Projected lookups for the Stremio hot paths: one narrow query per storage DB,
+    #----- returning only the slice the route needs (no full docs, no recursive str walk)
+    #-----
+    @staticmethod
+    def _title_filter(imdb_id: Optional[str], kitsu_id: Optional[int]) -> Optional[dict]:
+        if imdb_id:
+            return {"imdb_id": imdb_id}
+        if kitsu_id is not None:
+            return {"kitsu_id": int(kitsu_id)}
         return None
 
+    #----- Visibility-only: access fields of the first title matching the ids (tv before movie)
+    async def get_title_access(
+        self, imdb_id: Optional[str] = None, kitsu_id: Optional[int] = None, with_streams: bool = False
+    ) -> Optional[dict]:
+        ident = self._title_filter(imdb_id, kitsu_id)
+        if ident is None:
+            return None
+
+        async def _lookup(db_idx, db):
+            for collection_name in ("tv", "movie"):
+                projection = dict(_ACCESS_PROJECTION)
+                if with_streams and collection_name == "movie":
+                    projection["telegram"] = 1
+                doc = await db[collection_name].find_one(ident, projection)
+                if doc:
+                    doc["type"] = collection_name
+                    doc["db_index"] = db_idx
+                    return doc
+            return None
+
+        routed = await self._route_indexes(imdb_id, kitsu_id)
+        return await self.fan_out(_lookup, first_match=True, newest_first=True, indexes=routed, label="title access", reads=True)
+
+    #----- Meta-only: the whole title minus every telegram list (the bulk of a long show)
+    async def get_title_meta(self, imdb_id: Optional[str] = None, kitsu_id: Optional[int] = None) -> Optional[dict]:
+        ident = self._title_filter(imdb_id, kitsu_id)
+        if ident is None:
+            return None
+
+        async def _lookup(db_idx, db):
+            for collection_name in ("tv", "movie"):
+                doc = await db[collection_name].find_one(ident, _META_PROJECTION[collection_name])
+                if doc:
+                    doc["type"] = collection_name
+                    doc["db_index"] = db_idx
+                    return doc
+            return None
+
+        routed = await self._route_indexes(imdb_id, kitsu_id)
+        return await self.fan_out(_lookup, first_match=True, newest_first=True, indexes=routed, label="title meta", reads=True)
+
+    #----- Server-side slice of the episodes matching a stream request (absolute, S01 fallback, SxxEyy)
+    @staticmethod
+    def _episode_slice_pipeline(
+        ident: dict, season_number: Optional[int], episode_number: Optional[int], absolute_episode: Optional[int]
+    ) -> List[dict]:
+        conds = []
+        if absolute_episode is not None:
+            conds.append({"$eq": ["$$e.absolute_episode", absolute_episode]})
+            if season_number is None and episode_number is None:
+                conds.append({"$and": [{"$eq": ["$$e.season_number", 1]}, {"$eq": ["$$e.episode_number", absolute_episode]}]})
+        if season_number is not None and episode_number is not None:
+            conds.append({"$and": [
+                {"$eq": ["$$e.season_number", season_number]}, {"$eq": ["$$e.episode_number", episode_number]}
+            ]})
+        flat = {"$reduce": {
+            "input": {"$ifNull": ["$seasons", []]},
+            "initialValue": [],
+            "in": {"$concatArrays": ["$$value", {"$map": {
+                "input": {"$ifNull": ["$$this.episodes", []]},
+                "as": "x",
+                "in": {
+                    "season_number": "$$this.season_number",
+                    "episode_number": "$$x.episode_number",
+                    "absolute_episode": "$$x.absolute_episode",
+                    "telegram": "$$x.telegram",
+                },
+            }}]},
+        }}
+        return [
+            {"$match": ident},
+            {"$limit": 1},
+            {"$project": {**_ACCESS_PROJECTION, "episodes": {"$filter": {"input": flat, "as": "e", "cond": {"$or": conds}}}}},
+        ]
+
+    @staticmethod
+    def _pick_episode(
+        episodes: List[dict], season_number: Optional[int], episode_number: Optional[int], absolute_episode: Optional[int]
+    ) -> Optional[dict]:
+        if absolute_episode is not None:
+            for ep in episodes:
+                if ep.get("absolute_episode") == absolute_episode:
+                    return ep
+            if season_number is None and episode_number is None:
+                for ep in episodes:
+                    if ep.get("season_number") == 1 and ep.get("episode_number") == absolute_episode:
+                        return ep
+        if season_number is not None and episode_number is not None:
+            for ep in episodes:
+                if ep.get("season_number") == season_number and ep.get("episode_number") == episode_number:
+                    return ep
+        return None
+
+    #----- Stream-list-only: access fields + "telegram" of the requested movie/episode.
+    #----- "telegram" is absent when the title exists but the requested episode doesn't.
+    async def get_title_streams(
+        self,
+        imdb_id: Optional[str] = None,
+        kitsu_id: Optional[int] = None,
+        season_number: Optional[int] = None,
+        episode_number: Optional[int] = None,
+        absolute_episode: Optional[int] = None,
+    ) -> Optional[dict]:
+        ident = self._title_filter(imdb_id, kitsu_id)
+        if ident is None:
+            return None
+
+        episode_query = absolute_episode is not None or (season_number is not None and episode_number is not None)
+        if not episode_query:
+            return await self.get_title_access(imdb_id, kitsu_id, with_streams=True)
+
+        if self.episode_reads_ready():
+            access = await self.get_title_access(imdb_id, kitsu_id)
+            details = await self._episode_store_details(imdb_id, kitsu_id, season_number, episode_number, absolute_episode)
+            if details:
+                merged = dict(access or {})
+                merged.update({
+                    "type": "tv",
+                    "db_index": details["db_index"],
+                    "season_number": details.get("season_number"),
+                    "episode_number": details.get("episode_number"),
+                    "telegram": details.get("telegram") or [],
+                })
+                return merged
+            return access
+
+        pipeline = self._episode_slice_pipeline(ident, season_number, episode_number, absolute_episode)
+
+        async def _slice(db_idx, db):
+            docs = await db["tv"].aggregate(pipeline).to_list(1)
+            if not docs:
+                return None
+            doc = docs[0]
+            episodes = doc.pop("episodes", None) or []
+            doc["type"] = "tv"
+            doc["db_index"] = db_idx
+            episode = self._pick_episode(episodes, season_number, episode_number, absolute_episode)
+            if episode:
+                doc.update({
+                    "season_number": episode.get("season_number"),
+                    "episode_number": episode.get("episode_number"),
+                    "telegram": episode.get("telegram") or [],
+                })
+            return doc
+
+        routed = await self._route_indexes(imdb_id, kitsu_id, collection_name="tv")
+        shards = await self.fan_out(_slice, newest_first=True, indexes=routed, label="title streams", reads=True)
+        docs = [doc for _, doc in shards if doc]
+        for doc in docs:
+            if "telegram" in doc:
+                return doc
+        return docs[0] if docs else await self.get_title_access(imdb_id, kitsu_id)
+
     #-----
     #----- DB Method for Edit Post
     #-----
@@ -1939,7 +3507,13 @@ class Database:
 
         try:
             result = await collection.update_one({"tmdb_id": int(tmdb_id)}, {"$set": update_data})
-
+            if result.modified_count > 0:
+                self.invalidate_listings(collection_name)
+                new_tmdb_id = int(update_data.get("tmdb_id") or tmdb_id)
+                if collection_name == "tv" and new_tmdb_id != int(tmdb_id):
+                    await self._drop_episode_docs(int(tmdb_id))
+                if (_STREAM_INDEX_FIELDS | _EPISODE_SHOW_FIELDS).intersection(update_data):
+                    await self._reindex_title(collection_name, new_tmdb_id, int(db_index))
             return result.modified_count > 0
 
         except Exception as e:
@@ -1971,6 +3545,8 @@ class Database:
                     LOGGER.info(f"Deleted document tmdb_id {tmdb_id} from {db_key}")
                     self.current_db_index = next_db_index
                     await self.update_current_db_index()
+                    self.invalidate_listings(collection_name)
+                    await self._reindex_title(collection_name, old_doc.get("tmdb_id"), next_db_index)
                     LOGGER.info(f"Switched to {new_db_key} and document migrated successfully.")
                     return True
 
@@ -2019,6 +3595,11 @@ class Database:
 
         result = await self.dbs[db_key][collection_name].delete_one({"tmdb_id": tmdb_id})
         if result.deleted_count > 0:
+            self.invalidate_listings(collection_name)
+            await self.dbs["tracking"]["stream_index"].delete_many({"collection": collection_name, "tmdb_id": tmdb_id})
+            await self._unroute_title(collection_name, tmdb_id)
+            if collection_name == "tv":
+                await self._drop_episode_docs(tmdb_id)
             await self.purge_media_from_catalogs(tmdb_id, collection_name)
             LOGGER.info(f"{media_type} with tmdb_id {tmdb_id} deleted successfully.")
             return True
@@ -2026,18 +3607,28 @@ class Database:
         return False
 
     async def get_title_by_stream_id(self, stream_id_hash: str) -> Optional[str]:
-        for i in range(1, self.current_db_index + 1):
-            db = self.dbs[f"storage_{i}"]
-            
+        if self.stream_index_ready:
+            entry = await self.lookup_stream(stream_id_hash)
+            if not entry:
+                return None
+            if entry.get("collection") == "tv":
+                title = entry.get("title") or "Unknown Series"
+                return f"{title} S{entry.get('season') or 0:02d}E{entry.get('episode') or 0:02d}"
+            return entry.get("title")
+
+        async def _lookup(_, db):
             #----- Check Movies
-            movie = await db["movie"].find_one({"telegram.id": stream_id_hash})
+            movie = await db["movie"].find_one({"telegram.id": stream_id_hash}, {"title": 1, "telegram.id": 1})
             if movie and "telegram" in movie:
                 for t in movie["telegram"]:
                     if t.get("id") == stream_id_hash:
                         return movie.get("title")
 
             #----- Check TV Shows
-            tv = await db["tv"].find_one({"seasons.episodes.telegram.id": stream_id_hash})
+            tv = await db["tv"].find_one(
+                {"seasons.episodes.telegram.id": stream_id_hash},
+                {"title": 1, "seasons.season_number": 1, "seasons.episodes.episode_number": 1, "seasons.episodes.telegram.id": 1},
+            )
             if tv and "seasons" in tv:
                 title = tv.get("title", "Unknown Series")
                 for season in tv.get("seasons", []):
@@ -2047,15 +3638,27 @@ class Database:
                                 s_num = season.get("season_number", 0)
                                 e_num = episode.get("episode_number", 0)
                                 return f"{title} S{s_num:02d}E{e_num:02d}"
+            return None
 
-        return None
+        return await self.fan_out(_lookup, first_match=True, label="title by stream id", reads=True)
 
     async def delete_media_by_stream_id(self, stream_id_hash: str, delete_file: bool = False) -> bool:
-        for i in range(1, self.current_db_index + 1):
+        if self.stream_index_ready:
+            entry = await self.lookup_stream(stream_id_hash)
+            if not entry:
+                return False
+            targets = [(entry["db_index"], entry["collection"])]
+        else:
+            targets = [(i, c) for i in range(1, self.current_db_index + 1) for c in ("movie", "tv")]
+        stream_index = self.dbs["tracking"]["stream_index"]
+
+        for i, collection_name in targets:
             db = self.dbs[f"storage_{i}"]
             
             #----- Check Movies
-            movie = await db["movie"].find_one({"telegram.id": stream_id_hash})
+            movie = None
+            if collection_name == "movie":
+                movie = await db["movie"].find_one({"telegram.id": stream_id_hash})
             if movie:
                 if delete_file:
                     for q in movie.get("telegram", []):
@@ -2065,14 +3668,21 @@ class Database:
                 movie["telegram"] = [q for q in movie.get("telegram", []) if q.get("id") != stream_id_hash]
                 if len(movie["telegram"]) == 0:
                     await db["movie"].delete_one({"_id": movie["_id"]})
+                    await stream_index.delete_many({"collection": "movie", "tmdb_id": movie.get("tmdb_id")})
+                    await self._unroute_title("movie", movie.get("tmdb_id"))
                     await self.purge_media_from_catalogs(movie.get("tmdb_id"), "movie")
                 else:
                     movie['updated_on'] = datetime.utcnow()
                     await db["movie"].replace_one({"_id": movie["_id"]}, movie)
+                    await stream_index.delete_one({"_id": stream_id_hash})
+                    await self._route_title("movie", movie, i)
+                self.invalidate_listings("movie")
                 return True
 
             #----- Check TV Shows
-            tv = await db["tv"].find_one({"seasons.episodes.telegram.id": stream_id_hash})
+            tv = None
+            if collection_name == "tv":
+                tv = await db["tv"].find_one({"seasons.episodes.telegram.id": stream_id_hash})
             if tv:
                 for season in tv.get("seasons", []):
                     for episode in season.get("episodes", []):
@@ -2087,10 +3697,20 @@ class Database:
                                         tv["seasons"] = [s for s in tv.get("seasons", []) if s.get("season_number") != season.get("season_number")]
                                         if len(tv["seasons"]) == 0:
                                             await db["tv"].delete_one({"_id": tv["_id"]})
+                                            await stream_index.delete_many({"collection": "tv", "tmdb_id": tv.get("tmdb_id")})
+                                            await self._unroute_title("tv", tv.get("tmdb_id"))
+                                            await self._drop_episode_docs(tv.get("tmdb_id"))
+                                            self.invalidate_listings("tv")
                                             await self.purge_media_from_catalogs(tv.get("tmdb_id"), "tv")
                                             return True
                                 tv['updated_on'] = datetime.utcnow()
                                 await db["tv"].replace_one({"_id": tv["_id"]}, tv)
+                                await stream_index.delete_one({"_id": stream_id_hash})
+                                await self._route_title("tv", tv, i)
+                                await self._sync_episode_docs(
+                                    tv, i, scope={(season.get("season_number"), episode.get("episode_number"))}
+                                )
+                                self.invalidate_listings("tv")
                                 return True
         return False
 
@@ -2156,22 +3776,31 @@ class Database:
 
 
     #----- Get per-DB statistics (movies, tv shows, used size, etc.)
+    #----- Counts come from the maintained counters; only the cheap dbstats command hits each shard
     async def get_database_stats(self):
-        stats = []
-        for key in self.dbs.keys():
-            if key.startswith("storage_"):
-                db = self.dbs[key]
-                movie_count = await db["movie"].count_documents({})
-                tv_count = await db["tv"].count_documents({})
-                db_stats = await db.command("dbstats")
-                stats.append({
-                    "db_name": key,
-                    "movie_count": movie_count,
-                    "tv_count": tv_count,
-                    "storageSize": db_stats.get("storageSize", 0),
-                    "dataSize": db_stats.get("dataSize", 0)
-                })
-        return stats
+        quota = SettingsManager.current().storage_quota_mb * 1024 * 1024
+        counters = await self.get_library_counters()
+
+        async def _stats(i, db):
+            db_stats = await db.command("dbstats")
+            used = int(db_stats.get("dataSize", 0)) + int(db_stats.get("indexSize", 0))
+            self._shard_fill[i] = {"used_bytes": used, "data_bytes": int(db_stats.get("dataSize", 0)), "fill": used / quota}
+            shard = counters.get(i) or dict.fromkeys(_COUNTER_FIELDS, 0)
+            return {
+                "db_name": f"storage_{i}",
+                "movie_count": shard["movies"],
+                "tv_count": shard["shows"],
+                "episode_count": shard["episodes"],
+                "stream_count": shard["streams"],
+                "stream_bytes": shard["bytes"],
+                "storageSize": db_stats.get("storageSize", 0),
+                "dataSize": db_stats.get("dataSize", 0),
+                "fill": round(used / quota, 4),
+            }
+
+        indexes = sorted(int(key.split("_")[1]) for key in self.dbs.keys() if key.startswith("storage_"))
+        shards = await self.fan_out(_stats, indexes=indexes, label="database stats")
+        return [stats for _, stats in shards]
 
 
 
@@ -2405,7 +4034,7 @@ class Database:
                     for q_idx, quality in enumerate(episode.get("telegram", [])):
                         if quality.get("id") == quality_id:
                             tv["seasons"][s_idx]["episodes"][e_idx]["telegram"][q_idx]["is_dead"] = True
-                            found = True
+                            found = (season.get("season_number"), episode.get("episode_number"))
                             break
                     if found: break
                 if found: break
@@ -2413,66 +4042,99 @@ class Database:
             if found:
                 tv["updated_on"] = datetime.utcnow()
                 result = await self.dbs[db_key]["tv"].replace_one({"tmdb_id": tmdb_id}, tv)
+                await self._sync_episode_docs(tv, int(db_index), scope={found})
                 return result.modified_count > 0
                 
         return False
 
+    @staticmethod
+    def _dead_link_row(collection: str, row: dict, db_index: int) -> dict:
+        quality = row.get("quality") or {}
+        link = {
+            "type": collection,
+            "tmdb_id": row.get("tmdb_id"),
+            "db_index": row.get("db_index", db_index),
+            "title": row.get("title"),
+            "year": row.get("year"),
+            "poster": row.get("poster"),
+            "quality_id": quality.get("id"),
+            "quality": quality.get("quality"),
+            "size": quality.get("size"),
+            "date_added": quality.get("date_added"),
+        }
+        if collection == "tv":
+            s_num, e_num = row.get("season") or 0, row.get("episode") or 0
+            link.update({
+                "title": f"{row.get('title')} (S{s_num:02d}E{e_num:02d})",
+                "season": row.get("season"),
+                "episode": row.get("episode"),
+            })
+        return link
+
+    async def _dead_link_rows(self, db, db_index: int, collection: str, skip: int = 0, limit: Optional[int] = None) -> List[dict]:
+        pipeline = list(_DEAD_LINK_PIPELINES[collection])
+        if skip:
+            pipeline.append({"$skip": skip})
+        if limit is not None:
+            pipeline.append({"$limit": limit})
+        cursor = db[collection].aggregate(pipeline, allowDiskUse=True, batchSize=_AGG_BATCH_SIZE)
+        return [self._dead_link_row(collection, row, db_index) async for row in cursor]
+
+    async def _dead_link_count(self, db, collection: str) -> int:
+        pipeline = _DEAD_LINK_PIPELINES[collection] + [{"$count": "n"}]
+        result = await db[collection].aggregate(pipeline, allowDiskUse=True).to_list(1)
+        return int(result[0]["n"]) if result else 0
+
     async def get_all_dead_links(self) -> List[dict]:
-        #----- Flattened list of all dead links across storage DBs for the Admin UI
-        dead_links = []
-        
-        for i in range(1, self.current_db_index + 1):
-            db_key = f"storage_{i}"
-            db = self.dbs[db_key]
-            
-            #----- Scan Movies ---
-            #----- Match any movie where at least one telegram entry has is_dead=True
-            movie_cursor = db["movie"].find({"telegram.is_dead": True})
-            async for movie in movie_cursor:
-                for quality in movie.get("telegram", []):
-                    if quality.get("is_dead"):
-                        dead_links.append({
-                            "type": "movie",
-                            "tmdb_id": movie.get("tmdb_id"),
-                            "db_index": movie.get("db_index", i),
-                            "title": movie.get("title"),
-                            "year": movie.get("year"),
-                            "poster": movie.get("poster"),
-                            "quality_id": quality.get("id"),
-                            "quality": quality.get("quality"),
-                            "size": quality.get("size"),
-                            "date_added": quality.get("date_added")
-                        })
-                        
-            #----- Scan TV Shows ---
-            #----- Match any TV where seasons.episodes.telegram.is_dead=True
-            tv_cursor = db["tv"].find({"seasons.episodes.telegram.is_dead": True})
-            async for tv in tv_cursor:
-                title = tv.get("title")
-                year = tv.get("year")
-                poster = tv.get("poster")
-                for season in tv.get("seasons", []):
-                    s_num = season.get("season_number")
-                    for ep in season.get("episodes", []):
-                        e_num = ep.get("episode_number")
-                        for quality in ep.get("telegram", []):
-                            if quality.get("is_dead"):
-                                dead_links.append({
-                                    "type": "tv",
-                                    "tmdb_id": tv.get("tmdb_id"),
-                                    "db_index": tv.get("db_index", i),
-                                    "title": f"{title} (S{s_num:02d}E{e_num:02d})",
-                                    "year": year,
-                                    "poster": poster,
-                                    "season": s_num,
-                                    "episode": e_num,
-                                    "quality_id": quality.get("id"),
-                                    "quality": quality.get("quality"),
-                                    "size": quality.get("size"),
-                                    "date_added": quality.get("date_added")
-                                })
-                                
-        return dead_links
+        #----- Flattened list of all dead links across storage DBs (purge needs every id)
+        async def _scan(i, db):
+            movies, shows = await gather(self._dead_link_rows(db, i, "movie"), self._dead_link_rows(db, i, "tv"))
+            return movies + shows
+
+        shards = await self.fan_out(_scan, deadline=_FANOUT_SCAN_DEADLINE, label="dead links")
+        return [link for _, links in shards for link in links]
+
+    async def get_dead_links_page(self, page: int = 1, per_page: int = 50) -> dict:
+        #----- One page of dead links: count each shard/collection, then fetch only the slices in the window
+        async def _count(i, db):
+            return await gather(self._dead_link_count(db, "movie"), self._dead_link_count(db, "tv"))
+
+        counts = await self.fan_out(_count, deadline=_FANOUT_SCAN_DEADLINE, label="dead link counts")
+        segments = [
+            (i, collection, n)
+            for i, pair in counts
+            for collection, n in zip(("movie", "tv"), pair) if n
+        ]
+        total = sum(n for _, _, n in segments)
+
+        per_page = max(1, min(int(per_page or 50), 200))
+        total_pages = max(1, (total + per_page - 1) // per_page)
+        page = max(1, min(int(page or 1), total_pages))
+        start, end = (page - 1) * per_page, page * per_page
+
+        wanted: Dict[int, List[tuple]] = {}
+        pos = 0
+        for i, collection, n in segments:
+            lo, hi = max(start, pos), min(end, pos + n)
+            if lo < hi:
+                wanted.setdefault(i, []).append((collection, lo - pos, hi - lo))
+            pos += n
+
+        async def _fetch(i, db):
+            parts = await gather(*(
+                self._dead_link_rows(db, i, collection, skip, limit)
+                for collection, skip, limit in wanted[i]
+            ))
+            return [link for part in parts for link in part]
+
+        shards = await self.fan_out(_fetch, indexes=sorted(wanted), deadline=_FANOUT_SCAN_DEADLINE, label="dead links")
+        return {
+            "items": [link for _, links in shards for link in links],
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "total_pages": total_pages,
+        }
 
     #-----
     #----- Stream Analytics
@@ -2500,6 +4162,7 @@ class Database:
                 "logged_at":   datetime.utcnow(),
             }
             await self.dbs["tracking"]["stream_analytics"].insert_one(record)
+            await self._bump_stream_rollups(record)
             token = stats.get("meta", {}).get("token")
             if token:
                 upd = {"last_active": datetime.utcnow()}
@@ -2513,42 +4176,221 @@ class Database:
         except Exception as e:
             LOGGER.warning(f"Stream analytics log failed: {e}")
 
-    async def get_stream_analytics(self, limit: int = 200) -> dict:
-        #----- Return summary stats + recent stream records from the tracking DB
+    @staticmethod
+    def _rollup_dims(client_index, dc_id, token) -> str:
+        return "|".join("-" if v is None else str(v) for v in (client_index, dc_id, token))
+
+    #----- Same key as _rollup_dims, built server-side (backfill $merge must hit the live docs)
+    @staticmethod
+    def _rollup_dims_expr(prefix: str) -> List[Any]:
+        parts: List[Any] = []
+        for field in ("c", "d", "t"):
+            if parts:
+                parts.append("|")
+            parts.append({"$ifNull": [{"$toString": f"${prefix}.{field}"}, "-"]})
+        return parts
+
+    async def _bump_stream_rollups(self, record: dict) -> None:
+        tracking = self.dbs["tracking"]
+        at = record["logged_at"]
+        inc = {
+            "streams": 1,
+            "total_bytes": record.get("total_bytes") or 0,
+            "duration_sum": record.get("duration_sec") or 0,
+            "mbps_sum": record.get("avg_mbps") or 0,
+        }
+        peak = {"peak_mbps": record.get("peak_mbps") or 0}
+        dims = self._rollup_dims(record.get("client_index"), record.get("dc_id"), record.get("token"))
+
+        rollups = []
+        for grain, (fmt, keep) in _ROLLUP_GRAINS.items():
+            key = at.strftime(fmt)
+            bucket = datetime.strptime(key, fmt)
+            on_insert = {
+                "grain": grain, "bucket": bucket, "client_index": record.get("client_index"),
+                "dc_id": record.get("dc_id"), "token": record.get("token"),
+            }
+            if keep:
+                on_insert["expire_at"] = bucket + keep
+            update = {"$inc": inc, "$max": peak, "$setOnInsert": on_insert}
+            if record.get("user_name"):
+                update["$set"] = {"user_name": record["user_name"]}
+            rollups.append(UpdateOne({"_id": f"{grain}|{key}|{dims}"}, update, upsert=True))
+        await tracking["stream_rollups"].bulk_write(rollups, ordered=False)
+
+        client = "-" if record.get("client_index") is None else str(record["client_index"])
+        stats = [
+            UpdateOne({"_id": "total"}, {"$inc": inc, "$max": peak, "$setOnInsert": {"kind": "total"}}, upsert=True),
+            UpdateOne(
+                {"_id": f"client|{client}"},
+                {"$inc": inc, "$max": peak, "$setOnInsert": {"kind": "client", "client_index": record.get("client_index")}},
+                upsert=True,
+            ),
+        ]
+        volume = {"streams": 1, "total_bytes": inc["total_bytes"]}
+        for kind, name in (("title", record.get("title")), ("user", record.get("user_name"))):
+            if name:
+                stats.append(UpdateOne(
+                    {"_id": f"{kind}|{name}"}, {"$inc": volume, "$setOnInsert": {"kind": kind, "name": name}}, upsert=True
+                ))
+        await tracking["stream_stats"].bulk_write(stats, ordered=False)
+
+    async def _ensure_analytics_indexes(self, rollups_built: bool) -> None:
+        tracking = self.dbs["tracking"]
         try:
-            col = self.dbs["tracking"]["stream_analytics"]
+            await tracking["stream_rollups"].create_index([("grain", ASCENDING), ("bucket", ASCENDING)])
+            await tracking["stream_rollups"].create_index([("expire_at", ASCENDING)], expireAfterSeconds=0)
+            await tracking["stream_stats"].create_index([("kind", ASCENDING), ("streams", DESCENDING)])
+            await tracking["stream_stats"].create_index([("kind", ASCENDING), ("total_bytes", DESCENDING)])
+            #----- Raw records only expire once the backfill has folded them into the rollups
+            if rollups_built:
+                await tracking["stream_analytics"].create_index(
+                    [("logged_at", DESCENDING)], name="logged_at_ttl", expireAfterSeconds=_ANALYTICS_RAW_TTL
+                )
+        except Exception as e:
+            LOGGER.error(f"Failed creating analytics indexes: {e}")
 
-            #----- Aggregate totals
-            pipeline = [
+    #----- $merge that adds the new sums onto whatever live logging already wrote
+    @staticmethod
+    def _rollup_merge(into: str, sums, maxes=()) -> dict:
+        update = {f: {"$add": [{"$ifNull": [f"${f}", 0]}, f"$$new.{f}"]} for f in sums}
+        update.update({f: {"$max": [f"${f}", f"$$new.{f}"]} for f in maxes})
+        return {"$merge": {"into": into, "on": "_id", "whenMatched": [{"$addFields": update}], "whenNotMatched": "insert"}}
+
+    #----- One-time fold of pre-rollup raw records (logged before `cutoff`) into the rollups.
+    #----- Runs server-side ($group + $merge); finished steps are recorded so a restart resumes.
+    async def _backfill_stream_rollups(self) -> None:
+        tracking = self.dbs["tracking"]
+        state = await tracking["state"].find_one({"_id": "stream_rollups"}) or {}
+        cutoff = state.get("cutoff") or datetime.utcnow()
+        done = set(state.get("done") or [])
+        await tracking["state"].update_one(
+            {"_id": "stream_rollups"}, {"$set": {"cutoff": cutoff, "built": False}}, upsert=True
+        )
+        raw = tracking["stream_analytics"]
+        sums = {
+            "streams": {"$sum": 1},
+            "total_bytes": {"$sum": {"$ifNull": ["$total_bytes", 0]}},
+            "duration_sum": {"$sum": {"$ifNull": ["$duration_sec", 0]}},
+            "mbps_sum": {"$sum": {"$ifNull": ["$avg_mbps", 0]}},
+        }
+        sum_fields = {f: 1 for f in _ROLLUP_SUMS}
+        dims = {"c": "$client_index", "d": "$dc_id", "t": "$token"}
+
+        steps: List[Tuple[str, List[dict]]] = []
+        for grain, (fmt, keep) in _ROLLUP_GRAINS.items():
+            since = {"$gte": cutoff - keep} if keep else {}
+            bucket = {"$dateFromString": {"dateString": "$_id.k", "format": fmt}}
+            project = {
+                "_id": {"$concat": [grain, "|", "$_id.k", "|", *self._rollup_dims_expr("_id")]},
+                "grain": {"$literal": grain}, "bucket": bucket,
+                "client_index": "$_id.c", "dc_id": "$_id.d", "token": "$_id.t",
+                "user_name": 1, "peak_mbps": 1, **sum_fields,
+            }
+            if keep:
+                project["expire_at"] = {"$add": [bucket, int(keep.total_seconds() * 1000)]}
+            steps.append((f"rollup:{grain}", [
+                {"$match": {"logged_at": {"$lt": cutoff, **since}}},
                 {"$group": {
-                    "_id": None,
-                    "total_streams":     {"$sum": 1},
-                    "total_bytes":       {"$sum": "$total_bytes"},
-                    "avg_speed":         {"$avg": "$avg_mbps"},
-                    "peak_speed":        {"$max": "$peak_mbps"},
-                    "avg_duration":      {"$avg": "$duration_sec"},
+                    "_id": {"k": {"$dateToString": {"format": fmt, "date": "$logged_at"}}, **dims},
+                    **sums, "peak_mbps": {"$max": "$peak_mbps"}, "user_name": {"$last": "$user_name"},
                 }},
-            ]
-            agg = await col.aggregate(pipeline).to_list(1)
-            summary = agg[0] if agg else {}
-            summary.pop("_id", None)
+                {"$project": project},
+                self._rollup_merge("stream_rollups", _ROLLUP_SUMS, _ROLLUP_MAXES),
+            ]))
+        steps.append(("stats:total", [
+            {"$match": {"logged_at": {"$lt": cutoff}}},
+            {"$group": {"_id": "total", **sums, "peak_mbps": {"$max": "$peak_mbps"}}},
+            {"$addFields": {"kind": "total"}},
+            self._rollup_merge("stream_stats", _ROLLUP_SUMS, _ROLLUP_MAXES),
+        ]))
+        steps.append(("stats:client", [
+            {"$match": {"logged_at": {"$lt": cutoff}}},
+            {"$group": {"_id": "$client_index", **sums, "peak_mbps": {"$max": "$peak_mbps"}}},
+            {"$project": {
+                "_id": {"$concat": ["client|", {"$ifNull": [{"$toString": "$_id"}, "-"]}]},
+                "kind": {"$literal": "client"}, "client_index": "$_id", "peak_mbps": 1, **sum_fields,
+            }},
+            self._rollup_merge("stream_stats", _ROLLUP_SUMS, _ROLLUP_MAXES),
+        ]))
+        for kind, field in (("title", "$title"), ("user", "$user_name")):
+            steps.append((f"stats:{kind}", [
+                {"$match": {"logged_at": {"$lt": cutoff}, field[1:]: {"$nin": [None, ""]}}},
+                {"$group": {"_id": field, "streams": {"$sum": 1}, "total_bytes": sums["total_bytes"]}},
+                {"$project": {
+                    "_id": {"$concat": [f"{kind}|", "$_id"]}, "kind": {"$literal": kind},
+                    "name": "$_id", "streams": 1, "total_bytes": 1,
+                }},
+                self._rollup_merge("stream_stats", ("streams", "total_bytes")),
+            ]))
+
+        for name, pipeline in steps:
+            if name in done:
+                continue
+            await raw.aggregate(pipeline, allowDiskUse=True).to_list(None)
+            await tracking["state"].update_one({"_id": "stream_rollups"}, {"$addToSet": {"done": name}})
+            LOGGER.info(f"[Analytics] Backfilled {name}")
+
+        await tracking["state"].update_one({"_id": "stream_rollups"}, {"$set": {"built": True}})
+        await self._ensure_analytics_indexes(rollups_built=True)
+        LOGGER.info("[Analytics] Stream rollups ready; raw records now expire after "
+                    f"{_ANALYTICS_RAW_TTL // 86400} days")
+
+    async def _run_rollup_backfill(self) -> None:
+        try:
+            await self._backfill_stream_rollups()
+        except Exception as e:
+            LOGGER.error(f"[Analytics] Rollup backfill failed: {e}")
+
+    async def prepare_stream_analytics(self) -> None:
+        state = await self.dbs["tracking"]["state"].find_one({"_id": "stream_rollups"}) or {}
+        built = bool(state.get("built"))
+        await self._ensure_analytics_indexes(rollups_built=built)
+        if not built:
+            #----- Pin the cutoff before any stream can be logged, so nothing is counted twice
+            if not state.get("cutoff"):
+                await self.dbs["tracking"]["state"].update_one(
+                    {"_id": "stream_rollups"}, {"$set": {"cutoff": datetime.utcnow(), "built": False}}, upsert=True
+                )
+            self._rollup_task = create_task(self._run_rollup_backfill())
+
+    async def get_stream_analytics(self, limit: int = 200) -> dict:
+        #----- Summary stats + recent stream records, read from the maintained counters/rollups
+        try:
+            tracking = self.dbs["tracking"]
+            col = tracking["stream_analytics"]
+            stats = tracking["stream_stats"]
+
+            def _averages(doc: dict) -> dict:
+                streams = doc.get("streams") or 0
+                return {
+                    "avg_mbps": round((doc.get("mbps_sum") or 0) / streams, 3) if streams else 0,
+                    "avg_duration": round((doc.get("duration_sum") or 0) / streams, 2) if streams else 0,
+                }
+
+            #----- Totals
+            total = await stats.find_one({"_id": "total"}) or {}
+            averages = _averages(total)
+            summary = {}
+            if total:
+                summary = {
+                    "total_streams": total.get("streams", 0),
+                    "total_bytes":   total.get("total_bytes", 0),
+                    "avg_speed":     averages["avg_mbps"],
+                    "peak_speed":    total.get("peak_mbps", 0),
+                    "avg_duration":  averages["avg_duration"],
+                }
 
             #----- Per-client breakdown
-            per_client_pipeline = [
-                {"$group": {
-                    "_id":          "$client_index",
-                    "streams":      {"$sum": 1},
-                    "avg_mbps":     {"$avg": "$avg_mbps"},
-                    "peak_mbps":    {"$max": "$peak_mbps"},
-                    "total_bytes":  {"$sum": "$total_bytes"},
-                }},
-                {"$sort": {"_id": 1}},
-            ]
-            per_client = await col.aggregate(per_client_pipeline).to_list(None)
-            for row in per_client:
-                row["client_index"] = row.pop("_id")
-                row["avg_mbps"]     = round(row.get("avg_mbps", 0), 3)
-                row["peak_mbps"]    = round(row.get("peak_mbps", 0), 3)
+            per_client = []
+            async for doc in stats.find({"kind": "client"}).sort("client_index", ASCENDING):
+                per_client.append({
+                    "client_index": doc.get("client_index"),
+                    "streams":      doc.get("streams", 0),
+                    "avg_mbps":     _averages(doc)["avg_mbps"],
+                    "peak_mbps":    round(doc.get("peak_mbps") or 0, 3),
+                    "total_bytes":  doc.get("total_bytes", 0),
+                })
 
             #----- Recent records (newest first)
             recent_cursor = col.find(
@@ -2562,42 +4404,27 @@ class Database:
                 if "logged_at" in r:
                     r["logged_at"] = r["logged_at"].isoformat()
 
-            #----- Most-streamed titles
-            top_titles = await col.aggregate([
-                {"$match": {"title": {"$nin": [None, ""]}}},
-                {"$group": {"_id": "$title", "streams": {"$sum": 1}, "total_bytes": {"$sum": "$total_bytes"}}},
-                {"$sort": {"streams": -1}},
-                {"$limit": 8},
-            ]).to_list(None)
-            for r in top_titles:
-                r["title"] = r.pop("_id")
-
-            #----- Heaviest viewers (by data transferred)
-            top_users = await col.aggregate([
-                {"$match": {"user_name": {"$nin": [None, ""]}}},
-                {"$group": {"_id": "$user_name", "streams": {"$sum": 1}, "total_bytes": {"$sum": "$total_bytes"}}},
-                {"$sort": {"total_bytes": -1}},
-                {"$limit": 8},
-            ]).to_list(None)
-            for r in top_users:
-                r["user"] = r.pop("_id")
+            #----- Most-streamed titles / heaviest viewers (by data transferred)
+            top_titles = [
+                {"title": d["name"], "streams": d.get("streams", 0), "total_bytes": d.get("total_bytes", 0)}
+                async for d in stats.find({"kind": "title"}).sort("streams", DESCENDING).limit(8)
+            ]
+            top_users = [
+                {"user": d["name"], "streams": d.get("streams", 0), "total_bytes": d.get("total_bytes", 0)}
+                async for d in stats.find({"kind": "user"}).sort("total_bytes", DESCENDING).limit(8)
+            ]
 
             #----- Streams & data per day (last 14 days, chronological)
-            per_day = await col.aggregate([
-                {"$group": {
-                    "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$logged_at"}},
-                    "streams": {"$sum": 1},
-                    "total_bytes": {"$sum": "$total_bytes"},
-                }},
-                {"$sort": {"_id": -1}},
-                {"$limit": 14},
+            since = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=13)
+            per_day = await tracking["stream_rollups"].aggregate([
+                {"$match": {"grain": "day", "bucket": {"$gte": since}}},
+                {"$group": {"_id": "$bucket", "streams": {"$sum": "$streams"}, "total_bytes": {"$sum": "$total_bytes"}}},
+                {"$sort": {"_id": 1}},
             ]).to_list(None)
             for r in per_day:
-                r["date"] = r.pop("_id")
-            per_day.reverse()
+                r["date"] = r.pop("_id").strftime("%Y-%m-%d")
 
-            distinct_users = await col.distinct("user_name")
-            summary["active_users"] = len([u for u in distinct_users if u and u != "Unknown"])
+            summary["active_users"] = await stats.count_documents({"kind": "user", "name": {"$ne": "Unknown"}})
 
             return {
                 "summary":    summary,
@@ -2611,6 +4438,182 @@ class Database:
             LOGGER.error(f"get_stream_analytics error: {e}")
             return {"summary": {}, "per_client": [], "top_titles": [], "top_users": [], "per_day": [], "recent": []}
 
+    #----- Bucketed series from the rollups, optionally narrowed to one client / DC / token
+    async def get_stream_series(
+        self,
+        grain: str = "hour",
+        span: int = 24,
+        client_index: Optional[int] = None,
+        dc_id: Optional[int] = None,
+        token: Optional[str] = None,
+    ) -> List[dict]:
+        if grain not in _ROLLUP_GRAINS:
+            raise ValueError(f"Unknown grain '{grain}' (use minute, hour or day).")
+        fmt, _ = _ROLLUP_GRAINS[grain]
+        step = {"minute": timedelta(minutes=1), "hour": timedelta(hours=1), "day": timedelta(days=1)}[grain]
+        now = datetime.strptime(datetime.utcnow().strftime(fmt), fmt)
+        match: Dict[str, Any] = {"grain": grain, "bucket": {"$gt": now - step * max(1, span)}}
+        for field, value in (("client_index", client_index), ("dc_id", dc_id), ("token", token)):
+            if value is not None:
+                match[field] = value
+        rows = await self.dbs["tracking"]["stream_rollups"].aggregate([
+            {"$match": match},
+            {"$group": {
+                "_id": "$bucket",
+                **{f: {"$sum": f"${f}"} for f in _ROLLUP_SUMS},
+                "peak_mbps": {"$max": "$peak_mbps"},
+            }},
+            {"$sort": {"_id": 1}},
+        ]).to_list(None)
+        return [{
+            "bucket": r["_id"].isoformat(),
+            "streams": r["streams"],
+            "total_bytes": r["total_bytes"],
+            "avg_mbps": round(r["mbps_sum"] / r["streams"], 3) if r["streams"] else 0,
+            "peak_mbps": round(r.get("peak_mbps") or 0, 3),
+        } for r in rows]
+
+    async def clear_stream_analytics(self) -> int:
+        tracking = self.dbs["tracking"]
+        result = await tracking["stream_analytics"].delete_many({})
+        await tracking["stream_rollups"].delete_many({})
+        await tracking["stream_stats"].delete_many({})
+        return result.deleted_count
+
+    #----- ── Ingest journal (tracking.ingest_journal) ──
+    #----- One document per channel message, keyed "<chat_id>:<msg_id>", written before metadata
+    #----- lookup and marked done after the insert, so a restart replays whatever was in flight.
+    @staticmethod
+    def _ingest_key(chat_id: int, msg_id: int) -> str:
+        return f"{int(chat_id)}:{int(msg_id)}"
+
+    #----- Record (or re-arm) a job owned by `owner`; returns False when it was already done
+    async def journal_ingest(
+        self, chat_id: int, msg_id: int, *, owner: str, kind: str = "new",
+        name: str = "", override_id: Optional[str] = None, season_hint: Optional[int] = None,
+        force: bool = False,
+    ) -> bool:
+        journal = self.dbs["tracking"]["ingest_journal"]
+        key = self._ingest_key(chat_id, msg_id)
+        if not force:
+            existing = await journal.find_one({"_id": key}, {"status": 1})
+            if existing and existing.get("status") == "done":
+                return False
+        now = datetime.utcnow()
+        await journal.update_one(
+            {"_id": key},
+            {
+                "$set": {
+                    "chat_id": int(chat_id), "msg_id": int(msg_id), "kind": kind, "name": name,
+                    "override_id": override_id, "season_hint": season_hint,
+                    "status": "pending", "attempts": 0, "next_at": now, "last_error": None,
+                    "owner": owner, "claimed_at": now, "updated_at": now,
+                },
+                "$setOnInsert": {"created_at": now},
+                "$unset": {"done_at": "", "dead_at": ""},
+            },
+            upsert=True,
+        )
+        return True
+
+    #----- Claim due jobs nobody in this process holds: released retries, or anything left by an earlier boot
+    async def claim_ingest_jobs(self, owner: str, limit: int = 20) -> List[dict]:
+        journal = self.dbs["tracking"]["ingest_journal"]
+        now = datetime.utcnow()
+        claimed = []
+        for _ in range(limit):
+            doc = await journal.find_one_and_update(
+                {
+                    "status": {"$in": ["pending", "retry"]},
+                    "next_at": {"$lte": now},
+                    "$or": [{"owner": {"$ne": owner}}, {"claimed_at": None}],
+                },
+                {"$set": {"owner": owner, "claimed_at": now}},
+                sort=[("next_at", ASCENDING)],
+                return_document=ReturnDocument.AFTER,
+            )
+            if not doc:
+                break
+            claimed.append(doc)
+        return claimed
+
+    async def complete_ingest(self, chat_id: int, msg_id: int, note: str = "") -> None:
+        await self.dbs["tracking"]["ingest_journal"].update_one(
+            {"_id": self._ingest_key(chat_id, msg_id)},
+            {"$set": {"status": "done", "done_at": datetime.utcnow(), "note": note, "claimed_at": None}},
+        )
+
+    #----- Count a failed attempt: back off exponentially, or dead-letter once attempts run out.
+    #----- Returns the new status ("retry" / "dead").
+    async def fail_ingest(self, chat_id: int, msg_id: int, error: str, permanent: bool = False) -> str:
+        journal = self.dbs["tracking"]["ingest_journal"]
+        key = self._ingest_key(chat_id, msg_id)
+        doc = await journal.find_one_and_update(
+            {"_id": key},
+            {"$inc": {"attempts": 1}, "$set": {"last_error": str(error)[:500], "claimed_at": None}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if not doc:
+            return "dead"
+        now = datetime.utcnow()
+        attempts = int(doc.get("attempts") or 1)
+        if permanent or attempts >= _INGEST_MAX_ATTEMPTS:
+            await journal.update_one({"_id": key}, {"$set": {"status": "dead", "dead_at": now}})
+            return "dead"
+        delay = min(_INGEST_BACKOFF_MAX, _INGEST_BACKOFF_BASE * 4 ** (attempts - 1))
+        await journal.update_one({"_id": key}, {"$set": {"status": "retry", "next_at": now + timedelta(seconds=delay)}})
+        return "retry"
+
+    async def get_ingest_journal_counts(self) -> Dict[str, int]:
+        counts = {"pending": 0, "retry": 0, "dead": 0, "done": 0}
+        async for row in self.dbs["tracking"]["ingest_journal"].aggregate(
+            [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+        ):
+            counts[str(row["_id"])] = row["count"]
+        return counts
+
+    async def get_ingest_dead_letters(self, page: int = 1, per_page: int = 50) -> dict:
+        journal = self.dbs["tracking"]["ingest_journal"]
+        page = max(1, int(page))
+        per_page = max(1, min(200, int(per_page)))
+        total = await journal.count_documents({"status": "dead"})
+        items = []
+        cursor = journal.find({"status": "dead"}).sort("dead_at", DESCENDING).skip((page - 1) * per_page).limit(per_page)
+        async for doc in cursor:
+            items.append({
+                "id": doc["_id"],
+                "chat_id": doc.get("chat_id"),
+                "msg_id": doc.get("msg_id"),
+                "kind": doc.get("kind"),
+                "name": doc.get("name") or "",
+                "attempts": doc.get("attempts") or 0,
+                "last_error": doc.get("last_error") or "",
+                "dead_at": doc["dead_at"].isoformat() if doc.get("dead_at") else None,
+            })
+        return {
+            "items": items, "total": total, "page": page, "per_page": per_page,
+            "total_pages": max(1, (total + per_page - 1) // per_page),
+        }
+
+    #----- Send dead letters back to the replay loop (all of them when `ids` is None)
+    async def requeue_ingest(self, ids: Optional[List[str]] = None) -> int:
+        query: Dict[str, Any] = {"status": "dead"}
+        if ids is not None:
+            query["_id"] = {"$in": [str(i) for i in ids]}
+        result = await self.dbs["tracking"]["ingest_journal"].update_many(
+            query,
+            {"$set": {"status": "pending", "attempts": 0, "next_at": datetime.utcnow(), "claimed_at": None},
+             "$unset": {"dead_at": ""}},
+        )
+        return result.modified_count
+
+    async def discard_ingest(self, ids: Optional[List[str]] = None) -> int:
+        query: Dict[str, Any] = {"status": "dead"}
+        if ids is not None:
+            query["_id"] = {"$in": [str(i) for i in ids]}
+        result = await self.dbs["tracking"]["ingest_journal"].delete_many(query)
+        return result.deleted_count
+
 
 
     @staticmethod
@@ -2749,10 +4752,17 @@ class Database:
 
             await collection.delete_one({"_id": source_id})
             await collection.replace_one({"_id": existing_other["_id"]}, existing_other)
+            self.invalidate_listings(collection_name)
+            await self._reindex_title(collection_name, int(tmdb_id), int(db_index))
+            await self._reindex_title(collection_name, existing_other.get("tmdb_id"), int(db_index))
 
             updated_doc = await collection.find_one({"_id": existing_other["_id"]})
             return convert_objectid_to_str(updated_doc) if updated_doc else None
         await collection.replace_one({"_id": source_id}, current_doc)
+        self.invalidate_listings(collection_name)
+        if new_tmdb_id != int(tmdb_id):
+            await self._reindex_title(collection_name, int(tmdb_id), int(db_index))
+        await self._reindex_title(collection_name, new_tmdb_id, int(db_index))
 
         updated_doc = await collection.find_one({"_id": source_id})
         return convert_objectid_to_str(updated_doc) if updated_doc else None
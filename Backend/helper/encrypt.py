@@ -1,12 +1,32 @@
 import asyncio
+import base64
+import hashlib
+import hmac
 import json
+import threading
 import zlib
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
 
 executor = ThreadPoolExecutor()
 
 BASE62_ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
 
+#----- Compact stream ids: "_" + base64url(header | varint body | optional HMAC tag).
+#----- "_" never occurs in base62, so legacy (JSON + zlib + base62) ids stay decodable.
+COMPACT_PREFIX = "_"
+COMPACT_VERSION = 1
+_FLAG_SIGNED = 0x01
+_FLAG_PARTS = 0x02
+_FLAG_ZIP = 0x04
+_TAG_BYTES = 8
+#----- Signed legacy ids (payloads the compact form can't carry): "<base62>.<base64url tag>"
+LEGACY_TAG_SEP = "."
+
+#----- Decoded payloads are memoized: players fire dozens of Range requests per id
+DECODE_CACHE_SIZE = 8192
+
 
 #----- zlib (de)compression
 def compress_data(data):
@@ -34,20 +54,334 @@ def base62_decode(data):
     return num.to_bytes((num.bit_length() + 7) // 8, 'big') or b'\0'
 
 
+#----- Unsigned LEB128 varints; signed values are zigzag-mapped first (chat ids are negative)
+def _put_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(data: bytes, pos: int):
+    result = shift = 0
+    while True:
+        if pos >= len(data) or shift > 63:
+            raise ValueError("Truncated stream id")
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+#----- HMAC key for signed ids: the persisted stream id key (None = signing off)
+def _signing_key(required: bool = False) -> Optional[bytes]:
+    from Backend.helper.settings_manager import SettingsManager
+
+    settings = SettingsManager.current()
+    if not (settings.signed_stream_ids or required) or not settings.stream_id_key:
+        return None
+    return bytes.fromhex(settings.stream_id_key)
+
+
+#----- Keys a signed id may verify against: current first, then keys replaced by a restore
+def _verify_keys() -> List[bytes]:
+    from Backend.helper.settings_manager import SettingsManager
+
+    settings = SettingsManager.current()
+    keys = []
+    for key in [settings.stream_id_key] + settings.stream_id_previous_keys:
+        try:
+            keys.append(bytes.fromhex(key))
+        except (TypeError, ValueError):
+            continue
+    return keys
+
+
+#----- Signing on and "Require Signed Stream IDs" set: public routes refuse unsigned ids
+def _signature_required() -> bool:
+    from Backend.helper.settings_manager import SettingsManager
+
+    settings = SettingsManager.current()
+    return settings.require_signed_stream_ids and _signing_key() is not None
+
+
+def _is_signed(encoded: str) -> bool:
+    if encoded.startswith(COMPACT_PREFIX):
+        try:
+            header = base64.urlsafe_b64decode(encoded[1:3] + "==")
+        except Exception:
+            return False
+        return bool(header) and bool(header[0] & _FLAG_SIGNED)
+    return LEGACY_TAG_SEP in encoded
+
+
+def _tag(key: bytes, data: bytes) -> bytes:
+    return hmac.new(key, data, hashlib.sha256).digest()[:_TAG_BYTES]
+
+
+#----- Refs the compact form can carry: {"chat_id", "msg_id"} or {"parts": [...], "zip"?}
+def _compact_refs(data) -> Optional[tuple]:
+    if not isinstance(data, dict):
+        return None
+    keys = set(data)
+    if keys == {"chat_id", "msg_id"}:
+        refs, flags = [data], 0
+    elif keys in ({"parts"}, {"parts", "zip"}) and isinstance(data["parts"], list) and data["parts"]:
+        if "zip" in data and data["zip"] is not True:
+            return None
+        refs = data["parts"]
+        flags = _FLAG_PARTS | (_FLAG_ZIP if data.get("zip") else 0)
+        if any(not isinstance(r, dict) or set(r) != {"chat_id", "msg_id"} for r in refs):
+            return None
+    else:
+        return None
+    for ref in refs:
+        for field in ("chat_id", "msg_id"):
+            if type(ref[field]) is not int:
+                return None
+        if ref["msg_id"] < 0:
+            return None
+    return refs, flags
+
+
+def encode_compact(data, sign: Optional[bool] = None, key: Optional[bytes] = None) -> Optional[str]:
+    packed = _compact_refs(data)
+    if packed is None:
+        return None
+    refs, flags = packed
+    if key is None and sign is not False:
+        key = _signing_key(required=bool(sign))
+    if key:
+        flags |= _FLAG_SIGNED
+
+    out = bytearray([(COMPACT_VERSION << 4) | flags])
+    if flags & _FLAG_PARTS:
+        _put_varint(out, len(refs))
+    #----- Parts are usually consecutive messages in one chat: store deltas after the first
+    prev_chat = prev_msg = 0
+    for ref in refs:
+        _put_varint(out, _zigzag(ref["chat_id"] - prev_chat))
+        _put_varint(out, _zigzag(ref["msg_id"] - prev_msg))
+        prev_chat, prev_msg = ref["chat_id"], ref["msg_id"]
+    if key:
+        out += _tag(key, bytes(out))
+    return COMPACT_PREFIX + base64.urlsafe_b64encode(bytes(out)).rstrip(b"=").decode()
+
+
+def decode_compact(encoded: str) -> dict:
+    body = encoded[len(COMPACT_PREFIX):]
+    raw = base64.urlsafe_b64decode(body + "=" * (-len(body) % 4))
+    if not raw or raw[0] >> 4 != COMPACT_VERSION:
+        raise ValueError("Unsupported stream id version")
+    flags = raw[0] & 0x0F
+
+    if flags & _FLAG_SIGNED:
+        raw, tag = raw[:-_TAG_BYTES], raw[-_TAG_BYTES:]
+        if not any(hmac.compare_digest(tag, _tag(key, raw)) for key in _verify_keys()):
+            raise ValueError("Stream id signature mismatch")
+
+    pos = 1
+    count = 1
+    if flags & _FLAG_PARTS:
+        count, pos = _get_varint(raw, pos)
+    refs = []
+    chat = msg = 0
+    for _ in range(count):
+        delta, pos = _get_varint(raw, pos)
+        chat += _unzigzag(delta)
+        delta, pos = _get_varint(raw, pos)
+        msg += _unzigzag(delta)
+        refs.append({"chat_id": chat, "msg_id": msg})
+    if pos != len(raw):
+        raise ValueError("Trailing bytes in stream id")
+
+    if not flags & _FLAG_PARTS:
+        return refs[0]
+    result = {"parts": refs}
+    if flags & _FLAG_ZIP:
+        result["zip"] = True
+    return result
+
+
+#----- Legacy codec (JSON + zlib + base62); still used for anything the compact form can't carry
+def encode_legacy(data) -> str:
+    return base62_encode(compress_data(json.dumps(data)))
+
+
+def decode_legacy(encoded_data: str):
+    return json.loads(decompress_data(base62_decode(encoded_data)))
+
+
+def _sign_legacy(encoded: str, key: bytes) -> str:
+    tag = base64.urlsafe_b64encode(_tag(key, encoded.encode())).rstrip(b"=").decode()
+    return f"{encoded}{LEGACY_TAG_SEP}{tag}"
+
+
+def _verify_legacy(encoded: str) -> str:
+    body, _, tag = encoded.partition(LEGACY_TAG_SEP)
+    for key in _verify_keys():
+        if hmac.compare_digest(tag, _sign_legacy(body, key).partition(LEGACY_TAG_SEP)[2]):
+            return body
+    raise ValueError("Stream id signature mismatch")
+
+
+#----- Read-only dict: cached payloads are shared by every caller, so nobody may mutate them
+class FrozenDict(dict):
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("decoded stream payloads are read-only")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return FrozenDict((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+#----- Bounded LRU of decoded payloads keyed by the encoded string
+class _DecodeCache:
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._items: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.capacity:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._items)
+            self._items.clear()
+            return count
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0,
+            }
+
+
+_decode_cache = _DecodeCache(DECODE_CACHE_SIZE)
+
+
+def decode_cache_stats() -> Dict[str, Any]:
+    return _decode_cache.stats()
+
+
+def clear_decode_cache() -> int:
+    return _decode_cache.clear()
+
+
 #----- Offload a blocking callable to the thread pool
 async def _run(fn, data):
     loop = asyncio.get_running_loop()
     return await loop.run_in_executor(executor, fn, data)
 
 
-#----- Encode a JSON-serializable value into a compact base62 string
+#----- Encode a JSON-serializable value into a compact URL-safe string
 async def encode_string(data):
-    compressed_data = await _run(compress_data, json.dumps(data))
-    return await _run(base62_encode, compressed_data)
+    compact = encode_compact(data)
+    if compact is not None:
+        return compact
+    encoded = await _run(encode_legacy, data)
+    key = _signing_key() if isinstance(data, dict) else None
+    return _sign_legacy(encoded, key) if key else encoded
+
+
+#----- Decode a string produced by encode_string (either format) back into the original value.
+#----- Dict payloads (stream ids) come back as shared read-only values from the LRU.
+#----- strict: the id came from a client request, so enforce "Require Signed Stream IDs".
+async def decode_string(encoded_data, strict: bool = False):
+    if strict and _signature_required() and not _is_signed(encoded_data):
+        raise ValueError("Unsigned stream id")
+    cached = _decode_cache.get(encoded_data)
+    if cached is not None:
+        return cached
+    if encoded_data.startswith(COMPACT_PREFIX):
+        decoded = decode_compact(encoded_data)
+    else:
+        body = _verify_legacy(encoded_data) if LEGACY_TAG_SEP in encoded_data else encoded_data
+        decoded = await _run(decode_legacy, body)
+    if isinstance(decoded, dict):
+        decoded = _freeze(decoded)
+        _decode_cache.put(encoded_data, decoded)
+    return decoded
+
+
+#----- Every id an existing library may store for one message (signed, unsigned, legacy).
+#----- Signed forms are listed for every known key: signing may since have been switched off,
+#----- and ids from before a restore carry the replaced key.
+async def stream_id_variants(chat_id: int, msg_id: int) -> List[str]:
+    ref = {"chat_id": chat_id, "msg_id": msg_id}
+    variants = [encode_compact(ref, key=key) for key in _verify_keys()]
+    variants += [encode_compact(ref, sign=False), await _run(encode_legacy, ref)]
+    return [v for i, v in enumerate(variants) if v and v not in variants[:i]]
+
+
+#----- python -m Backend.helper.encrypt : compare the compact codec with the legacy one
+def _benchmark(rounds: int = 20000) -> None:
+    import time
+
+    samples = {
+        "single": {"chat_id": -1001234567890, "msg_id": 48213},
+        "8 parts": {"parts": [{"chat_id": -1001234567890, "msg_id": 48213 + i} for i in range(8)], "zip": True},
+    }
+    for label, payload in samples.items():
+        legacy = encode_legacy(payload)
+        compact = encode_compact(payload, sign=False)
+        assert decode_legacy(legacy) == payload and decode_compact(compact) == payload
+        for name, enc, dec, token in (
+            ("legacy", encode_legacy, decode_legacy, legacy),
+            ("compact", lambda d: encode_compact(d, sign=False), decode_compact, compact),
+        ):
+            started = time.perf_counter()
+            for _ in range(rounds):
+                enc(payload)
+            enc_us = (time.perf_counter() - started) / rounds * 1e6
+            started = time.perf_counter()
+            for _ in range(rounds):
+                dec(token)
+            dec_us = (time.perf_counter() - started) / rounds * 1e6
+            print(f"{label:8} {name:8} len={len(token):4}  encode {enc_us:7.2f}us  decode {dec_us:7.2f}us")
 
 
-#----- Decode a base62 string back into the original value
-async def decode_string(encoded_data):
-    compressed_data = await _run(base62_decode, encoded_data)
-    json_data = await _run(decompress_data, compressed_data)
-    return json.loads(json_data)
+if __name__ == "__main__":
+    _benchmark()
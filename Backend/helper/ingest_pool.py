@@ -0,0 +1,175 @@
+import asyncio
+import time
+import zlib
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from Backend.logger import LOGGER
+
+DEFAULT_WORKERS = 4
+MAX_WORKERS = 32
+DRAIN_TIMEOUT = 30.0
+
+_STOP = object()
+
+
+#----- Ingest worker pool: jobs are sharded by title so different titles insert concurrently
+#----- while every update to one (media_type, tmdb_id) runs on the same worker, in order.
+class IngestPool:
+    def __init__(self) -> None:
+        self._shards: List[asyncio.Queue] = []
+        self._workers: List[asyncio.Task] = []
+        self._busy: List[Optional[str]] = []
+        self._done: List[int] = []
+        self._ready = asyncio.Event()
+        self._resize_lock = asyncio.Lock()
+        self._accepting = True
+        self.submitted = 0
+        self.processed = 0
+        self.failed = 0
+        self.high_water = 0
+        self._busy_seconds = 0.0
+        self._wait_seconds = 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self._shards)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    @staticmethod
+    def shard_key(media_type, tmdb_id) -> str:
+        return f"{media_type or ''}:{tmdb_id or ''}"
+
+    def _shard_for(self, key: str) -> int:
+        return zlib.crc32(key.encode()) % len(self._shards)
+
+    def depth(self) -> int:
+        return sum(q.qsize() for q in self._shards)
+
+    #----- Spawn the workers (no-op when already running)
+    def start(self, workers: int = DEFAULT_WORKERS) -> None:
+        if self._workers:
+            return
+        self._spawn(max(1, min(MAX_WORKERS, int(workers or DEFAULT_WORKERS))))
+        self._accepting = True
+        self._ready.set()
+        LOGGER.info(f"[Ingest] Started {self.size} ingest worker(s).")
+
+    def _spawn(self, count: int) -> None:
+        self._shards = [asyncio.Queue() for _ in range(count)]
+        self._busy = [None] * count
+        self._done = [0] * count
+        self._workers = [
+            asyncio.create_task(self._worker(i, q), name=f"ingest-worker-{i}")
+            for i, q in enumerate(self._shards)
+        ]
+
+    #----- Queue a job for a title; the returned future resolves to the job's result (None on error)
+    async def submit(self, key: str, job: Callable[[], Awaitable[Any]], label: str = "") -> asyncio.Future:
+        if not self._accepting:
+            raise RuntimeError("Ingest pool is draining; not accepting new files.")
+        if not self._workers:
+            self.start()
+        await self._ready.wait()
+        future = asyncio.get_running_loop().create_future()
+        self._shards[self._shard_for(key)].put_nowait((job, future, label or key, time.monotonic()))
+        self.submitted += 1
+        self.high_water = max(self.high_water, self.depth())
+        return future
+
+    async def _worker(self, index: int, queue: asyncio.Queue) -> None:
+        while True:
+            item = await queue.get()
+            if item is _STOP:
+                queue.task_done()
+                return
+            job, future, label, queued_at = item
+            started = time.monotonic()
+            self._wait_seconds += started - queued_at
+            self._busy[index] = label
+            try:
+                result = await job()
+                self.processed += 1
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.cancel()
+                raise
+            except Exception as e:
+                LOGGER.error(f"[Ingest] Job '{label}' failed: {e}")
+                self.failed += 1
+                result = None
+            finally:
+                self._busy[index] = None
+                self._busy_seconds += time.monotonic() - started
+                queue.task_done()
+            self._done[index] += 1
+            if not future.done():
+                future.set_result(result)
+
+    #----- Let the current workers finish everything queued, then stop them
+    async def _retire(self) -> None:
+        for q in self._shards:
+            q.put_nowait(_STOP)
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    #----- Change the worker count. New submissions wait while the old shards drain,
+    #----- so per-title ordering holds across the re-hash.
+    async def resize(self, workers: int) -> int:
+        workers = max(1, min(MAX_WORKERS, int(workers or DEFAULT_WORKERS)))
+        async with self._resize_lock:
+            if not self._workers or workers == self.size:
+                return self.size
+            self._ready.clear()
+            try:
+                await self._retire()
+                self._spawn(workers)
+            finally:
+                self._ready.set()
+            LOGGER.info(f"[Ingest] Resized ingest pool to {workers} worker(s).")
+            return workers
+
+    #----- Graceful shutdown: stop accepting, wait for queued jobs up to `timeout`, then cancel
+    async def drain(self, timeout: float = DRAIN_TIMEOUT) -> Dict[str, int]:
+        self._accepting = False
+        if not self._workers:
+            return {"drained": 0, "abandoned": 0}
+        pending = self.depth() + sum(1 for b in self._busy if b)
+        if pending:
+            LOGGER.info(f"[Ingest] Draining {pending} queued ingest job(s)...")
+        try:
+            await asyncio.wait_for(asyncio.gather(*(q.join() for q in self._shards)), timeout)
+        except asyncio.TimeoutError:
+            pass
+        abandoned = self.depth() + sum(1 for b in self._busy if b)
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if abandoned:
+            LOGGER.warning(f"[Ingest] Drain timed out; {abandoned} ingest job(s) were not processed.")
+        return {"drained": pending - abandoned, "abandoned": abandoned}
+
+    def stats(self) -> Dict[str, Any]:
+        finished = self.processed + self.failed
+        return {
+            "workers": self.size,
+            "accepting": self._accepting,
+            "queued": self.depth(),
+            "in_flight": sum(1 for b in self._busy if b),
+            "high_water": self.high_water,
+            "submitted": self.submitted,
+            "processed": self.processed,
+            "failed": self.failed,
+            "avg_job_ms": round(self._busy_seconds / finished * 1000, 1) if finished else 0.0,
+            "avg_wait_ms": round(self._wait_seconds / finished * 1000, 1) if finished else 0.0,
+            "shards": [
+                {"queued": q.qsize(), "active": self._busy[i], "done": self._done[i]}
+                for i, q in enumerate(self._shards)
+            ],
+        }
+
+
+ingest_pool = IngestPool()
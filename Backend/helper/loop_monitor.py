@@ -0,0 +1,286 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from Backend.logger import LOGGER
+
+SAMPLE_INTERVAL = 0.25
+SLOW_CALLBACK_MS = 100.0
+LOG_BLOCK_MS = 500.0
+LOG_COOLDOWN = 60.0
+WATCH_INTERVAL = 0.02
+RECENT_SAMPLES = 2400
+MAX_OFFENDERS = 200
+STACK_DEPTH = 12
+
+#----- Histogram upper bounds in ms; the last bucket is everything above
+LAG_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _describe(handle: asyncio.Handle) -> str:
+    cb = handle._callback
+    owner = getattr(cb, "__self__", None)
+    if isinstance(owner, asyncio.Future) and hasattr(owner, "get_coro"):
+        coro = owner.get_coro()
+        return getattr(coro, "__qualname__", None) or repr(coro)
+    return getattr(cb, "__qualname__", None) or repr(cb)
+
+
+#----- Stack of the loop thread, innermost frame last; frames outside the app are kept but
+#----- the offender key is the innermost frame from our own code
+def _capture(thread_id: int) -> Tuple[Optional[str], List[str]]:
+    frame = sys._current_frames().get(thread_id)
+    lines: List[str] = []
+    key = None
+    while frame is not None and len(lines) < STACK_DEPTH:
+        code = frame.f_code
+        ours = code.co_filename.startswith(_APP_ROOT)
+        path = os.path.relpath(code.co_filename, os.path.dirname(_APP_ROOT)) if ours else \
+            os.path.join(*code.co_filename.split(os.sep)[-2:])
+        where = f"{path}:{frame.f_lineno} {code.co_name}"
+        if key is None and ours and not code.co_filename.endswith("loop_monitor.py"):
+            key = where
+        lines.append(where)
+        frame = frame.f_back
+    lines.reverse()
+    return key, lines
+
+
+class _Offender:
+    __slots__ = ("count", "total_ms", "max_ms", "last_at", "stack", "logged_at")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_at = 0.0
+        self.stack: List[str] = []
+        self.logged_at = 0.0
+
+
+#----- Event-loop lag sampler + slow-callback profiler.
+#----- A sampler task measures how late its own sleeps wake up (the lag every other coroutine
+#----- sees) and a watchdog thread grabs the loop thread's stack while a stall is still going,
+#----- so stalls are charged to the line that was running. That part is always on.
+#----- Callback timing (opt-in, stdlib loop only) additionally wraps every Handle._run so slow
+#----- callbacks are charged to their coroutine; it costs two clock reads per callback, so it
+#----- stays off unless the "loop_callback_timing" setting asks for it.
+class LoopMonitor:
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread = 0
+        self._patched = False
+        self._original_run = None
+        #----- (seq, started) of the callback currently running on the loop thread
+        self._current: Optional[Tuple[int, float]] = None
+        self._seq = 0
+        #----- (seq, key, stack) grabbed by the watchdog for a still-running callback or stall
+        self._captured: Optional[Tuple[int, Optional[str], List[str]]] = None
+        self._beat: Tuple[int, float] = (0, 0.0)
+        self._offenders: Dict[str, _Offender] = {}
+        self.reset()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def reset(self) -> None:
+        self._started = time.monotonic()
+        self._recent: Deque[float] = deque(maxlen=RECENT_SAMPLES)
+        self._histogram = [0] * (len(LAG_BUCKETS) + 1)
+        self._samples = 0
+        self._lag_total = 0.0
+        self._lag_max = 0.0
+        self._lag_current = 0.0
+        self._slow = 0
+        self._blocked_ms = 0.0
+        self._offenders = {}
+
+    def start(self, callback_timing: bool = False) -> None:
+        if self.running:
+            return
+        loop = self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._patched = self._patch(loop) if callback_timing else False
+        self._stop.clear()
+        self._task = loop.create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        mode = "callback timing" if self._patched else "stall sampling"
+        LOGGER.info(f"[LoopMonitor] Watching event-loop lag ({mode}, slow > {SLOW_CALLBACK_MS:.0f} ms)")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._unpatch()
+
+    #----- Switch per-callback timing on/off while running (settings change)
+    def set_callback_timing(self, enabled: bool) -> bool:
+        if enabled and not self._patched and self.running:
+            self._patched = self._patch(self._loop)
+        elif not enabled:
+            self._unpatch()
+        return self._patched
+
+    def _unpatch(self) -> None:
+        if self._patched:
+            asyncio.events.Handle._run = self._original_run
+            self._patched = False
+
+    #----- ── Callback timing (stdlib loop only) ────────────────────────────────────
+    def _patch(self, loop) -> bool:
+        if not isinstance(loop, asyncio.BaseEventLoop):
+            return False
+        monitor = self
+        original = self._original_run = asyncio.events.Handle._run
+
+        def _run(handle):
+            monitor._seq += 1
+            seq = monitor._seq
+            started = time.perf_counter()
+            monitor._current = (seq, started)
+            try:
+                return original(handle)
+            finally:
+                monitor._current = None
+                elapsed = (time.perf_counter() - started) * 1000
+                if elapsed >= SLOW_CALLBACK_MS:
+                    monitor._charge(seq, _describe(handle), elapsed)
+
+        asyncio.events.Handle._run = _run
+        return True
+
+    #----- ── Lag sampler ───────────────────────────────────────────────────────────
+    async def _sample(self) -> None:
+        beat = 0
+        while True:
+            beat += 1
+            expected = time.perf_counter() + SAMPLE_INTERVAL
+            self._beat = (beat, expected)
+            await asyncio.sleep(SAMPLE_INTERVAL)
+            lag = max(0.0, (time.perf_counter() - expected) * 1000)
+            self._record_lag(lag)
+            if not self._patched and lag >= SLOW_CALLBACK_MS:
+                self._charge(-beat, None, lag)
+
+    def _record_lag(self, lag: float) -> None:
+        self._samples += 1
+        self._lag_total += lag
+        self._lag_current = lag
+        self._lag_max = max(self._lag_max, lag)
+        self._recent.append(lag)
+        for i, bound in enumerate(LAG_BUCKETS):
+            if lag <= bound:
+                self._histogram[i] += 1
+                break
+        else:
+            self._histogram[-1] += 1
+
+    #----- ── Watchdog thread: capture the stack of whatever is blocking right now ───
+    def _watch(self) -> None:
+        threshold = SLOW_CALLBACK_MS / 1000
+        while not self._stop.wait(WATCH_INTERVAL):
+            now = time.perf_counter()
+            if self._patched:
+                current = self._current
+                if current is None or now - current[1] < threshold:
+                    continue
+                seq = current[0]
+            else:
+                beat, expected = self._beat
+                if now - expected < threshold:
+                    continue
+                seq = -beat
+            captured = self._captured
+            if captured is not None and captured[0] == seq:
+                continue
+            try:
+                key, stack = _capture(self._loop_thread)
+            except Exception:
+                continue
+            self._captured = (seq, key, stack)
+
+    def _charge(self, seq: int, name: Optional[str], elapsed: float) -> None:
+        captured = self._captured
+        key, stack = None, []
+        if captured is not None and captured[0] == seq:
+            _, key, stack = captured
+        label = name or key or (stack[-1] if stack else "unknown (no stack captured)")
+        if name and key:
+            label = f"{name} @ {key}"
+
+        self._slow += 1
+        self._blocked_ms += elapsed
+        entry = self._offenders.get(label)
+        if entry is None:
+            if len(self._offenders) >= MAX_OFFENDERS:
+                smallest = min(self._offenders, key=lambda k: self._offenders[k].total_ms)
+                del self._offenders[smallest]
+            entry = self._offenders[label] = _Offender()
+        entry.count += 1
+        entry.total_ms += elapsed
+        entry.max_ms = max(entry.max_ms, elapsed)
+        entry.last_at = time.time()
+        if stack:
+            entry.stack = stack
+
+        if elapsed >= LOG_BLOCK_MS and entry.last_at - entry.logged_at >= LOG_COOLDOWN:
+            entry.logged_at = entry.last_at
+            where = f" at {stack[-1]}" if stack else ""
+            LOGGER.warning(f"[LoopMonitor] Event loop blocked {elapsed:.0f} ms by {label}{where}")
+
+    def _percentile(self, ordered: List[float], q: float) -> float:
+        if not ordered:
+            return 0.0
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 2)
+
+    def stats(self, top: int = 20) -> Dict[str, Any]:
+        ordered = sorted(self._recent)
+        histogram = [{"le_ms": bound, "count": self._histogram[i]} for i, bound in enumerate(LAG_BUCKETS)]
+        histogram.append({"le_ms": None, "count": self._histogram[-1]})
+        offenders = sorted(self._offenders.items(), key=lambda kv: kv[1].total_ms, reverse=True)[:top]
+        return {
+            "running": self.running,
+            "mode": "callbacks" if self._patched else "stalls",
+            "uptime_seconds": round(time.monotonic() - self._started, 1),
+            "sample_interval_ms": SAMPLE_INTERVAL * 1000,
+            "slow_callback_ms": SLOW_CALLBACK_MS,
+            "lag": {
+                "samples": self._samples,
+                "current_ms": round(self._lag_current, 2),
+                "avg_ms": round(self._lag_total / self._samples, 2) if self._samples else 0.0,
+                "max_ms": round(self._lag_max, 2),
+                "p50_ms": self._percentile(ordered, 0.5),
+                "p95_ms": self._percentile(ordered, 0.95),
+                "p99_ms": self._percentile(ordered, 0.99),
+                "histogram": histogram,
+            },
+            "slow_callbacks": self._slow,
+            "blocked_ms": round(self._blocked_ms, 1),
+            "offenders": [
+                {
+                    "callback": label,
+                    "count": o.count,
+                    "total_ms": round(o.total_ms, 1),
+                    "max_ms": round(o.max_ms, 1),
+                    "avg_ms": round(o.total_ms / o.count, 1),
+                    "last_at": o.last_at,
+                    "stack": o.stack,
+                }
+                for label, o in offenders
+            ],
+        }
+
+
+loop_monitor = LoopMonitor()
@@ -20,6 +20,7 @@ from Backend.helper.metadata.common import (
     extract_default_id,
     format_tmdb_image,
     gradient_cover_path,
+    override_matches_indexed,
     resolve_cover_url,
 )
 from Backend.helper.metadata.entry import (
@@ -33,7 +34,9 @@ from Backend.helper.metadata.entry import (
     search_movie_candidates,
     search_tv_candidates,
 )
+from Backend.helper.metadata.batch import metadata_batcher
 from Backend.helper.metadata.parse import parse_media_name
+from Backend.helper.metadata.parse_pool import parse_pool
 from Backend.helper.metadata.providers.tmdb import get_tmdb_client, tmdb_api_key
 from Backend.helper.metadata.resolvers import (
     resolve_movie as fetch_movie_metadata,
@@ -55,7 +58,10 @@ __all__ = [
     "get_tmdb_client",
     "gradient_cover_path",
     "metadata",
+    "metadata_batcher",
+    "override_matches_indexed",
     "parse_media_name",
+    "parse_pool",
     "resolve_cover_url",
     "search_any_candidates",
     "search_movie_candidates",
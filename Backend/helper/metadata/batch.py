@@ -0,0 +1,120 @@
+"""Burst batching for metadata lookups.
+
+A season pack or channel dump delivers many files for one release within a
+few seconds. Files are grouped by their normalised parsed title for a short
+window; the first file of a group resolves the series (search, details and the
+bulk per-season episode tables), then the remaining files run against the warm
+provider caches instead of each repeating the whole provider chain.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from Backend.helper.metadata.common import normalize_title
+from Backend.helper.metadata.entry import _is_anime_channel, metadata
+from Backend.helper.metadata.parse_pool import parse_pool
+from Backend.logger import LOGGER
+
+BATCH_WINDOW = 1.5
+BATCH_MAX_FILES = 64
+
+
+class _Batch:
+    __slots__ = ("items", "full")
+
+    def __init__(self) -> None:
+        self.items: List[Tuple[tuple, asyncio.Future]] = []
+        self.full = asyncio.Event()
+
+
+class MetadataBatcher:
+    def __init__(self, window: float = BATCH_WINDOW, max_files: int = BATCH_MAX_FILES) -> None:
+        self.window = window
+        self.max_files = max_files
+        self._open: Dict[str, _Batch] = {}
+        self.batches = 0
+        self.batched_files = 0
+        self.largest_batch = 0
+
+    # ── Grouping ─────────────────────────────────────────────────────────────
+    @staticmethod
+    async def batch_key(filename: str, channel, override_id: Optional[str] = None) -> Optional[str]:
+        # Same pool entry metadata() reads next, so grouping costs no extra parse
+        try:
+            parsed = (await parse_pool.parse(filename))["parsed"]
+        except Exception:
+            return None
+        if not parsed:
+            return None
+        title = normalize_title(parsed.get("title") or "")
+        if not title:
+            return None
+        anime = "anime" if _is_anime_channel(channel) else ""
+        return f"{title}|{parsed.get('year') or ''}|{anime}|{override_id or ''}"
+
+    # ── Public entry: same signature and result as metadata() ────────────────
+    async def resolve(
+        self,
+        filename: str,
+        channel: int,
+        msg_id,
+        override_id: str = None,
+        season_hint: int = None,
+    ) -> dict | None:
+        args = (filename, channel, msg_id, override_id, season_hint)
+        key = await self.batch_key(filename, channel, override_id)
+        if key is None:
+            return await metadata(*args)
+
+        future = asyncio.get_running_loop().create_future()
+        batch = self._open.get(key)
+        if batch is None:
+            batch = self._open[key] = _Batch()
+            asyncio.create_task(self._run(key, batch))
+        batch.items.append((args, future))
+        if len(batch.items) >= self.max_files:
+            batch.full.set()
+        return await future
+
+    async def _run(self, key: str, batch: _Batch) -> None:
+        try:
+            await asyncio.wait_for(batch.full.wait(), self.window)
+        except asyncio.TimeoutError:
+            pass
+        if self._open.get(key) is batch:
+            del self._open[key]
+
+        items = batch.items
+        self.batches += 1
+        self.batched_files += len(items)
+        self.largest_batch = max(self.largest_batch, len(items))
+        if len(items) > 1:
+            LOGGER.info(f"[Metadata] Resolving {len(items)} files for '{key.split('|', 1)[0]}' as one batch")
+
+        # Leader first: it fills the search/details/episode-table caches the followers reuse
+        leader, *followers = items
+        await self._settle(*leader)
+        if followers:
+            await asyncio.gather(*(self._settle(args, fut) for args, fut in followers))
+
+    @staticmethod
+    async def _settle(args: tuple, future: asyncio.Future) -> None:
+        try:
+            result = await metadata(*args)
+        except Exception as e:
+            LOGGER.error(f"[Metadata] Batched lookup failed for {args[0]}: {e}")
+            result = None
+        if not future.done():
+            future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "open_batches": len(self._open),
+            "batches": self.batches,
+            "batched_files": self.batched_files,
+            "largest_batch": self.largest_batch,
+        }
+
+
+metadata_batcher = MetadataBatcher()
@@ -288,6 +288,15 @@ def extract_default_id(text: str) -> str | None:
     return None
 
 
+def override_matches_indexed(override_id: str, imdb_id, tmdb_id) -> bool:
+    oid = str(override_id).strip().lower()
+    if oid.startswith("tt"):
+        return bool(imdb_id) and oid == str(imdb_id).strip().lower()
+    if oid.isdigit():
+        return tmdb_id not in (None, "") and oid == str(tmdb_id).strip()
+    return False
+
+
 def split_default_id(default_id) -> tuple:
     """Returns (imdb_id, tmdb_id, explicit_imdb, use_tmdb)."""
     if not default_id:
@@ -22,9 +22,8 @@ from Backend.helper.metadata.parse import (
     clean_anime_search_title,
     extract_absolute_episode,
     is_absolute_episode,
-    is_multipart_video,
-    parse_media_name,
 )
+from Backend.helper.metadata.parse_pool import parse_pool
 from Backend.helper.metadata.providers import cinemeta, tmdb
 from Backend.helper.metadata.resolvers import (
     resolve_anime_movie,
@@ -33,7 +32,6 @@ from Backend.helper.metadata.resolvers import (
     resolve_series,
 )
 from Backend.helper.settings_manager import SettingsManager
-from Backend.helper.split_files import parse_combined_episodes, parse_split_info, strip_part_suffix
 from Backend.logger import LOGGER
 
 
@@ -65,21 +63,25 @@ async def metadata(
     override_id: str = None,
     season_hint: int = None,
 ) -> dict | None:
-    if is_multipart_video(filename):
+    # PTN/GuessIt run in the parse pool; repeats of the same caption come from its cache
+    try:
+        bundle = await parse_pool.parse(filename)
+    except Exception as e:
+        LOGGER.error(f"Parsing failed for {filename}: {e}\n{traceback.format_exc()}")
+        return None
+
+    if bundle["multipart"]:
         LOGGER.info(f"Skipping {filename}: split video file not meant to be combined in Stremio")
         return None
 
-    split_info = parse_split_info(filename)
+    split_info = bundle["split"]
     part_number = split_info[1] if split_info else None
-    parse_target = strip_part_suffix(filename) if split_info else filename
-
-    try:
-        parsed = parse_media_name(parse_target)
-    except Exception as e:
-        LOGGER.error(f"Parsing failed for {filename}: {e}\n{traceback.format_exc()}")
+    parsed = bundle["parsed"]
+    if parsed is None:
+        LOGGER.error(f"Parsing failed for {filename}: {bundle['error']}")
         return None
 
-    combined = parse_combined_episodes(parse_target)
+    combined = bundle["combined"]
 
     excess = parsed.get("excess")
     if not combined and excess and any("combined" in item.lower() for item in excess):
@@ -6,8 +6,12 @@ seasonNumber/episodeNumber:
   1. Anime-Lists XML  (AniDB → TVDB/TMDB S/E + offsets)
   2. anibridge-mappings (daily JSON range maps)
 
-Both datasets are downloaded once and cached in-process (and optionally on
-disk under the working directory). Refresh is lazy + TTL-based.
+Both datasets are downloaded to a disk cache and compiled into small SQLite
+indexes (keyed by AniDB id, IMDb id and source descriptor) on a worker
+thread, so neither the XML parse nor the multi-MB JSON decode runs on the
+event loop or stays resident. Lookups read single rows on demand. When
+an index goes stale the old one keeps serving while the next generation is
+built in the background, then the two are swapped.
 """
 from __future__ import annotations
 
@@ -15,10 +19,12 @@ import asyncio
 import json
 import os
 import re
+import sqlite3
+import threading
 import time
 import xml.etree.ElementTree as ET
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import httpx
 
@@ -38,6 +44,9 @@ ANIBRIDGE_MIN_URL = (
 )
 
 _TTL_SECONDS = 24 * 3600
+# After a failed build, wait this long before trying again
+_RETRY_SECONDS = 600
+_INDEX_VERSION = 1
 
 _CACHE_DIR = os.environ.get(
     "EPISODE_MAPS_CACHE",
@@ -62,15 +71,6 @@ class AnimeListEntry:
     special_map: Dict[int, int] = field(default_factory=dict)
 
 
-_anime_lists: Dict[int, AnimeListEntry] = {}
-_anime_lists_by_imdb: Dict[str, List[AnimeListEntry]] = {}
-_anime_lists_loaded_at: float = 0.0
-_anime_lists_lock = asyncio.Lock()
-
-_anibridge: dict = {}
-_anibridge_loaded_at: float = 0.0
-_anibridge_lock = asyncio.Lock()
-
 _client: Optional[httpx.AsyncClient] = None
 _client_lock = asyncio.Lock()
 
@@ -90,15 +90,14 @@ def _ensure_cache_dir() -> None:
         pass
 
 
-def _read_disk(name: str) -> Optional[bytes]:
+def _cached_path(name: str, fresh: bool = True) -> Optional[str]:
     path = os.path.join(_CACHE_DIR, name)
     try:
         if not os.path.isfile(path):
             return None
-        if time.time() - os.path.getmtime(path) > _TTL_SECONDS:
+        if fresh and time.time() - os.path.getmtime(path) > _TTL_SECONDS:
             return None
-        with open(path, "rb") as f:
-            return f.read()
+        return path
     except Exception:
         return None
 
@@ -112,108 +111,110 @@ def _write_disk(name: str, data: bytes) -> None:
         LOGGER.debug(f"[EP_MAPS] disk cache write failed: {e}")
 
 
-def _parse_anime_lists_xml(raw: bytes) -> Dict[int, AnimeListEntry]:
-    out: Dict[int, AnimeListEntry] = {}
+def _iter_anime_lists_xml(path: str) -> Iterator[AnimeListEntry]:
+    # Streamed: each <anime> element is dropped once read, so the tree never sits in memory
+    for _, node in ET.iterparse(path, events=("end",)):
+        if node.tag != "anime":
+            continue
+        entry = _entry_from_node(node)
+        node.clear()
+        if entry is not None:
+            yield entry
+
+
+def _entry_from_node(node) -> Optional[AnimeListEntry]:
     try:
-        root = ET.fromstring(raw)
-    except ET.ParseError as e:
-        LOGGER.warning(f"[EP_MAPS] Anime-Lists XML parse error: {e}")
-        return out
+        anidb_id = int(node.get("anidbid") or 0)
+    except (TypeError, ValueError):
+        return None
+    if not anidb_id:
+        return None
 
-    for node in root.findall("anime"):
+    def _int_or_none(val):
+        if val is None or str(val).strip() in ("", "unknown", "movie"):
+            return None
         try:
-            anidb_id = int(node.get("anidbid") or 0)
+            return int(val)
         except (TypeError, ValueError):
-            continue
-        if not anidb_id:
-            continue
+            return None
+
+    tvdb_raw = (node.get("tvdbid") or "").strip()
+    tvdb_id = _int_or_none(tvdb_raw) if tvdb_raw not in ("movie", "unknown") else None
+    tmdb_tv = _int_or_none(node.get("tmdbtv"))
+    default_season = (node.get("defaulttvdbseason") or "").strip() or None
+    try:
+        ep_off = int(node.get("episodeoffset") or 0)
+    except (TypeError, ValueError):
+        ep_off = 0
+    tmdb_season = (node.get("tmdbseason") or "").strip() or None
+    try:
+        tmdb_off = int(node.get("tmdboffset") or 0)
+    except (TypeError, ValueError):
+        tmdb_off = 0
+    imdb = (node.get("imdbid") or "").strip() or None
+    name_el = node.find("name")
+    name = (name_el.text or "").strip() if name_el is not None else ""
 
-        def _int_or_none(val):
-            if val is None or str(val).strip() in ("", "unknown", "movie"):
-                return None
+    entry = AnimeListEntry(
+        anidb_id=anidb_id,
+        tvdb_id=tvdb_id,
+        tmdb_tv_id=tmdb_tv,
+        default_tvdb_season=default_season,
+        episode_offset=ep_off,
+        tmdb_season=tmdb_season,
+        tmdb_offset=tmdb_off,
+        imdb_id=imdb,
+        name=name,
+    )
+
+    ml = node.find("mapping-list")
+    if ml is not None:
+        for m in ml.findall("mapping"):
             try:
-                return int(val)
+                anidb_season = int(m.get("anidbseason") or 1)
             except (TypeError, ValueError):
-                return None
+                anidb_season = 1
+            tvdb_season_raw = m.get("tvdbseason")
+            tmdb_season_raw = m.get("tmdbseason")
+            text = (m.text or "").strip()
+
+            if text.startswith(";") and "start" not in m.attrib:
+                for pair in text.strip(";").split(";"):
+                    pair = pair.strip()
+                    if not pair or "-" not in pair:
+                        continue
+                    a, b = pair.split("-", 1)
+                    try:
+                        entry.special_map[int(a)] = int(b)
+                    except (TypeError, ValueError):
+                        continue
+                continue
 
-        tvdb_raw = (node.get("tvdbid") or "").strip()
-        tvdb_id = _int_or_none(tvdb_raw) if tvdb_raw not in ("movie", "unknown") else None
-        tmdb_tv = _int_or_none(node.get("tmdbtv"))
-        default_season = (node.get("defaulttvdbseason") or "").strip() or None
-        try:
-            ep_off = int(node.get("episodeoffset") or 0)
-        except (TypeError, ValueError):
-            ep_off = 0
-        tmdb_season = (node.get("tmdbseason") or "").strip() or None
-        try:
-            tmdb_off = int(node.get("tmdboffset") or 0)
-        except (TypeError, ValueError):
-            tmdb_off = 0
-        imdb = (node.get("imdbid") or "").strip() or None
-        name_el = node.find("name")
-        name = (name_el.text or "").strip() if name_el is not None else ""
-
-        entry = AnimeListEntry(
-            anidb_id=anidb_id,
-            tvdb_id=tvdb_id,
-            tmdb_tv_id=tmdb_tv,
-            default_tvdb_season=default_season,
-            episode_offset=ep_off,
-            tmdb_season=tmdb_season,
-            tmdb_offset=tmdb_off,
-            imdb_id=imdb,
-            name=name,
-        )
+            try:
+                start = int(m.get("start")) if m.get("start") not in (None, "") else None
+                end = int(m.get("end")) if m.get("end") not in (None, "") else None
+                offset = int(m.get("offset") or 0)
+            except (TypeError, ValueError):
+                start, end, offset = None, None, 0
 
-        ml = node.find("mapping-list")
-        if ml is not None:
-            for m in ml.findall("mapping"):
+            season_target = None
+            if tvdb_season_raw not in (None, ""):
                 try:
-                    anidb_season = int(m.get("anidbseason") or 1)
+                    season_target = int(tvdb_season_raw)
                 except (TypeError, ValueError):
-                    anidb_season = 1
-                tvdb_season_raw = m.get("tvdbseason")
-                tmdb_season_raw = m.get("tmdbseason")
-                text = (m.text or "").strip()
-
-                if text.startswith(";") and "start" not in m.attrib:
-                    for pair in text.strip(";").split(";"):
-                        pair = pair.strip()
-                        if not pair or "-" not in pair:
-                            continue
-                        a, b = pair.split("-", 1)
-                        try:
-                            entry.special_map[int(a)] = int(b)
-                        except (TypeError, ValueError):
-                            continue
-                    continue
-
+                    season_target = None
+            elif tmdb_season_raw not in (None, ""):
                 try:
-                    start = int(m.get("start")) if m.get("start") not in (None, "") else None
-                    end = int(m.get("end")) if m.get("end") not in (None, "") else None
-                    offset = int(m.get("offset") or 0)
+                    season_target = int(tmdb_season_raw)
                 except (TypeError, ValueError):
-                    start, end, offset = None, None, 0
-
-                season_target = None
-                if tvdb_season_raw not in (None, ""):
-                    try:
-                        season_target = int(tvdb_season_raw)
-                    except (TypeError, ValueError):
-                        season_target = None
-                elif tmdb_season_raw not in (None, ""):
-                    try:
-                        season_target = int(tmdb_season_raw)
-                    except (TypeError, ValueError):
-                        season_target = None
+                    season_target = None
 
-                if season_target is not None:
-                    entry.mappings.append(
-                        (anidb_season, season_target, start, end, offset)
-                    )
+            if season_target is not None:
+                entry.mappings.append(
+                    (anidb_season, season_target, start, end, offset)
+                )
 
-        out[anidb_id] = entry
-    return out
+    return entry
 
 
 def _normalize_imdb(imdb_id: Optional[str]) -> Optional[str]:
@@ -229,49 +230,227 @@ def _normalize_imdb(imdb_id: Optional[str]) -> Optional[str]:
     return s
 
 
-def _rebuild_imdb_index(parsed: Dict[int, AnimeListEntry]) -> Dict[str, List[AnimeListEntry]]:
-    index: Dict[str, List[AnimeListEntry]] = {}
-    for entry in parsed.values():
-        raw = entry.imdb_id or ""
-        for part in re.split(r"[,;\s]+", raw):
-            key = _normalize_imdb(part)
-            if not key:
-                continue
-            index.setdefault(key, []).append(entry)
-    return index
-
+def _imdb_keys(raw: Optional[str]) -> List[str]:
+    keys = []
+    for part in re.split(r"[,;\s]+", raw or ""):
+        key = _normalize_imdb(part)
+        if key and key not in keys:
+            keys.append(key)
+    return keys
 
-async def ensure_anime_lists() -> Dict[int, AnimeListEntry]:
-    global _anime_lists, _anime_lists_by_imdb, _anime_lists_loaded_at
-    async with _anime_lists_lock:
-        if _anime_lists and (time.time() - _anime_lists_loaded_at) < _TTL_SECONDS:
-            return _anime_lists
 
-        raw = _read_disk("anime-list-master.xml")
-        if raw is None:
+# ── Index builders (run in a child process) ─────────────────────────────────
+_LISTS_SCHEMA = """
+CREATE TABLE anime (
+    anidb_id INTEGER PRIMARY KEY, tvdb_id INTEGER, tmdb_tv_id INTEGER,
+    default_tvdb_season TEXT, episode_offset INTEGER, tmdb_season TEXT, tmdb_offset INTEGER,
+    imdb_id TEXT, name TEXT, norm_name TEXT, mappings TEXT, special_map TEXT
+);
+CREATE TABLE anime_imdb (imdb TEXT NOT NULL, anidb_id INTEGER NOT NULL);
+"""
+_BRIDGE_SCHEMA = "CREATE TABLE bridge (src TEXT PRIMARY KEY, targets TEXT NOT NULL);"
+_BUILD_BATCH = 2000
+
+
+def _open_build_db(db_path: str, schema: str) -> Tuple[sqlite3.Connection, str]:
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    tmp = db_path + ".building"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.executescript(schema)
+    return conn, tmp
+
+
+def _finish_build_db(conn: sqlite3.Connection, tmp: str, db_path: str, index_sql: str) -> None:
+    conn.executescript(index_sql)
+    conn.commit()
+    conn.close()
+    os.replace(tmp, db_path)
+
+
+def _build_anime_lists_db(xml_path: str, db_path: str) -> int:
+    conn, tmp = _open_build_db(db_path, _LISTS_SCHEMA)
+    rows, imdb_rows, count = [], [], 0
+
+    def _flush():
+        conn.executemany("INSERT OR REPLACE INTO anime VALUES (?,?,?,?,?,?,?,?,?,?,?,?)", rows)
+        conn.executemany("INSERT INTO anime_imdb VALUES (?,?)", imdb_rows)
+        rows.clear()
+        imdb_rows.clear()
+
+    for entry in _iter_anime_lists_xml(xml_path):
+        rows.append((
+            entry.anidb_id, entry.tvdb_id, entry.tmdb_tv_id, entry.default_tvdb_season,
+            entry.episode_offset, entry.tmdb_season, entry.tmdb_offset, entry.imdb_id,
+            entry.name, _norm_title(entry.name),
+            json.dumps(entry.mappings, separators=(",", ":")),
+            json.dumps(entry.special_map, separators=(",", ":")),
+        ))
+        imdb_rows.extend((key, entry.anidb_id) for key in _imdb_keys(entry.imdb_id))
+        count += 1
+        if len(rows) >= _BUILD_BATCH:
+            _flush()
+    _flush()
+    _finish_build_db(conn, tmp, db_path, "CREATE INDEX anime_imdb_key ON anime_imdb (imdb);")
+    return count
+
+
+def _build_anibridge_db(zst_path: Optional[str], json_path: Optional[str], db_path: str) -> int:
+    data = None
+    if zst_path:
+        try:
+            import zstandard as zstd
+            with open(zst_path, "rb") as f:
+                data = json.loads(zstd.ZstdDecompressor().decompress(f.read()))
+        except Exception:
+            data = None
+    if data is None and json_path:
+        with open(json_path, "rb") as f:
+            data = json.loads(f.read())
+    if not isinstance(data, dict):
+        return 0
+    data.pop("$meta", None)
+
+    conn, tmp = _open_build_db(db_path, _BRIDGE_SCHEMA)
+    rows = []
+    for src, targets in data.items():
+        if isinstance(targets, dict):
+            rows.append((src, json.dumps(targets, separators=(",", ":"))))
+        if len(rows) >= _BUILD_BATCH:
+            conn.executemany("INSERT OR REPLACE INTO bridge VALUES (?,?)", rows)
+            rows.clear()
+    conn.executemany("INSERT OR REPLACE INTO bridge VALUES (?,?)", rows)
+    _finish_build_db(conn, tmp, db_path, "")
+    return len(data)
+
+
+async def _build_off_loop(fn, *args):
+    # Not a forked child: by refresh time the process runs Pyrogram/Motor threads, and a
+    # fork can inherit one of their locks held. The decoded data is dropped when the build returns.
+    return await asyncio.to_thread(fn, *args)
+
+
+# ── Read side: one SQLite index per dataset, swapped atomically on refresh ──
+class _IndexStore:
+    def __init__(self, label: str, filename: str) -> None:
+        self.label = label
+        self.path = os.path.join(_CACHE_DIR, filename)
+        self.loaded_at = 0.0
+        self.failed_at = 0.0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._refresh: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._conn is not None
+
+    @property
+    def stale(self) -> bool:
+        return time.time() - self.loaded_at > _TTL_SECONDS
+
+    def swap(self) -> None:
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        with self._lock:
+            old, self._conn = self._conn, conn
+        self.loaded_at = os.path.getmtime(self.path)
+        if old is not None:
+            old.close()
+
+    def query(self, sql: str, args: tuple = ()) -> list:
+        with self._lock:
+            if self._conn is None:
+                return []
+            return self._conn.execute(sql, args).fetchall()
+
+    async def ensure(self, build) -> bool:
+        if self._conn is None and os.path.isfile(self.path):
             try:
-                client = await _get_client()
-                resp = await client.get(ANIME_LISTS_URL)
-                if resp.status_code == 200 and resp.content:
-                    raw = resp.content
-                    _write_disk("anime-list-master.xml", raw)
-                    LOGGER.info(
-                        f"[EP_MAPS] Downloaded Anime-Lists XML ({len(raw)} bytes)"
-                    )
+                self.swap()
             except Exception as e:
-                LOGGER.warning(f"[EP_MAPS] Anime-Lists download failed: {e}")
-
-        if raw:
-            parsed = _parse_anime_lists_xml(raw)
-            if parsed:
-                _anime_lists = parsed
-                _anime_lists_by_imdb = _rebuild_imdb_index(parsed)
-                _anime_lists_loaded_at = time.time()
-                LOGGER.info(
-                    f"[EP_MAPS] Anime-Lists loaded: {len(parsed)} entries, "
-                    f"{len(_anime_lists_by_imdb)} imdb keys"
-                )
-        return _anime_lists
+                LOGGER.warning(f"[EP_MAPS] {self.label} index unreadable, rebuilding: {e}")
+        if self.ready and not self.stale:
+            return True
+        if self._refresh is None and time.time() - self.failed_at > _RETRY_SECONDS:
+            self._refresh = asyncio.create_task(self._run(build))
+        # A stale generation keeps answering while the next one builds
+        if self.ready or self._refresh is None:
+            return self.ready
+        await asyncio.shield(self._refresh)
+        return self.ready
+
+    async def _run(self, build) -> None:
+        try:
+            count = await build(self.path)
+            if count:
+                self.swap()
+                LOGGER.info(f"[EP_MAPS] {self.label} index built: {count} entries")
+            else:
+                self.failed_at = time.time()
+        except Exception as e:
+            self.failed_at = time.time()
+            LOGGER.warning(f"[EP_MAPS] {self.label} index build failed: {e}")
+        finally:
+            self._refresh = None
+
+
+_anime_lists = _IndexStore("Anime-Lists", f"anime-lists.v{_INDEX_VERSION}.sqlite")
+_anibridge = _IndexStore("anibridge", f"anibridge.v{_INDEX_VERSION}.sqlite")
+
+_ENTRY_COLUMNS = (
+    "anidb_id, tvdb_id, tmdb_tv_id, default_tvdb_season, episode_offset, "
+    "tmdb_season, tmdb_offset, imdb_id, name, mappings, special_map"
+)
+
+
+def _entry_from_row(row: tuple) -> AnimeListEntry:
+    return AnimeListEntry(
+        anidb_id=row[0],
+        tvdb_id=row[1],
+        tmdb_tv_id=row[2],
+        default_tvdb_season=row[3],
+        episode_offset=row[4] or 0,
+        tmdb_season=row[5],
+        tmdb_offset=row[6] or 0,
+        imdb_id=row[7],
+        name=row[8] or "",
+        mappings=[tuple(m) for m in json.loads(row[9] or "[]")],
+        special_map={int(k): v for k, v in json.loads(row[10] or "{}").items()},
+    )
+
+
+def _anime_entry(anidb_id: int) -> Optional[AnimeListEntry]:
+    rows = _anime_lists.query(f"SELECT {_ENTRY_COLUMNS} FROM anime WHERE anidb_id = ?", (int(anidb_id),))
+    return _entry_from_row(rows[0]) if rows else None
+
+
+async def _download(url: str, name: str) -> Optional[str]:
+    try:
+        client = await _get_client()
+        resp = await client.get(url)
+        if resp.status_code == 200 and resp.content:
+            await asyncio.to_thread(_write_disk, name, resp.content)
+            LOGGER.info(f"[EP_MAPS] Downloaded {name} ({len(resp.content)} bytes)")
+            return _cached_path(name)
+    except Exception as e:
+        LOGGER.warning(f"[EP_MAPS] {name} download failed: {e}")
+    return None
+
+
+async def _build_anime_lists(db_path: str) -> int:
+    name = "anime-list-master.xml"
+    # An outdated copy still beats no index when the download fails
+    xml_path = _cached_path(name) or await _download(ANIME_LISTS_URL, name) or _cached_path(name, fresh=False)
+    if not xml_path:
+        return 0
+    return await _build_off_loop(_build_anime_lists_db, xml_path, db_path)
+
+
+async def ensure_anime_lists() -> bool:
+    return await _anime_lists.ensure(_build_anime_lists)
 
 
 def resolve_via_anime_lists(
@@ -283,7 +462,7 @@ def resolve_via_anime_lists(
     """Map absolute/AniDB regular episode → season + episode via Anime-Lists."""
     if not anidb_id or absolute < 1:
         return None
-    entry = _anime_lists.get(int(anidb_id))
+    entry = _anime_entry(anidb_id)
     if not entry:
         return None
 
@@ -409,58 +588,32 @@ def _descriptor_parts(desc: str) -> Tuple[str, str, Optional[str]]:
     return provider, id_, scope
 
 
-async def ensure_anibridge() -> dict:
-    global _anibridge, _anibridge_loaded_at
-    async with _anibridge_lock:
-        if _anibridge and (time.time() - _anibridge_loaded_at) < _TTL_SECONDS:
-            return _anibridge
+async def _build_anibridge(db_path: str) -> int:
+    zst_path = _cached_path("mappings.json.zst") or await _download(ANIBRIDGE_ZST_URL, "mappings.json.zst")
+    json_path = None
+    if not zst_path:
+        json_path = _cached_path("mappings.min.json") or await _download(ANIBRIDGE_MIN_URL, "mappings.min.json")
+    if not zst_path and not json_path:
+        zst_path = _cached_path("mappings.json.zst", fresh=False)
+        json_path = _cached_path("mappings.min.json", fresh=False)
+    if not zst_path and not json_path:
+        return 0
+    count = await _build_off_loop(_build_anibridge_db, zst_path, json_path, db_path)
+    if not count and not json_path:
+        # zstandard missing or the archive is corrupt: the plain JSON release has the same data
+        json_path = await _download(ANIBRIDGE_MIN_URL, "mappings.min.json")
+        if json_path:
+            count = await _build_off_loop(_build_anibridge_db, None, json_path, db_path)
+    return count
 
-        data = None
-        raw = _read_disk("mappings.json.zst")
-        if raw is None:
-            try:
-                client = await _get_client()
-                resp = await client.get(ANIBRIDGE_ZST_URL)
-                if resp.status_code == 200 and resp.content:
-                    raw = resp.content
-                    _write_disk("mappings.json.zst", raw)
-            except Exception as e:
-                LOGGER.debug(f"[EP_MAPS] anibridge zst download failed: {e}")
 
-        if raw:
-            try:
-                import zstandard as zstd
-                dctx = zstd.ZstdDecompressor()
-                data = json.loads(dctx.decompress(raw))
-            except Exception:
-                data = None
-
-        if data is None:
-            raw_json = _read_disk("mappings.min.json")
-            if raw_json is None:
-                try:
-                    client = await _get_client()
-                    resp = await client.get(ANIBRIDGE_MIN_URL)
-                    if resp.status_code == 200 and resp.content:
-                        raw_json = resp.content
-                        _write_disk("mappings.min.json", raw_json)
-                        LOGGER.info(
-                            f"[EP_MAPS] Downloaded anibridge mappings ({len(raw_json)} bytes)"
-                        )
-                except Exception as e:
-                    LOGGER.warning(f"[EP_MAPS] anibridge JSON download failed: {e}")
-            if raw_json:
-                try:
-                    data = json.loads(raw_json)
-                except Exception as e:
-                    LOGGER.warning(f"[EP_MAPS] anibridge JSON parse failed: {e}")
+async def ensure_anibridge() -> bool:
+    return await _anibridge.ensure(_build_anibridge)
+
 
-        if isinstance(data, dict):
-            data.pop("$meta", None)
-            _anibridge = data
-            _anibridge_loaded_at = time.time()
-            LOGGER.info(f"[EP_MAPS] anibridge loaded: {len(data)} source descriptors")
-        return _anibridge
+def _anibridge_targets(src_desc: str) -> Optional[dict]:
+    rows = _anibridge.query("SELECT targets FROM bridge WHERE src = ?", (src_desc,))
+    return json.loads(rows[0][0]) if rows else None
 
 
 def resolve_via_anibridge(
@@ -470,7 +623,7 @@ def resolve_via_anibridge(
     mal_id: Optional[int] = None,
     absolute: int,
 ) -> Optional[dict]:
-    if absolute < 1 or not _anibridge:
+    if absolute < 1 or not _anibridge.ready:
         return None
 
     candidates: List[str] = []
@@ -483,7 +636,7 @@ def resolve_via_anibridge(
         candidates.append(f"mal:{int(mal_id)}")
 
     for src_desc in candidates:
-        targets = _anibridge.get(src_desc)
+        targets = _anibridge_targets(src_desc)
         if not isinstance(targets, dict):
             continue
         ordered = sorted(
@@ -618,45 +771,55 @@ async def lookup_anime_entries_by_imdb(imdb_id: str) -> List[AnimeListEntry]:
     if not key:
         return []
     await ensure_anime_lists()
-    return list(_anime_lists_by_imdb.get(key) or [])
+    rows = _anime_lists.query(
+        f"SELECT {_ENTRY_COLUMNS} FROM anime WHERE anidb_id IN "
+        "(SELECT anidb_id FROM anime_imdb WHERE imdb = ?)",
+        (key,),
+    )
+    return [_entry_from_row(r) for r in rows]
 
 
-async def lookup_anime_entries_by_title(title: str) -> List[AnimeListEntry]:
-    q = _norm_title(title)
-    if not q or len(q) < 3:
-        return []
-    q_tokens = [t for t in q.split() if len(t) >= 3]
-    if not q_tokens:
-        return []
+def _match_titles(q: str, q_tokens: List[str]) -> List[int]:
     q_token_set = set(q_tokens)
-    await ensure_anime_lists()
-    exact: List[AnimeListEntry] = []
-    strong: List[AnimeListEntry] = []
-    for entry in _anime_lists.values():
-        name = _norm_title(entry.name)
+    exact: List[int] = []
+    strong: List[int] = []
+    for anidb_id, name in _anime_lists.query("SELECT anidb_id, norm_name FROM anime"):
         if not name or len(name) < 3:
             continue
         if name == q:
-            exact.append(entry)
+            exact.append(anidb_id)
             continue
         name_tokens = [t for t in name.split() if len(t) >= 3]
         if not name_tokens:
             continue
         name_token_set = set(name_tokens)
         if q_token_set == name_token_set:
-            strong.append(entry)
+            strong.append(anidb_id)
             continue
         if len(name_tokens) >= 2 and name_token_set <= q_token_set:
-            strong.append(entry)
+            strong.append(anidb_id)
             continue
         if len(q_tokens) >= 2 and q_token_set <= name_token_set:
-            strong.append(entry)
+            strong.append(anidb_id)
             continue
         if len(name) >= 6 and len(q) >= 6 and (name in q or q in name):
-            strong.append(entry)
+            strong.append(anidb_id)
     return exact or strong
 
 
+async def lookup_anime_entries_by_title(title: str) -> List[AnimeListEntry]:
+    q = _norm_title(title)
+    if not q or len(q) < 3:
+        return []
+    q_tokens = [t for t in q.split() if len(t) >= 3]
+    if not q_tokens:
+        return []
+    await ensure_anime_lists()
+    # Names are pre-normalised in the index; the scan itself runs off the loop
+    ids = await asyncio.to_thread(_match_titles, q, q_tokens)
+    return [e for e in (_anime_entry(i) for i in ids) if e is not None]
+
+
 async def is_anime_imdb(imdb_id: str, title: Optional[str] = None) -> bool:
     if await lookup_anime_entries_by_imdb(imdb_id):
         return True
@@ -0,0 +1,332 @@
+"""Filename parsing off the event loop.
+
+PTN and GuessIt are pure-Python regex engines; a single caption costs a few
+milliseconds, which during a scan or a forwarding burst adds up to whole
+seconds with the loop unable to serve streams. Parsing runs in a small
+process pool instead. Workers are forked at startup and warm GuessIt's rule
+tree once, so the first real file does not pay for it.
+
+Results are kept in an in-process LRU: the scanner, the metadata batcher and
+``metadata()`` all parse the same caption, and only the first call leaves the
+process. Identical concurrent requests share one in-flight Future.
+
+If a worker dies the pool is not re-forked: by then the process runs Motor,
+Pyrogram and watchdog threads, and a fork could inherit one of their locks
+held. Parsing stays inline for the rest of the run instead.
+"""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterable, List, Optional
+
+from Backend.helper.metadata.common import score_candidate_aliases
+from Backend.helper.metadata.parse import is_multipart_video, parse_media_name
+from Backend.helper.split_files import parse_combined_episodes, parse_split_info, strip_part_suffix
+from Backend.logger import LOGGER
+
+PARSE_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+PARSE_CACHE_SIZE = 8192
+PARSE_CHUNK = 64
+# Below this many titles rapidfuzz is faster inline than the round trip to a worker
+SCORE_OFFLOAD_MIN = 48
+
+_WARMUP_NAME = "Show.Name.S01E02.1080p.WEB-DL.x264-GROUP.mkv"
+
+
+# ── Worker side (runs in the pool processes) ────────────────────────────────
+def _warm() -> None:
+    parse_media_name(_WARMUP_NAME)
+
+
+def _bundle(filename: str) -> Dict[str, Any]:
+    split_info = parse_split_info(filename)
+    target = strip_part_suffix(filename) if split_info else filename
+    try:
+        parsed, error = parse_media_name(target), None
+    except Exception as e:
+        parsed, error = None, str(e)
+    return {
+        "multipart": is_multipart_video(filename),
+        "split": split_info,
+        "target": target,
+        "parsed": parsed,
+        "error": error,
+        "combined": parse_combined_episodes(target),
+    }
+
+
+def _clean(raw: str) -> Dict[str, Any]:
+    from Backend.helper.pyro import clean_filename
+
+    clean = clean_filename(raw)
+    return {"clean": clean, "bundle": _bundle(clean)}
+
+
+def _score(args: tuple) -> float:
+    query_title, query_year, title, year, aliases, kwargs = args
+    return score_candidate_aliases(query_title, query_year, title, year, aliases=aliases, **kwargs)
+
+
+_KINDS = {"parse": _bundle, "clean": _clean}
+
+
+def _run_chunk(kind: str, items: list) -> list:
+    fn = _KINDS[kind]
+    return [fn(item) for item in items]
+
+
+def _run_scores(items: list) -> list:
+    return [_score(item) for item in items]
+
+
+def _copy(bundle: Dict[str, Any]) -> Dict[str, Any]:
+    # Callers patch parsed fields (absolute episodes, season hints); keep the cached copy intact
+    out = dict(bundle)
+    if out.get("parsed") is not None:
+        out["parsed"] = dict(out["parsed"])
+    return out
+
+
+# ── Pool ────────────────────────────────────────────────────────────────────
+class ParsePool:
+    def __init__(self, workers: int = PARSE_WORKERS, cache_size: int = PARSE_CACHE_SIZE) -> None:
+        self.workers = workers
+        self.cache_size = cache_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._cache: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._pending: Dict[tuple, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.offloaded = 0
+        self.inline = 0
+        self.broken = False
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    # Fork the workers and warm GuessIt in each. Call early, before the bots spin up threads.
+    async def start(self) -> None:
+        if self._executor is not None or self.broken:
+            return
+        try:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_warm,
+            )
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(loop.run_in_executor(self._executor, _warm) for _ in range(self.workers)))
+            LOGGER.info(f"[ParsePool] Started {self.workers} parse worker(s).")
+        except Exception as e:
+            LOGGER.warning(f"[ParsePool] Process pool unavailable, parsing inline: {e}")
+            self._executor = None
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # ── Cache ───────────────────────────────────────────────────────────────
+    def _get(self, key: tuple):
+        value = self._cache.get(key)
+        if value is not None:
+            self._cache.move_to_end(key)
+        return value
+
+    def _put(self, key: tuple, value) -> None:
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    # ── Execution ───────────────────────────────────────────────────────────
+    async def _execute(self, fn, *args):
+        if self._executor is not None:
+            try:
+                self.offloaded += 1
+                return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+            except BrokenProcessPool:
+                # A worker died (OOM, signal); re-forking now could deadlock, so stay inline
+                LOGGER.warning("[ParsePool] Worker pool broke; parsing inline from now on.")
+                self.broken = True
+                self.shutdown()
+        self.inline += 1
+        return fn(*args)
+
+    async def _many(self, kind: str, items: List[str]) -> list:
+        keys = [(kind, item) for item in items]
+        found: Dict[tuple, Any] = {}
+        todo: List[str] = []
+        # In flight for another caller; held here since that caller pops it when it finishes
+        waiting: Dict[tuple, asyncio.Future] = {}
+        for key, item in zip(keys, items):
+            cached = self._get(key)
+            if cached is not None:
+                self.hits += 1
+                found[key] = cached
+            elif key in self._pending:
+                waiting.setdefault(key, self._pending[key])
+            else:
+                self.misses += 1
+                self._pending[key] = asyncio.get_running_loop().create_future()
+                todo.append(item)
+
+        try:
+            for i in range(0, len(todo), PARSE_CHUNK):
+                chunk = todo[i:i + PARSE_CHUNK]
+                try:
+                    results = await self._execute(_run_chunk, kind, chunk)
+                except Exception as e:
+                    for item in todo[i:]:
+                        future = self._pending.pop((kind, item))
+                        future.set_exception(e)
+                        future.exception()  # retrieved here; other waiters still see it
+                    raise
+                for item, result in zip(chunk, results):
+                    if kind == "clean":
+                        # Cleaning parses too; seed the parse entry metadata() will ask for
+                        self._put(("parse", result["clean"]), result["bundle"])
+                    self._put((kind, item), result)
+                    found[(kind, item)] = result
+                    self._pending.pop((kind, item)).set_result(result)
+        finally:
+            # Cancelled mid-batch: release anyone waiting on the rest
+            for item in todo:
+                future = self._pending.pop((kind, item), None)
+                if future is not None and not future.done():
+                    future.cancel()
+
+        for key, future in waiting.items():
+            if key not in found:
+                found[key] = await asyncio.shield(future)
+        return [found[key] for key in keys]
+
+    # ── Public API ──────────────────────────────────────────────────────────
+    async def parse(self, filename: str) -> Dict[str, Any]:
+        """Split/combined detection plus PTN/GuessIt parse of an already-clean filename."""
+        return _copy((await self._many("parse", [filename]))[0])
+
+    async def parse_many(self, filenames: Iterable[str]) -> List[Dict[str, Any]]:
+        return [_copy(b) for b in await self._many("parse", list(filenames))]
+
+    async def clean(self, raw: str) -> str:
+        return (await self._many("clean", [raw]))[0]["clean"]
+
+    async def clean_many(self, raws: Iterable[str]) -> List[str]:
+        return [r["clean"] for r in await self._many("clean", list(raws))]
+
+    def prime(self, raws: Iterable[str]) -> None:
+        """Clean+parse a batch in the background so the per-file calls that follow hit the cache."""
+        raws = [r for r in raws if r]
+        if not raws:
+            return
+
+        async def _run() -> None:
+            try:
+                await self._many("clean", raws)
+            except (asyncio.CancelledError, Exception):
+                pass
+
+        asyncio.create_task(_run())
+
+    async def score_many(
+        self, query_title: str, query_year: Optional[int], candidates: List[tuple], **kwargs,
+    ) -> List[float]:
+        """Score ``(title, year, aliases)`` candidates; large batches go to a worker."""
+        items = [(query_title, query_year, t, y, a, kwargs) for t, y, a in candidates]
+        titles = sum(1 + len(a or ()) for _, _, a in candidates)
+        if self._executor is None or titles < SCORE_OFFLOAD_MIN:
+            return _run_scores(items)
+        return await self._execute(_run_scores, items)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "workers": self.workers if self._executor is not None else 0,
+            "cached": len(self._cache),
+            "in_flight": len(self._pending),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0,
+            "offloaded": self.offloaded,
+            "inline": self.inline,
+            "broken": self.broken,
+        }
+
+
+parse_pool = ParsePool()
+
+
+# ── Benchmark: loop lag while 10k captions are parsed inline vs. in the pool ──
+def _benchmark(files: int = 10_000) -> None:
+    import random
+    import time
+
+    titles = ["One Piece", "The Last of Us", "Breaking Bad", "Dune Part Two", "Naruto Shippuden", "Severance"]
+    tags = ["1080p WEB-DL x264", "720p HDTV", "2160p BluRay x265 10bit", "480p BD Multi Audio ESub"]
+    rng = random.Random(7)
+    names = []
+    for i in range(files):
+        t = rng.choice(titles)
+        if i % 3:
+            names.append(f"[Grp] {t} S{rng.randint(1, 9):02d}E{rng.randint(1, 24):02d} {rng.choice(tags)} {i}.mkv")
+        else:
+            names.append(f"{t} ({rng.randint(1990, 2024)}) {rng.choice(tags)} {i}.mkv")
+
+    async def _probe(samples: List[float], stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.005)
+            samples.append((time.perf_counter() - started - 0.005) * 1000)
+
+    async def _inline() -> None:
+        for i, name in enumerate(names):
+            _bundle(name)
+            if i % 16 == 0:
+                await asyncio.sleep(0)
+
+    async def _pooled(pool: ParsePool) -> None:
+        for i in range(0, len(names), 256):
+            await pool.parse_many(names[i:i + 256])
+
+    async def _measure(label: str, work) -> None:
+        samples: List[float] = []
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_probe(samples, stop))
+        started = time.perf_counter()
+        await work
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe
+        samples = sorted(samples) or [0.0]
+
+        def pick(q: float) -> float:
+            return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+        print(
+            f"{label:7} {files} files in {elapsed:6.2f}s  loop lag p50 {pick(0.5):7.2f}ms  "
+            f"p99 {pick(0.99):7.2f}ms  max {samples[-1]:7.2f}ms"
+        )
+
+    async def _main() -> None:
+        _warm()
+        await _measure("inline", _inline())
+        pool = ParsePool()
+        await pool.start()
+        try:
+            await _measure("pool", _pooled(pool))
+            await _measure("cached", _pooled(pool))
+        finally:
+            pool.shutdown()
+
+    asyncio.run(_main())
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -128,13 +128,8 @@ async def get_detail(imdb_id: str, media_type: str) -> Optional[Dict[str, Any]]:
     }
 
 
-async def get_season(imdb_id: str, season_id, episode_id) -> Dict[str, Any]:
-    ctype = "series"
-    url = f"{BASE_URL}/meta/{ctype}/{imdb_id}.json"
-    data = await _fetch_json(url)
-    meta = (data or {}).get("meta") or {}
-    videos = meta.get("videos") or []
-    for v in videos:
+def _episode_from_videos(videos, season_id, episode_id) -> Dict[str, Any]:
+    for v in videos or []:
         try:
             if int(v.get("season") or -1) == int(season_id) and int(v.get("episode") or -1) == int(episode_id):
                 return {
@@ -148,6 +143,14 @@ async def get_season(imdb_id: str, season_id, episode_id) -> Dict[str, Any]:
     return {}
 
 
+async def get_season(imdb_id: str, season_id, episode_id) -> Dict[str, Any]:
+    ctype = "series"
+    url = f"{BASE_URL}/meta/{ctype}/{imdb_id}.json"
+    data = await _fetch_json(url)
+    meta = (data or {}).get("meta") or {}
+    return _episode_from_videos(meta.get("videos"), season_id, episode_id)
+
+
 async def safe_search(title: str, type_: str, year: Optional[int] = None) -> str | None:
     """Return best-matching IMDb id or None."""
     is_tv = type_ != "movie"
@@ -222,6 +225,10 @@ async def cached_season(imdb_id: str, season, episode):
     key = f"{imdb_id}::{season}::{episode}"
 
     async def _produce():
+        # The series meta already lists every episode; reuse it rather than refetching per episode
+        detail = await cached_detail(imdb_id, "tvSeries")
+        if detail and detail.get("videos"):
+            return _episode_from_videos(detail["videos"], season, episode)
         return await get_season(imdb_id=imdb_id, season_id=season, episode_id=episode)
 
     return await cached_call(IMDB_CACHE, key, "imdb_season", _produce)
@@ -24,6 +24,7 @@ from Backend.helper.metadata.common import (
     score_candidate,
     score_candidate_aliases,
 )
+from Backend.helper.metadata.parse_pool import parse_pool
 from Backend.helper.settings_manager import SettingsManager
 from Backend.logger import LOGGER
 
@@ -134,15 +135,17 @@ async def pick_best(results, query_title: str, query_year: Optional[int], media_
     year_lower_bound = not year_reliable
     scored = []
     best_item, best_score = None, 0.0
-    for item in results:
+    items, candidates = list(results), []
+    for item in items:
         r_title, r_year = tmdb_title_year(item, media_type)
         # original_title / original_name also counts as an alias
         orig = getattr(item, "original_title", None) or getattr(item, "original_name", None) or ""
-        score = score_candidate_aliases(
-            query_title, query_year, r_title, r_year,
-            aliases=[orig] if orig and orig != r_title else None,
-            year_reliable=year_reliable, year_lower_bound=year_lower_bound,
-        )
+        candidates.append((r_title, r_year, [orig] if orig and orig != r_title else None))
+    scores = await parse_pool.score_many(
+        query_title, query_year, candidates,
+        year_reliable=year_reliable, year_lower_bound=year_lower_bound,
+    )
+    for item, (_, r_year, _), score in zip(items, candidates, scores):
         scored.append((score, item, r_year))
         if score > best_score:
             best_score, best_item = score, item
@@ -211,10 +214,36 @@ async def details(media_type: str, item_id):
     return await cached_call(TMDB_DETAILS_CACHE, cache_key, "tmdb_details", _produce)
 
 
+async def season_episodes(tv_id, season) -> dict:
+    """All episodes of a season from one request, keyed by episode number."""
+    key = ("season", tv_id, int(season))
+
+    async def _produce():
+        try:
+            async with API_SEMAPHORE:
+                det = await get_tmdb_client().season(tv_id, int(season)).details()
+        except Exception:
+            return {}
+        episodes = {}
+        for ep in getattr(det, "episodes", None) or []:
+            number = getattr(ep, "episode_number", None)
+            if number is not None:
+                episodes[int(number)] = ep
+        return episodes
+
+    return await cached_call(EPISODE_CACHE, key, "tmdb_season", _produce)
+
+
 async def episode_details(tv_id, season, episode):
     key = (tv_id, season, episode)
 
     async def _produce():
+        try:
+            found = (await season_episodes(tv_id, season)).get(int(episode))
+        except (TypeError, ValueError):
+            found = None
+        if found is not None:
+            return found
         try:
             async with API_SEMAPHORE:
                 return await get_tmdb_client().episode(tv_id, season, episode).details()
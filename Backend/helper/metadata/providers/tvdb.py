@@ -273,36 +273,24 @@ async def episode_by_number(tvdb_id: int, season: int, episode: int) -> Optional
     cache_key = f"tvdb_ep::{tvdb_id}::{season}::{episode}"
 
     async def _produce():
-        # Prefer seasons endpoint then filter
-        data = await _get(
-            f"/series/{tvdb_id}/episodes/default",
-            {"page": 0},
-        )
-        episodes = (data or {}).get("data") or {}
-        if isinstance(episodes, dict):
-            episodes = episodes.get("episodes") or []
-        for ep in episodes or []:
+        for ep in await series_episodes(tvdb_id):
             try:
                 if int(ep.get("seasonNumber") or -1) == int(season) and int(ep.get("number") or -1) == int(episode):
                     return ep
             except (TypeError, ValueError):
                 continue
-        # Fallback: search endpoint
-        data = await _get(f"/series/{tvdb_id}/episodes/default", {"page": 0})
         return None
 
     return await cached_call(TVDB_CACHE, cache_key, "tvdb_ep", _produce)
 
 
-async def _iter_series_episodes(tvdb_id: int, order: str = "default") -> list:
-    """Page through TVDB series episodes (default or absolute order)."""
+async def _iter_series_episodes(tvdb_id: int, order: str = "default", lang: Optional[str] = None) -> list:
+    """Page through TVDB series episodes (default or absolute order, optionally translated)."""
+    path = f"/series/{tvdb_id}/episodes/{order}" + (f"/{lang}" if lang else "")
     all_eps: list = []
     page = 0
     while page < 40:  # hard safety cap
-        data = await _get(
-            f"/series/{tvdb_id}/episodes/{order}",
-            {"page": page},
-        )
+        data = await _get(path, {"page": page})
         if not data:
             break
         block = (data.get("data") or {})
@@ -325,6 +313,30 @@ async def _iter_series_episodes(tvdb_id: int, order: str = "default") -> list:
     return all_eps
 
 
+async def series_episodes(tvdb_id: int, order: str = "default") -> list:
+    """Every episode of a series, fetched once and shared by all per-episode lookups."""
+    cache_key = f"tvdb_eps::{tvdb_id}::{order}"
+
+    async def _produce():
+        return await _iter_series_episodes(tvdb_id, order=order)
+
+    return await cached_call(TVDB_CACHE, cache_key, "tvdb_eps", _produce)
+
+
+async def episode_translations(tvdb_id: int, lang: str = "eng") -> dict:
+    """English name/overview for every episode of a series, keyed by episode id."""
+    cache_key = f"tvdb_eps_tr::{tvdb_id}::{lang}"
+
+    async def _produce():
+        eps = await _iter_series_episodes(tvdb_id, order="default", lang=lang)
+        return {
+            ep["id"]: {"name": ep.get("name"), "overview": ep.get("overview")}
+            for ep in eps if ep.get("id")
+        }
+
+    return await cached_call(TVDB_CACHE, cache_key, "tvdb_eps_tr", _produce)
+
+
 async def episode_translation(
     episode_id: int,
     lang: str = "eng",
@@ -357,7 +369,7 @@ async def episode_by_absolute(tvdb_id: int, absolute: int) -> Optional[dict]:
         abs_n = int(absolute)
         # 1) absolute order endpoint (episode.number == absolute)
         try:
-            eps = await _iter_series_episodes(tvdb_id, order="absolute")
+            eps = await series_episodes(tvdb_id, order="absolute")
             for ep in eps:
                 try:
                     if int(ep.get("number") or -1) == abs_n:
@@ -369,7 +381,7 @@ async def episode_by_absolute(tvdb_id: int, absolute: int) -> Optional[dict]:
 
         # 2) default order – match absoluteNumber / absoluteIndex
         try:
-            eps = await _iter_series_episodes(tvdb_id, order="default")
+            eps = await series_episodes(tvdb_id)
             for ep in eps:
                 for key in ("absoluteNumber", "absoluteIndex", "absNumber"):
                     try:
@@ -582,7 +594,9 @@ async def fetch_series_metadata(title, season, episode, encoded_string, year=Non
     ep = await episode_by_number(tvdb_id, season, episode)
     if ep and ep.get("id"):
         try:
-            ep_tr = await episode_translation(ep["id"])
+            # Bulk table first (one request per series); per-episode endpoint only if that failed
+            translations = await episode_translations(tvdb_id)
+            ep_tr = translations.get(ep["id"]) if translations else await episode_translation(ep["id"])
             if ep_tr:
                 ep = dict(ep)
                 ep["name"] = ep_tr.get("name") or ep.get("name")
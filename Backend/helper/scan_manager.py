@@ -2,17 +2,23 @@ from __future__ import annotations
 
 import asyncio
 import time
+from collections import deque
 from typing import Any, Dict, List, Optional
 
+from pyrogram import raw
+from pyrogram.enums import ChatMemberStatus
 from pyrogram.errors import FloodWait, ChannelPrivate, ChatAdminRequired
 
 from Backend.logger import LOGGER
-from Backend.helper.encrypt import encode_string, decode_string
-from Backend.helper.metadata import metadata, extract_default_id
-from Backend.helper.pyro import clean_filename, finalize_media_name, get_readable_file_size
+from Backend.helper.encrypt import decode_string, stream_id_variants
+from Backend.helper.ingest_pool import ingest_pool
+from Backend.helper.metadata import metadata, extract_default_id, override_matches_indexed, parse_pool
+from Backend.helper.pyro import finalize_media_name, get_readable_file_size
+from Backend.helper.settings_manager import SettingsManager
 from Backend.helper.skip_channel import is_skip_channel, route_to_skip_channel
 from Backend.helper.split_files import parse_split_info
 from Backend.helper.subtitles import ingest_subtitle, is_subtitle_file
+from Backend.pyrofork.bot import multi_clients
 
 SCAN_BATCH_SIZE = 200          
 SCAN_MAX_EMPTY_BATCHES = 10    
@@ -21,19 +27,90 @@ SCAN_BATCH_DELAY = 0.5
 SCAN_PERSIST_EVERY = 1         
 SCAN_PROBE_TEXT = "🔄"         
 SCAN_PROCESS_CONCURRENCY = 8   
+SCAN_PARSE_WORKERS = 2         
+SCAN_WRITE_WORKERS = 4         
+SCAN_STAGE_QUEUE = 256         
+SCAN_RANGE_SIZE = 5_000        
+SCAN_FLOOD_PAD = 1.0           
+SCAN_PLAN_CONCURRENCY = 4      
+SCAN_RATE_WINDOW = 60.0        
+
+SYNC_DIFF_LIMIT = 1000         
+SYNC_TOP_ID_LIMIT = 100        
+SYNC_CHECK_EVERY = 60          
 
 DBCHECK_CONCURRENCY = 5        
 DBCHECK_BATCH_DELAY = 0.3      
 DBCHECK_PAGE_SIZE = 100        
 
+DUP_AGG_BATCH_SIZE = 500      
+
 _STATE_COLLECTION = "scan_state"
 _SCAN_DOC_ID = "scan"
+_SYNC_COLLECTION = "channel_sync"
 
 
 def _now() -> float:
     return time.time()
 
 
+#----- Duplicate candidates: copies of one title/episode sharing quality + size.
+#----- Mongo does the unwind/group; _dup_key refines the (few) candidate groups in Python.
+def _dup_size_key(path: str) -> dict:
+    return {"$toLower": {"$trim": {"input": {"$toString": {"$ifNull": [path, ""]}}}}}
+
+
+def _dup_entry(path: str) -> dict:
+    return {
+        "id": f"{path}.id", "name": f"{path}.name", "size": f"{path}.size",
+        "quality": f"{path}.quality", "pos": "$pos",
+    }
+
+
+_DUP_QUALITY_FIELDS = ("id", "quality", "name", "size")
+_DUP_PIPELINES = {
+    "movie": [
+        {"$match": {"telegram.1": {"$exists": True}}},
+        {"$project": {"title": 1, "release_year": 1, **{f"telegram.{f}": 1 for f in _DUP_QUALITY_FIELDS}}},
+        {"$unwind": {"path": "$telegram", "includeArrayIndex": "pos"}},
+        {"$match": {"telegram.id": {"$nin": [None, ""]}}},
+        {"$group": {
+            "_id": {"doc": "$_id", "quality": "$telegram.quality", "size": _dup_size_key("$telegram.size")},
+            "title": {"$first": "$title"},
+            "year": {"$first": "$release_year"},
+            "entries": {"$push": _dup_entry("$telegram")},
+        }},
+        {"$match": {"entries.1": {"$exists": True}}},
+        {"$sort": {"_id": 1}},
+    ],
+    "tv": [
+        {"$match": {"seasons.episodes.telegram.1": {"$exists": True}}},
+        {"$project": {
+            "title": 1, "seasons.season_number": 1, "seasons.episodes.episode_number": 1,
+            **{f"seasons.episodes.telegram.{f}": 1 for f in _DUP_QUALITY_FIELDS},
+        }},
+        {"$unwind": {"path": "$seasons", "includeArrayIndex": "s_pos"}},
+        {"$unwind": {"path": "$seasons.episodes", "includeArrayIndex": "e_pos"}},
+        {"$match": {"seasons.episodes.telegram.1": {"$exists": True}}},
+        {"$unwind": {"path": "$seasons.episodes.telegram", "includeArrayIndex": "pos"}},
+        {"$match": {"seasons.episodes.telegram.id": {"$nin": [None, ""]}}},
+        {"$group": {
+            "_id": {
+                "doc": "$_id", "s_pos": "$s_pos", "e_pos": "$e_pos",
+                "quality": "$seasons.episodes.telegram.quality",
+                "size": _dup_size_key("$seasons.episodes.telegram.size"),
+            },
+            "title": {"$first": "$title"},
+            "season": {"$first": "$seasons.season_number"},
+            "episode": {"$first": "$seasons.episodes.episode_number"},
+            "entries": {"$push": _dup_entry("$seasons.episodes.telegram")},
+        }},
+        {"$match": {"entries.1": {"$exists": True}}},
+        {"$sort": {"_id": 1}},
+    ],
+}
+
+
 def _fmt_elapsed(seconds: float) -> str:
     s = int(seconds)
     m, s = divmod(s, 60)
@@ -45,13 +122,266 @@ def _fmt_elapsed(seconds: float) -> str:
     return f"{s}s"
 
 
+#----- ── Channel update state (no history reads, nothing posted) ─────────────────
+async def _input_channel(client, chat_id: int):
+    peer = await client.resolve_peer(chat_id)
+    return raw.types.InputChannel(channel_id=peer.channel_id, access_hash=peer.access_hash)
+
+
+async def _channel_difference(client, channel, pts: int, limit: int):
+    return await client.invoke(raw.functions.updates.GetChannelDifference(
+        channel=channel,
+        filter=raw.types.ChannelMessagesFilterEmpty(),
+        pts=max(1, int(pts)),
+        limit=limit,
+        force=True,
+    ))
+
+
+#----- Current pts of a channel: the point an incremental sync continues from
+async def channel_pts(client, chat_id: int) -> Optional[int]:
+    try:
+        full = await client.invoke(
+            raw.functions.channels.GetFullChannel(channel=await _input_channel(client, chat_id))
+        )
+        return int(full.full_chat.pts)
+    except Exception as e:
+        LOGGER.warning(f"[ChannelSync] Could not read update state of {chat_id}: {e}")
+        return None
+
+
+#----- Highest message id without posting a probe. A difference from pts=1 is "too long" for any
+#----- channel with more than SYNC_TOP_ID_LIMIT events (and carries the dialog's top message);
+#----- smaller channels return their complete message list.
+async def latest_message_id(client, chat_id: int) -> Optional[int]:
+    try:
+        diff = await _channel_difference(client, await _input_channel(client, chat_id), 1, SYNC_TOP_ID_LIMIT)
+    except Exception as e:
+        LOGGER.warning(f"[ChannelSync] Could not read the latest message id of {chat_id}: {e}")
+        return None
+    if isinstance(diff, raw.types.updates.ChannelDifferenceTooLong):
+        return int(diff.dialog.top_message)
+    if isinstance(diff, raw.types.updates.ChannelDifference) and diff.final:
+        ids = [m.id for m in diff.new_messages if isinstance(m, raw.types.Message)]
+        return max(ids) if ids else None
+    return None
+
+
+#----- One bot taking part in a scan. History requests are paced per bot: one in flight,
+#----- SCAN_BATCH_DELAY between calls, and a FloodWait parks only this bot.
+class _ScanBot:
+    def __init__(self, index: int, client) -> None:
+        self.index = index
+        self.client = client
+        self.name = "main" if index == 0 else f"bot{index}"
+        self._lock = asyncio.Lock()
+        self._next_at = 0.0
+        self.blocked_until = 0.0
+        self.requests = 0
+        self.messages = 0
+        self.flood_waits = 0
+        self.fetch_seconds = 0.0
+        self.active: Optional[str] = None
+
+    async def get_messages(self, chat_id: int, ids: List[int]) -> list:
+        async with self._lock:
+            delay = max(self._next_at, self.blocked_until) - _now()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            started = time.monotonic()
+            try:
+                messages = await self.client.get_messages(chat_id, ids)
+            except FloodWait as e:
+                self.flood_waits += 1
+                self.blocked_until = _now() + float(e.value) + SCAN_FLOOD_PAD
+                raise
+            finally:
+                self.requests += 1
+                self.fetch_seconds += time.monotonic() - started
+                self._next_at = _now() + SCAN_BATCH_DELAY
+        if not isinstance(messages, list):
+            messages = [messages]
+        found = [m for m in messages if m is not None and not m.empty]
+        self.messages += len(found)
+        return found
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "bot": self.name,
+            "requests": self.requests,
+            "messages": self.messages,
+            "flood_waits": self.flood_waits,
+            "blocked_for": max(0, round(self.blocked_until - _now())),
+            "active": self.active,
+        }
+
+
+#----- A slice of one channel's ids: [start, end] with a resumable cursor.
+#----- end is None in heuristic mode (no last id): the range ends after SCAN_MAX_EMPTY_BATCHES empty batches.
+#----- next_id is where fetching continues; cursor only moves once every message below it has been written.
+class _ScanRange:
+    __slots__ = ("ch", "chat_id", "start", "end", "cursor", "next_id", "inflight", "empty", "owner")
+
+    def __init__(self, ch: str, chat_id: int, start: int, end: Optional[int], cursor: Optional[int] = None) -> None:
+        self.ch = ch
+        self.chat_id = chat_id
+        self.start = int(start)
+        self.end = None if end is None else int(end)
+        self.cursor = int(cursor if cursor is not None else start)
+        self.next_id = self.cursor
+        self.inflight: deque = deque()
+        self.empty = 0
+        self.owner: Optional[int] = None
+
+    @property
+    def fetched(self) -> bool:
+        if self.next_id >= SCAN_MAX_ID_CAP:
+            return True
+        if self.end is None:
+            return self.empty >= SCAN_MAX_EMPTY_BATCHES
+        return self.next_id > self.end
+
+    @property
+    def done(self) -> bool:
+        return self.fetched and not self.inflight
+
+    def dump(self) -> list:
+        return [self.start, self.end, self.cursor]
+
+
+#----- Messages of one fetched batch still moving through the pipeline
+class _ScanBatch:
+    __slots__ = ("rng", "upper", "pending")
+
+    def __init__(self, rng: _ScanRange, upper: int, pending: int) -> None:
+        self.rng = rng
+        self.upper = upper
+        self.pending = pending
+
+
+#----- One pipeline stage: a bounded inbox drained by `workers` tasks. The handler either
+#----- forwards the item as (next_stage, item) or finishes it, which calls on_done(item, failed).
+class _Stage:
+    def __init__(self, name: str, handler, on_done, workers: int, capacity: int) -> None:
+        self.name = name
+        self.handler = handler
+        self.on_done = on_done
+        self.workers = workers
+        self.queue: asyncio.Queue = asyncio.Queue(capacity)
+        self._tasks: List[asyncio.Task] = []
+        self._started = 0.0
+        self.busy = 0
+        self.processed = 0
+        self.errors = 0
+        self.high_water = 0
+        self.busy_seconds = 0.0
+
+    def start(self) -> None:
+        self._started = time.monotonic()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"scan-{self.name}-{i}") for i in range(self.workers)
+        ]
+
+    async def put(self, item) -> None:
+        await self.queue.put(item)
+        self.high_water = max(self.high_water, self.queue.qsize())
+
+    async def _worker(self) -> None:
+        while True:
+            item = await self.queue.get()
+            started = time.monotonic()
+            self.busy += 1
+            forward, failed = None, False
+            try:
+                forward = await self.handler(item)
+            except Exception as e:
+                failed = True
+                self.errors += 1
+                LOGGER.error(f"[ScanManager] {self.name} stage failed: {e}")
+            finally:
+                self.busy -= 1
+                self.busy_seconds += time.monotonic() - started
+                self.processed += 1
+            try:
+                if forward is not None:
+                    try:
+                        await forward[0].put(forward[1])
+                    except Exception as e:
+                        #----- Never reached the next stage: settle it here so the batch isn't left pending
+                        LOGGER.error(f"[ScanManager] {self.name} stage hand-off failed: {e}")
+                        self.errors += 1
+                        await self.on_done(item, True)
+                else:
+                    await self.on_done(item, failed)
+            except Exception as e:
+                LOGGER.error(f"[ScanManager] {self.name} stage completion failed: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def join(self) -> None:
+        await self.queue.join()
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        wall = (time.monotonic() - self._started) * self.workers if self._started else 0.0
+        return {
+            "stage": self.name,
+            "workers": self.workers,
+            "busy": self.busy,
+            "queued": self.queue.qsize(),
+            "capacity": self.queue.maxsize,
+            "high_water": self.high_water,
+            "processed": self.processed,
+            "errors": self.errors,
+            "avg_ms": round(self.busy_seconds / self.processed * 1000, 1) if self.processed else 0.0,
+            "utilization": round(min(100.0, self.busy_seconds / wall * 100), 1) if wall > 0 else 0.0,
+        }
+
+
+#----- Already-indexed message ids of one chat over [lo, hi], one bit per id
+class _IndexedIds:
+    __slots__ = ("lo", "hi", "bits")
+
+    def __init__(self, lo: int, hi: int, ids) -> None:
+        self.lo = lo
+        self.hi = hi
+        self.bits = bytearray((hi - lo) // 8 + 1)
+        for msg_id in ids:
+            if lo <= msg_id <= hi:
+                off = msg_id - lo
+                self.bits[off >> 3] |= 1 << (off & 7)
+
+    def covers(self, lo: int, hi: int) -> bool:
+        return self.lo <= lo and hi <= self.hi
+
+    def __contains__(self, msg_id: int) -> bool:
+        if not self.lo <= msg_id <= self.hi:
+            return False
+        off = msg_id - self.lo
+        return bool(self.bits[off >> 3] & (1 << (off & 7)))
+
+
 class ScanManager:
     def __init__(self) -> None:
         self._db = None
         self._task: Optional[asyncio.Task] = None
         self._cancel = False
         self._lock = asyncio.Lock()
-        self._db_lock = asyncio.Lock()
+        self._persist_lock = asyncio.Lock()
+        self._client = None
+        self._bots: List[_ScanBot] = []
+        self._channels: Dict[str, Dict[str, Any]] = {}
+        self._queue: List[_ScanRange] = []
+        self._stages: Dict[str, _Stage] = {}
+        self._rate_samples: deque = deque()
+        self._run_first_sample: Optional[tuple] = None
+        self._ids_scanned = 0
+        self._batches = 0
         self.state: Dict[str, Any] = self._blank_state()
 
     #----- ── State helpers ────────────────────────────────────────────────────────
@@ -66,7 +396,10 @@ class ScanManager:
             "current_channel_name": "",
             "current_id": 0,             
             "current_target_id": 0,      
-            "cursors": {},               
+            "cursors": {},
+            "ranges": {},
+            "channel_names": {},
+            "plan_pts": {},
             "counters": {
                 "total_found": 0,
                 "processed": 0,
@@ -114,6 +447,10 @@ class ScanManager:
             merged = self._blank_state()
             merged.update(doc)
             merged["cursors"] = {str(k): int(v) for k, v in (merged.get("cursors") or {}).items()}
+            merged["ranges"] = {
+                str(k): [list(r) for r in (v or []) if isinstance(r, (list, tuple)) and len(r) == 3]
+                for k, v in (merged.get("ranges") or {}).items()
+            }
             if merged["status"] == "running":
                 merged["status"] = "paused"
             self.state = merged
@@ -123,18 +460,78 @@ class ScanManager:
         else:
             self.state = self._blank_state()
 
+    #----- Copy the live range cursors into the persisted state; a channel's cursor is the
+    #----- lowest id any of its unfinished ranges still has to read.
+    def _sync_ranges(self) -> None:
+        s = self.state
+        for ch, plan in self._channels.items():
+            open_ranges = [r for r in plan["ranges"] if not r.done]
+            if not open_ranges:
+                continue
+            s["ranges"][ch] = [r.dump() for r in open_ranges]
+            s["cursors"][ch] = min(r.cursor for r in open_ranges)
+
     async def _persist(self) -> None:
         if self._db is None:
             return
-        self.state["updated_at"] = _now()
-        try:
-            doc = dict(self.state)
-            doc["_id"] = _SCAN_DOC_ID
-            await self._db.dbs["tracking"][_STATE_COLLECTION].update_one(
-                {"_id": _SCAN_DOC_ID}, {"$set": doc}, upsert=True
-            )
-        except Exception as e:
-            LOGGER.error(f"[ScanManager] persist failed: {e}")
+        async with self._persist_lock:
+            self._sync_ranges()
+            self.state["updated_at"] = _now()
+            try:
+                doc = dict(self.state)
+                doc["_id"] = _SCAN_DOC_ID
+                await self._db.dbs["tracking"][_STATE_COLLECTION].update_one(
+                    {"_id": _SCAN_DOC_ID}, {"$set": doc}, upsert=True
+                )
+            except Exception as e:
+                LOGGER.error(f"[ScanManager] persist failed: {e}")
+
+    #----- Messages/ids per second over the last SCAN_RATE_WINDOW seconds, plus the run average
+    def _throughput(self) -> Dict[str, float]:
+        samples = self._rate_samples
+        rate = {"messages_per_sec": 0.0, "ids_per_sec": 0.0, "avg_messages_per_sec": 0.0}
+        if len(samples) >= 2:
+            (t0, m0, i0), (t1, m1, i1) = samples[0], samples[-1]
+            if t1 > t0:
+                rate["messages_per_sec"] = round((m1 - m0) / (t1 - t0), 1)
+                rate["ids_per_sec"] = round((i1 - i0) / (t1 - t0), 1)
+        first = self._run_first_sample
+        if first and samples and samples[-1][0] > first[0]:
+            rate["avg_messages_per_sec"] = round((samples[-1][1] - first[1]) / (samples[-1][0] - first[0]), 1)
+        return rate
+
+    def _record_rate(self) -> None:
+        now = _now()
+        sample = (now, self.state["counters"]["processed"], self._ids_scanned)
+        if self._run_first_sample is None:
+            self._run_first_sample = sample
+        self._rate_samples.append(sample)
+        while len(self._rate_samples) > 2 and now - self._rate_samples[0][0] > SCAN_RATE_WINDOW:
+            self._rate_samples.popleft()
+
+    #----- Per-stage load; the stage with the highest utilization is the one bounding throughput
+    def _stage_stats(self) -> List[Dict[str, Any]]:
+        if not self._stages:
+            return []
+        requests = sum(b.requests for b in self._bots)
+        fetch_seconds = sum(b.fetch_seconds for b in self._bots)
+        fetch = {
+            "stage": "fetch",
+            "workers": len(self._bots),
+            "busy": sum(1 for b in self._bots if b.active),
+            "queued": 0,
+            "capacity": 0,
+            "high_water": 0,
+            "processed": requests,
+            "errors": sum(b.flood_waits for b in self._bots),
+            "avg_ms": round(fetch_seconds / requests * 1000, 1) if requests else 0.0,
+            "utilization": 0.0,
+        }
+        started = self._stages["parse"]._started
+        if started and self._bots:
+            span = (time.monotonic() - started) * len(self._bots)
+            fetch["utilization"] = round(min(100.0, fetch_seconds / span * 100), 1) if span > 0 else 0.0
+        return [fetch] + [stage.stats() for stage in self._stages.values()]
 
     def get_status(self) -> Dict[str, Any]:
         s = self.state
@@ -145,6 +542,15 @@ class ScanManager:
 
         target = int(s.get("current_target_id", 0) or 0)
         cur = int(s.get("current_id", 0) or 0)
+        active_channels = 0
+        if s["status"] == "running" and self._channels:
+            #----- Parallel scan: progress is aggregated over every bounded range
+            bounded = [r for plan in self._channels.values() for r in plan["ranges"] if r.end is not None]
+            target = sum(r.end - r.start + 1 for r in bounded)
+            cur = sum(min(r.cursor, r.end + 1) - r.start for r in bounded)
+            active_channels = sum(
+                1 for plan in self._channels.values() if any(not r.done for r in plan["ranges"])
+            )
         progress = max(0, min(100, round(cur / target * 100))) if target > 0 else 0
 
         return {
@@ -160,6 +566,10 @@ class ScanManager:
             "current_target_id": target,
             "progress": progress,
             "has_progress": target > 0,
+            "active_channels": active_channels,
+            "bots": [b.stats() for b in self._bots],
+            "throughput": self._throughput(),
+            "stages": self._stage_stats(),
             "counters": dict(s["counters"]),
             "elapsed": _fmt_elapsed(elapsed),
             "elapsed_seconds": int(elapsed),
@@ -168,19 +578,21 @@ class ScanManager:
 
     async def _stream_id_exists(self, channel: int, msg_id: int) -> bool:
         db = self._db
+        if db.stream_index_ready:
+            return await db.lookup_stream_ref(channel, msg_id) is not None
         try:
-            stream_hash = await encode_string({"chat_id": channel, "msg_id": msg_id})
+            stream_hashes = await stream_id_variants(channel, msg_id)
         except Exception:
-            stream_hash = None
+            stream_hashes = []
         part_match = {"$elemMatch": {"chat_id": channel, "msg_id": msg_id}}
         for i in range(1, db.current_db_index + 1):
             storage = db.dbs.get(f"storage_{i}")
             if storage is None:
                 continue
-            if stream_hash:
-                if await storage["movie"].find_one({"telegram.id": stream_hash}):
+            if stream_hashes:
+                if await storage["movie"].find_one({"telegram.id": {"$in": stream_hashes}}):
                     return True
-                if await storage["tv"].find_one({"seasons.episodes.telegram.id": stream_hash}):
+                if await storage["tv"].find_one({"seasons.episodes.telegram.id": {"$in": stream_hashes}}):
                     return True
             if await storage["movie"].find_one({"telegram.parts": part_match}):
                 return True
@@ -208,10 +620,12 @@ class ScanManager:
                     except ValueError:
                         continue
                     try:
-                        await self._purge_channel_entries(ch_int)
+                        await self._db.purge_channel(ch_int)
                     except Exception as e:
                         LOGGER.error(f"[ScanManager] purge failed for {ch}: {e}")
                     self.state["cursors"].pop(str(ch), None)
+                    self.state["ranges"].pop(str(ch), None)
+                    self.state["plan_pts"].pop(str(ch), None)
                 self.state["selected_channels"] = list(channels)
                 self.state["pending"] = list(channels)
                 self.state["counters"] = self._blank_counters()
@@ -237,6 +651,8 @@ class ScanManager:
             self.state["finished_at"] = 0.0
             self.state["started_at"] = _now()
             self._cancel = False
+            self._channels = {}
+            self._queue = []
             await self._persist()
 
             self._task = asyncio.create_task(self._run(client))
@@ -249,158 +665,345 @@ class ScanManager:
         self._cancel = True
         return {"ok": True, "message": "Stop requested — the scan will pause after the current batch."}
 
+    #----- ── Parallel scheduler ─────────────────────────────────────────────────
+    #----- Every channel is cut into SCAN_RANGE_SIZE id ranges; one worker per bot claims ranges
+    #----- (round-robin across channels) from the channels where that bot is an admin.
     async def _run(self, client) -> None:
+        s = self.state
         try:
-            while self.state["pending"] and not self._cancel:
-                ch = self.state["pending"][0]
+            self._client = client
+            self._bots = self._scan_bots(client)
+            self._rate_samples.clear()
+            self._run_first_sample = None
+            self._ids_scanned = 0
+            self._batches = 0
+
+            channels = []
+            for ch in list(s["pending"]):
                 try:
-                    ch_id = int(ch)
+                    int(ch)
+                    channels.append(ch)
                 except ValueError:
                     LOGGER.warning(f"[ScanManager] invalid channel id: {ch}")
-                    self.state["pending"].pop(0)
-                    await self._persist()
-                    continue
+                    s["pending"].remove(ch)
 
-                completed = await self._scan_channel(client, ch_id, ch)
-                if self._cancel:
-                    break
-                if completed:
-                    if self.state["pending"] and self.state["pending"][0] == ch:
-                        self.state["pending"].pop(0)
-                    await self._persist()
+            sem = asyncio.Semaphore(SCAN_PLAN_CONCURRENCY)
+
+            async def _plan(ch):
+                async with sem:
+                    if self._cancel:
+                        return ch, None
+                    return ch, await self._plan_channel(ch)
+
+            unreadable = []
+            for ch, plan in await asyncio.gather(*(_plan(ch) for ch in channels)):
+                if plan is None:
+                    if not self._cancel:
+                        unreadable.append(ch)
+                    continue
+                self._channels[ch] = plan
+                if all(r.done for r in plan["ranges"]):
+                    plan["finished"] = True
+                    await self._finish_channel(ch)
+            self._queue = self._interleave()
+            await self._persist()
 
+            if self._queue and not self._cancel:
+                LOGGER.info(
+                    f"[ScanManager] Scanning {len(self._channels)} channel(s) in {len(self._queue)} range(s) "
+                    f"with {len(self._bots)} bot(s)"
+                )
+                self._start_pipeline()
+                await asyncio.gather(*(self._bot_worker(bot) for bot in self._bots))
+                #----- Items only move forward, so draining the stages in order empties the pipeline
+                for stage in self._stages.values():
+                    await stage.join()
+
+            lost = [ch for ch in self._channels if ch in s["pending"]]
+            unreadable += [ch for ch in lost if ch not in unreadable]
             if self._cancel:
-                self.state["status"] = "cancelled"
+                s["status"] = "cancelled"
                 LOGGER.info("[ScanManager] Scan cancelled by user (resumable).")
+            elif unreadable:
+                names = ", ".join(s["channel_names"].get(ch) or ch for ch in unreadable)
+                s["status"] = "error"
+                s["error"] = f"Access denied to channel — make sure the bot is an admin. ({names})"
+                LOGGER.error(f"[ScanManager] {s['error']}")
             else:
-                self.state["status"] = "completed"
-                self.state["current_channel"] = None
-                self.state["current_channel_name"] = ""
+                s["status"] = "completed"
+                s["current_channel"] = None
+                s["current_channel_name"] = ""
                 LOGGER.info("[ScanManager] Scan completed.")
-            self.state["finished_at"] = _now()
+            s["finished_at"] = _now()
             await self._persist()
 
-        except (ChannelPrivate, ChatAdminRequired) as e:
-            self.state["status"] = "error"
-            self.state["error"] = f"Access denied to channel — make sure the bot is an admin. ({e})"
-            self.state["finished_at"] = _now()
-            LOGGER.error(f"[ScanManager] {self.state['error']}")
-            await self._persist()
         except asyncio.CancelledError:
             await self._persist()
             raise
         except Exception as e:
-            self.state["status"] = "error"
-            self.state["error"] = str(e)
-            self.state["finished_at"] = _now()
+            s["status"] = "error"
+            s["error"] = str(e)
+            s["finished_at"] = _now()
             LOGGER.error(f"[ScanManager] Unexpected error: {e}")
             await self._persist()
+        finally:
+            for bot in self._bots:
+                bot.active = None
+            for stage in self._stages.values():
+                await stage.stop()
+
+    #----- The client the scan was started with first, then every other connected bot
+    @staticmethod
+    def _scan_bots(client) -> List[_ScanBot]:
+        bots: List[_ScanBot] = []
+        seen = set()
+        for index, c in [(0, client)] + sorted(multi_clients.items()):
+            if c is None or index < 0 or id(c) in seen:
+                continue
+            seen.add(id(c))
+            bots.append(_ScanBot(index, c))
+        return bots
+
+    async def _can_read(self, bot: _ScanBot, chat_id: int) -> bool:
+        try:
+            member = await bot.client.get_chat_member(chat_id, "me")
+        except FloodWait as e:
+            bot.blocked_until = _now() + float(e.value) + SCAN_FLOOD_PAD
+            return False
+        except Exception:
+            return False
+        return member.status in (ChatMemberStatus.OWNER, ChatMemberStatus.ADMINISTRATOR)
 
-    async def _scan_channel(self, client, chat_id: int, ch_key: str) -> bool:
+    #----- Readers, display name and id ranges for one channel; None when no bot can read it.
+    #----- Saved ranges from an interrupted run are reused as-is, so resuming skips the probe.
+    async def _plan_channel(self, ch_key: str) -> Optional[Dict[str, Any]]:
         s = self.state
+        chat_id = int(ch_key)
+        checks = await asyncio.gather(*(self._can_read(bot, chat_id) for bot in self._bots))
+        readers = [bot for bot, ok in zip(self._bots, checks) if ok]
+        if not readers:
+            LOGGER.warning(f"[ScanManager] No connected bot is an admin in {chat_id}; skipping it")
+            return None
 
         try:
-            chat = await client.get_chat(chat_id)
-            s["current_channel_name"] = getattr(chat, "title", str(chat_id))
-        except (ChannelPrivate, ChatAdminRequired):
-            raise
+            chat = await readers[0].client.get_chat(chat_id)
+            s["channel_names"][ch_key] = getattr(chat, "title", None) or str(chat_id)
         except Exception as e:
-            s["current_channel_name"] = str(chat_id)
+            s["channel_names"].setdefault(ch_key, str(chat_id))
             LOGGER.warning(f"[ScanManager] Could not resolve channel name for {chat_id}: {e}")
+        name = s["channel_names"][ch_key]
 
-        s["current_channel"] = ch_key
-
-        last_id = await self._probe_last_message_id(client, chat_id)
-        use_probe = last_id is not None and last_id >= 1
-        s["current_target_id"] = last_id if use_probe else 0
-
-        current = int(s["cursors"].get(str(ch_key), 1) or 1)
-        LOGGER.info(
-            f"[ScanManager] Scanning {s['current_channel_name']} ({chat_id}) from id {current}"
-            + (f" up to {last_id} (probe)" if use_probe else " (heuristic mode — probe unavailable)")
-        )
-
-        empty_streak = 0
-        batch_count = 0
+        saved = s["ranges"].get(ch_key)
+        if saved:
+            ranges = [_ScanRange(ch_key, chat_id, *r) for r in saved]
+            LOGGER.info(f"[ScanManager] Resuming {name} ({chat_id}): {len(ranges)} range(s) left")
+        else:
+            current = int(s["cursors"].get(ch_key, 1) or 1)
+            #----- Update state first: sync picks up from here once the channel is swept
+            s["plan_pts"][ch_key] = await channel_pts(readers[0].client, chat_id)
+            last_id = await latest_message_id(readers[0].client, chat_id)
+            if last_id is None:
+                last_id = await self._probe_last_message_id(readers[0].client, chat_id)
+            if last_id is not None and last_id >= 1:
+                last_id = min(last_id, SCAN_MAX_ID_CAP - 1)
+                ranges = [
+                    _ScanRange(ch_key, chat_id, lo, min(lo + SCAN_RANGE_SIZE - 1, last_id))
+                    for lo in range(current, last_id + 1, SCAN_RANGE_SIZE)
+                ]
+                if not ranges:
+                    #----- Nothing new since the last scan; keep the cursor where it is
+                    ranges = [_ScanRange(ch_key, chat_id, current, current - 1)]
+            else:
+                ranges = [_ScanRange(ch_key, chat_id, current, None)]
+            LOGGER.info(
+                f"[ScanManager] Scanning {name} ({chat_id}) from id {current}"
+                + (f" up to {last_id}" if ranges[0].end is not None else " (heuristic mode — last id unknown)")
+                + f" with {len(readers)} bot(s)"
+            )
+        return {"chat_id": chat_id, "readers": {bot.index for bot in readers}, "ranges": ranges}
+
+    #----- Round-robin the ranges across channels so every channel makes progress at once
+    def _interleave(self) -> List[_ScanRange]:
+        lanes = [[r for r in plan["ranges"] if not r.done] for plan in self._channels.values()]
+        queue: List[_ScanRange] = []
+        while any(lanes):
+            for lane in lanes:
+                if lane:
+                    queue.append(lane.pop(0))
+        return queue
+
+    def _claim(self, bot: _ScanBot) -> Optional[_ScanRange]:
+        for rng in self._queue:
+            if rng.owner is None and not rng.fetched and bot.index in self._channels[rng.ch]["readers"]:
+                rng.owner = bot.index
+                return rng
+        return None
+
+    def _has_work(self, bot: _ScanBot) -> bool:
+        return any(not r.fetched and bot.index in self._channels[r.ch]["readers"] for r in self._queue)
+
+    async def _bot_worker(self, bot: _ScanBot) -> None:
+        while not self._cancel:
+            #----- Flood-waited: stay off the queue until it lifts so other bots take the range
+            blocked = bot.blocked_until - _now()
+            if blocked > 0:
+                if not self._has_work(bot):
+                    return
+                await asyncio.sleep(min(blocked, 1))
+                continue
+            rng = self._claim(bot)
+            if rng is None:
+                if not self._has_work(bot):
+                    return
+                #----- Everything left is held by other bots; one may hand a range back on FloodWait
+                await asyncio.sleep(1)
+                continue
+            try:
+                await self._scan_range(bot, rng)
+            finally:
+                rng.owner = None
+                bot.active = None
 
-        while not self._cancel and current < SCAN_MAX_ID_CAP:
-            #----- ── Stop condition ───────────────────────────────────────────────
-            if use_probe:
-                if current > last_id:
-                    break
-            elif empty_streak >= SCAN_MAX_EMPTY_BATCHES:
-                break
+    #----- One stream-index query per SCAN_RANGE_SIZE window replaces a dup lookup per message
+    async def _prefetch_indexed(self, chat_id: int, lo: int, hi: int) -> Optional[_IndexedIds]:
+        channel_int = int(str(chat_id).replace("-100", ""))
+        try:
+            ids = await self._db.indexed_msg_ids(channel_int, lo, hi)
+        except Exception as e:
+            LOGGER.warning(f"[ScanManager] Indexed-id prefetch failed for {chat_id} [{lo}, {hi}]: {e}")
+            return None
+        return None if ids is None else _IndexedIds(lo, hi, ids)
 
-            upper = min(current + SCAN_BATCH_SIZE, SCAN_MAX_ID_CAP)
-            if use_probe:
-                upper = min(upper, last_id + 1)
-            batch_ids = list(range(current, upper))
-            if not batch_ids:
-                break
+    #----- Fetch stage: one per bot. Fetched messages go into the parse stage; the bot moves
+    #----- on to the next batch while earlier ones are still being resolved and written.
+    async def _scan_range(self, bot: _ScanBot, rng: _ScanRange) -> None:
+        s = self.state
+        name = s["channel_names"].get(rng.ch) or rng.ch
+        indexed: Optional[_IndexedIds] = None
+
+        while not self._cancel and not rng.fetched:
+            start = rng.next_id
+            upper = min(start + SCAN_BATCH_SIZE, SCAN_MAX_ID_CAP)
+            if rng.end is not None:
+                upper = min(upper, rng.end + 1)
+            batch_ids = list(range(start, upper))
+            bot.active = f"{name} #{start}"
+
+            if indexed is None or not indexed.covers(start, upper - 1):
+                hi = start + SCAN_RANGE_SIZE - 1
+                if rng.end is not None:
+                    hi = min(hi, rng.end)
+                indexed = await self._prefetch_indexed(rng.chat_id, start, max(hi, upper - 1))
 
             try:
-                messages = await client.get_messages(chat_id, batch_ids)
+                found = await bot.get_messages(rng.chat_id, batch_ids)
             except FloodWait as e:
-                LOGGER.info(f"[ScanManager] FloodWait {e.value}s — sleeping…")
-                await asyncio.sleep(e.value)
-                try:
-                    messages = await client.get_messages(chat_id, batch_ids)
-                except Exception as ex:
-                    LOGGER.error(f"[ScanManager] Retry failed at {current}: {ex}")
-                    s["counters"]["errors"] += 1
-                    current = upper
-                    empty_streak += 1
-                    s["cursors"][str(ch_key)] = current
-                    s["current_id"] = current
-                    continue
+                #----- Hand the range back: another bot can carry on while this one waits
+                LOGGER.info(f"[ScanManager] {bot.name}: FloodWait {e.value}s at {start} in {name}")
+                return
+            except (ChannelPrivate, ChatAdminRequired) as e:
+                LOGGER.warning(f"[ScanManager] {bot.name} lost access to {name}: {e}")
+                self._channels[rng.ch]["readers"].discard(bot.index)
+                return
             except Exception as e:
-                LOGGER.error(f"[ScanManager] Batch fetch error at {current}: {e}")
+                LOGGER.error(f"[ScanManager] Batch fetch error at {start} in {name}: {e}")
                 s["counters"]["errors"] += 1
-                current = upper
-                empty_streak += 1
-                s["cursors"][str(ch_key)] = current
-                s["current_id"] = current
-                continue
-
-            if not isinstance(messages, list):
-                messages = [messages]
-
-            to_process = [m for m in messages if m is not None and not m.empty]
-            batch_had_content = bool(to_process)
-
-            if to_process:
-                s["counters"]["total_found"] += len(to_process)
-                sem = asyncio.Semaphore(SCAN_PROCESS_CONCURRENCY)
-
-                async def _worker(msg):
-                    async with sem:
-                        if self._cancel:
-                            return
-                        await self._process_message(client, msg, chat_id)
-                        s["counters"]["processed"] += 1
-
-                await asyncio.gather(*(_worker(m) for m in to_process))
+                found = []
 
             if self._cancel:
-                s["cursors"][str(ch_key)] = current
-                s["current_id"] = current
-                await self._persist()
-                return False
+                return
 
-            empty_streak = 0 if batch_had_content else empty_streak + 1
-            current = upper
-            s["cursors"][str(ch_key)] = current
-            s["current_id"] = current
+            batch = _ScanBatch(rng, upper, len(found))
+            rng.inflight.append(batch)
+            rng.next_id = upper
+            rng.empty = 0 if found else rng.empty + 1
+            self._ids_scanned += len(batch_ids)
+            s["current_channel"] = rng.ch
+            s["current_channel_name"] = name
+
+            if found:
+                s["counters"]["total_found"] += len(found)
+                #----- One round trip to the parse workers for the whole batch
+                parse_pool.prime(
+                    m.caption or (m.video or m.document).file_name
+                    for m in found if m.video or m.document
+                )
+                for msg in found:
+                    await self._stages["parse"].put({"batch": batch, "message": msg, "indexed": indexed})
+            else:
+                await self._commit(rng)
+
+    def _start_pipeline(self) -> None:
+        parse = _Stage("parse", self._stage_parse, self._item_done, SCAN_PARSE_WORKERS, SCAN_STAGE_QUEUE)
+        resolve = _Stage("resolve", self._stage_resolve, self._item_done, SCAN_PROCESS_CONCURRENCY, SCAN_STAGE_QUEUE)
+        write = _Stage("write", self._stage_write, self._item_done, SCAN_WRITE_WORKERS, SCAN_STAGE_QUEUE)
+        self._stages = {"parse": parse, "resolve": resolve, "write": write}
+        for stage in self._stages.values():
+            stage.start()
+
+    #----- ── Pipeline stages ─────────────────────────────────────────────────────
+    async def _stage_parse(self, item: Dict[str, Any]):
+        if self._cancel:
+            return None
+        job = await self._parse_message(item["message"], item["batch"].rng.chat_id, item["indexed"], self.state["counters"])
+        if job is None:
+            return None
+        job["batch"] = item["batch"]
+        return (self._stages["write" if job["kind"] == "subtitle" else "resolve"], job)
 
-            batch_count += 1
-            if batch_count % SCAN_PERSIST_EVERY == 0:
-                await self._persist()
+    async def _stage_resolve(self, job: Dict[str, Any]):
+        if self._cancel or not await self._resolve_job(self._client, job, self.state["counters"]):
+            return None
+        return (self._stages["write"], job)
 
-            await asyncio.sleep(SCAN_BATCH_DELAY)
+    async def _stage_write(self, job: Dict[str, Any]):
+        if not self._cancel:
+            await self._write_job(job, self.state["counters"])
+        return None
 
-        await self._persist()
-        LOGGER.info(f"[ScanManager] Finished {s['current_channel_name']} at id {current}")
-        return True
+    #----- A message left the pipeline. Once a whole batch is through, the range cursor moves past it.
+    #----- Cancelled items are dropped without committing, so a resume fetches them again.
+    async def _item_done(self, item: Dict[str, Any], failed: bool) -> None:
+        if self._cancel:
+            return
+        counters = self.state["counters"]
+        counters["processed"] += 1
+        if failed:
+            counters["errors"] += 1
+        batch: _ScanBatch = item["batch"]
+        batch.pending -= 1
+        if batch.pending <= 0:
+            await self._commit(batch.rng)
+
+    async def _commit(self, rng: _ScanRange) -> None:
+        moved = False
+        while rng.inflight and rng.inflight[0].pending <= 0:
+            rng.cursor = rng.inflight.popleft().upper
+            moved = True
+        if not moved:
+            return
+        self._record_rate()
+        plan = self._channels[rng.ch]
+        if not plan.get("finished") and all(r.done for r in plan["ranges"]):
+            plan["finished"] = True
+            await self._finish_channel(rng.ch)
+            await self._persist()
+            return
+        self._batches += 1
+        if self._batches % SCAN_PERSIST_EVERY == 0:
+            await self._persist()
+
+    async def _finish_channel(self, ch_key: str) -> None:
+        s = self.state
+        ranges = self._channels[ch_key]["ranges"]
+        s["cursors"][ch_key] = max(r.cursor for r in ranges)
+        s["ranges"].pop(ch_key, None)
+        if ch_key in s["pending"]:
+            s["pending"].remove(ch_key)
+        await channel_sync_manager.set_baseline(ch_key, s["plan_pts"].pop(ch_key, None))
+        LOGGER.info(
+            f"[ScanManager] Finished {s['channel_names'].get(ch_key) or ch_key} at id {s['cursors'][ch_key]}"
+        )
 
     async def _probe_last_message_id(self, client, chat_id: int):
         probe = None
@@ -428,23 +1031,22 @@ class ScanManager:
             )
         return last_id
 
-    async def _process_message(self, client, message, chat_id: int) -> None:
-        s = self.state
-        db = self._db
-
+    #----- ── Per-message steps (shared by the scan pipeline and channel sync) ───────
+    #----- Classify a message and settle everything that needs no lookup.
+    #----- Returns a subtitle/media job for the next step, or None when the message is done.
+    async def _parse_message(
+        self, message, chat_id: int, indexed: Optional[_IndexedIds], counters: Dict[str, int],
+    ) -> Optional[Dict[str, Any]]:
         if is_skip_channel(message):
-            s["counters"]["skipped_meta"] += 1
-            return
+            counters["skipped_meta"] += 1
+            return None
+
+        channel_int = int(str(chat_id).replace("-100", ""))
 
         #----- Subtitle files: match to a title and store, don't treat as media
         sub_name = message.document.file_name if message.document else ""
         if sub_name and is_subtitle_file(sub_name):
-            channel_int = int(str(chat_id).replace("-100", ""))
-            if await ingest_subtitle(sub_name, channel_int, message.id):
-                s["counters"]["subtitles_added"] += 1
-            else:
-                s["counters"]["subtitles_skipped"] += 1
-            return
+            return {"kind": "subtitle", "message": message, "channel": channel_int, "name": sub_name}
 
         is_video = bool(message.video)
         is_supported = is_video
@@ -458,122 +1060,117 @@ class ScanManager:
                     is_supported = True
 
         if not is_supported:
-            s["counters"]["skipped_nonvid"] += 1
-            return
+            counters["skipped_nonvid"] += 1
+            return None
 
         file = message.video or message.document
         title = message.caption or file.file_name
         msg_id = message.id
-        raw_size = file.file_size
-        size = get_readable_file_size(file.file_size)
-        channel_int = int(str(chat_id).replace("-100", ""))
 
         try:
-            if await self._stream_id_exists(channel_int, msg_id):
-                s["counters"]["skipped_dup"] += 1
-                return
+            if indexed is not None:
+                exists = msg_id in indexed
+            else:
+                exists = await self._stream_id_exists(channel_int, msg_id)
+            if exists:
+                counters["skipped_dup"] += 1
+                return None
         except Exception as e:
             LOGGER.warning(f"[ScanManager] Dup-check error msg {msg_id}: {e}")
 
+        return {
+            "kind": "media",
+            "message": message,
+            "channel": channel_int,
+            "msg_id": msg_id,
+            "title": title,
+            "filename": await parse_pool.clean(title),
+            "override_id": extract_default_id(message.caption or ""),
+            "size": get_readable_file_size(file.file_size),
+            "raw_size": file.file_size,
+        }
+
+    #----- Metadata lookup; misses are counted and routed to the skip channel
+    async def _resolve_job(self, client, job: Dict[str, Any], counters: Dict[str, int]) -> bool:
+        msg_id = job["msg_id"]
         try:
             metadata_info = await metadata(
-                clean_filename(title), channel_int, msg_id,
-                override_id=extract_default_id(message.caption or ""),
+                job["filename"], job["channel"], msg_id, override_id=job["override_id"],
             )
         except Exception as e:
             LOGGER.warning(f"[ScanManager] Metadata exception for msg {msg_id}: {e}")
             metadata_info = None
 
         if metadata_info is None:
-            s["counters"]["skipped_meta"] += 1
+            counters["skipped_meta"] += 1
             try:
-                await route_to_skip_channel(client, message)
+                await route_to_skip_channel(client, job["message"])
             except Exception as e:
                 LOGGER.warning(f"[ScanManager] Skip-channel route failed for msg {msg_id}: {e}")
+            return False
+        job["metadata"] = metadata_info
+        return True
+
+    async def _write_job(self, job: Dict[str, Any], counters: Dict[str, int]) -> None:
+        if job["kind"] == "subtitle":
+            if await ingest_subtitle(job["name"], job["channel"], job["message"].id):
+                counters["subtitles_added"] += 1
+            else:
+                counters["subtitles_skipped"] += 1
             return
 
-        title_clean = finalize_media_name(title, bool(metadata_info.get('group_key')))
+        db = self._db
+        metadata_info = job["metadata"]
+        msg_id = job["msg_id"]
+        title_clean = finalize_media_name(job["title"], bool(metadata_info.get('group_key')))
 
         insert_status: dict = {}
-        try:
-            async with self._db_lock:
-                updated_id = await db.insert_media(
+
+        #----- Same title-sharded pool as live ingest: scans from several bots insert in parallel,
+        #----- while writes to one title stay ordered
+        async def _insert():
+            try:
+                return await db.insert_media(
                     metadata_info,
-                    channel=channel_int,
+                    channel=job["channel"],
                     msg_id=msg_id,
-                    size=size,
+                    size=job["size"],
                     name=title_clean,
-                    raw_size=raw_size,
+                    raw_size=job["raw_size"],
                     status=insert_status,
                 )
+            except Exception as e:
+                insert_status["error"] = e
+                return None
+
+        try:
+            key = ingest_pool.shard_key(metadata_info.get("media_type"), metadata_info.get("tmdb_id"))
+            updated_id = await (await ingest_pool.submit(key, _insert, label=title_clean))
+            if "error" in insert_status:
+                raise insert_status["error"]
             if updated_id:
                 if insert_status.get("duplicate_skipped"):
-                    s["counters"]["skipped_dup"] += 1
+                    counters["skipped_dup"] += 1
                 else:
-                    s["counters"]["indexed"] += 1
+                    counters["indexed"] += 1
             else:
-                s["counters"]["skipped_meta"] += 1
+                counters["skipped_meta"] += 1
         except Exception as e:
             LOGGER.error(f"[ScanManager] DB insert error msg {msg_id}: {e}")
-            s["counters"]["errors"] += 1
-
-    #----- ── Purge (rescan helper) ────────────────────────────────────────────────
-    async def _purge_channel_entries(self, channel_int: int) -> int:
-        db = self._db
-        purged = 0
-        try:
-            await db.dbs["tracking"]["subtitles"].delete_many({"chat_id": channel_int})
-        except Exception as e:
-            LOGGER.warning(f"[ScanManager] subtitle purge failed for {channel_int}: {e}")
-        for i in range(1, db.current_db_index + 1):
-            storage = db.dbs.get(f"storage_{i}")
-            if storage is None:
-                continue
-
-            async for movie in storage["movie"].find({}):
-                remaining = []
-                changed = False
-                for q in movie.get("telegram", []):
-                    try:
-                        decoded = await decode_string(q["id"])
-                        if int(decoded["chat_id"]) == channel_int:
-                            purged += 1
-                            changed = True
-                            continue
-                    except Exception:
-                        pass
-                    remaining.append(q)
-                if changed:
-                    if remaining:
-                        movie["telegram"] = remaining
-                        await storage["movie"].replace_one({"_id": movie["_id"]}, movie)
-                    else:
-                        await storage["movie"].delete_one({"_id": movie["_id"]})
-
-            async for tv in storage["tv"].find({}):
-                tv_changed = False
-                for season in tv.get("seasons", []):
-                    for episode in season.get("episodes", []):
-                        remaining = []
-                        for q in episode.get("telegram", []):
-                            try:
-                                decoded = await decode_string(q["id"])
-                                if int(decoded["chat_id"]) == channel_int:
-                                    purged += 1
-                                    tv_changed = True
-                                    continue
-                            except Exception:
-                                pass
-                            remaining.append(q)
-                        episode["telegram"] = remaining
-                    season["episodes"] = [ep for ep in season["episodes"] if ep.get("telegram")]
-                tv["seasons"] = [se for se in tv["seasons"] if se.get("episodes")]
-                if tv_changed:
-                    if tv["seasons"]:
-                        await storage["tv"].replace_one({"_id": tv["_id"]}, tv)
-                    else:
-                        await storage["tv"].delete_one({"_id": tv["_id"]})
-        return purged
+            counters["errors"] += 1
+
+    #----- All three steps in sequence for one message (channel sync path)
+    async def _process_message(
+        self, client, message, chat_id: int,
+        indexed: Optional[_IndexedIds] = None, counters: Optional[Dict[str, int]] = None,
+    ) -> None:
+        counters = self.state["counters"] if counters is None else counters
+        job = await self._parse_message(message, chat_id, indexed, counters)
+        if job is None:
+            return
+        if job["kind"] == "media" and not await self._resolve_job(client, job, counters):
+            return
+        await self._write_job(job, counters)
 
 
 class DbCheckManager:
@@ -806,6 +1403,7 @@ class DuplicateManager:
         self._purge_task: Optional[asyncio.Task] = None
         self._cancel = False
         self._lock = asyncio.Lock()
+        self._gid = 0
         self.state: Dict[str, Any] = self._blank_state()
 
     @staticmethod
@@ -829,13 +1427,19 @@ class DuplicateManager:
     def bind_db(self, db) -> None:
         self._db = db
 
-    def get_status(self) -> Dict[str, Any]:
+    def get_status(self, page: int = 1, per_page: int = 50) -> Dict[str, Any]:
         s = self.state
         elapsed = 0.0
         if s["started_at"]:
             end = s["finished_at"] or _now()
             elapsed = max(0.0, end - s["started_at"])
 
+        #----- Groups are served a page at a time; big libraries can have thousands
+        groups = s["groups"]
+        per_page = max(1, min(int(per_page or 50), 200))
+        total_pages = max(1, (len(groups) + per_page - 1) // per_page)
+        page = max(1, min(int(page or 1), total_pages))
+
         #----- Cleanup (purge) progress + ETA
         p_total = int(s.get("purge_total", 0) or 0)
         p_done = int(s.get("purge_done", 0) or 0)
@@ -858,7 +1462,10 @@ class DuplicateManager:
             "group_count": len(s["groups"]),
             "duplicate_count": s["duplicate_count"],
             "purged": s["purged"],
-            "groups": list(s["groups"]),
+            "groups": groups[(page - 1) * per_page:page * per_page],
+            "page": page,
+            "per_page": per_page,
+            "total_pages": total_pages,
             "elapsed": _fmt_elapsed(elapsed),
             "elapsed_seconds": int(elapsed),
             "error": s["error"],
@@ -881,6 +1488,7 @@ class DuplicateManager:
             self.state["status"] = "running"
             self.state["started_at"] = _now()
             self._cancel = False
+            self._gid = 0
             self._task = asyncio.create_task(self._run())
             return {"ok": True, "message": "Duplicate scan started.", "status": self.get_status()}
 
@@ -891,7 +1499,7 @@ class DuplicateManager:
         return {"ok": True, "message": "Stop requested."}
 
     #----- Group a telegram list by (quality, name, size); record groups with 2+ entries
-    def _collect(self, qualities: List[dict], label: str, media_type: str, gid: int) -> int:
+    def _collect(self, qualities: List[dict], label: str, media_type: str) -> None:
         buckets: Dict[tuple, List[dict]] = {}
         for q in qualities:
             if not q.get("id"):
@@ -900,9 +1508,9 @@ class DuplicateManager:
         for items in buckets.values():
             if len(items) < 2:
                 continue
-            gid += 1
+            self._gid += 1
             self.state["groups"].append({
-                "group_id": gid,
+                "group_id": self._gid,
                 "title": label,
                 "quality": items[0].get("quality"),
                 "media_type": media_type,
@@ -912,35 +1520,49 @@ class DuplicateManager:
                 ],
             })
             self.state["duplicate_count"] += len(items) - 1
-        return gid
+
+    #----- One shard: stream candidate groups out of the aggregation in cursor batches
+    async def _scan_shard(self, storage) -> None:
+        for collection, media_type in (("movie", "movie"), ("tv", "tv")):
+            if self._cancel:
+                return
+            cursor = storage[collection].aggregate(
+                _DUP_PIPELINES[collection], allowDiskUse=True, batchSize=DUP_AGG_BATCH_SIZE
+            )
+            async for cand in cursor:
+                if self._cancel:
+                    break
+                if media_type == "movie":
+                    year = cand.get("year")
+                    label = f"{cand.get('title') or 'Unknown'}{f' ({year})' if year else ''}"
+                else:
+                    label = (f"{cand.get('title') or 'Unknown'} "
+                             f"S{cand.get('season') or 0:02d}E{cand.get('episode') or 0:02d}")
+                entries = sorted(cand.get("entries", []), key=lambda e: e.get("pos", 0))
+                self._collect(entries, label, media_type)
+            self.state["scanned"] += await storage[collection].estimated_document_count()
 
     async def _run(self) -> None:
+        async with self._db.long_job():
+            await self._scan()
+
+    async def _scan(self) -> None:
         db = self._db
         s = self.state
         try:
-            gid = 0
-            for i in range(1, db.current_db_index + 1):
-                storage = db.dbs.get(f"storage_{i}")
-                if storage is None:
-                    continue
-
-                async for movie in storage["movie"].find({}):
-                    if self._cancel:
-                        break
-                    s["scanned"] += 1
-                    year = movie.get("release_year")
-                    label = f"{movie.get('title') or 'Unknown'}{f' ({year})' if year else ''}"
-                    gid = self._collect(movie.get("telegram", []), label, "movie", gid)
-
-                async for show in storage["tv"].find({}):
-                    if self._cancel:
-                        break
-                    s["scanned"] += 1
-                    title = show.get("title") or "Unknown"
-                    for season in show.get("seasons", []):
-                        for ep in season.get("episodes", []):
-                            label = f"{title} S{season.get('season_number', 0):02d}E{ep.get('episode_number', 0):02d}"
-                            gid = self._collect(ep.get("telegram", []), label, "tv", gid)
+            shards = [
+                (i, db.dbs[f"storage_{i}"])
+                for i in range(1, db.current_db_index + 1)
+                if db.dbs.get(f"storage_{i}") is not None
+            ]
+            results = await asyncio.gather(
+                *(self._scan_shard(storage) for _, storage in shards), return_exceptions=True
+            )
+            failed = [(i, r) for (i, _), r in zip(shards, results) if isinstance(r, Exception)]
+            for i, err in failed:
+                LOGGER.error(f"[Duplicates] storage_{i} scan failed: {err}")
+            if failed and len(failed) == len(shards):
+                raise failed[0][1]
 
             s["status"] = "cancelled" if self._cancel else "completed"
             s["finished_at"] = _now()
@@ -1014,7 +1636,310 @@ class DuplicateManager:
             s["purge_finished_at"] = _now()
 
 
+#----- Incremental channel sync: replays each channel's update stream (new, edited and deleted
+#----- messages since the stored pts) instead of sweeping id ranges, so catching up after
+#----- downtime touches only what changed. Runs on demand or every `channel_sync_interval` minutes.
+class ChannelSyncManager:
+    def __init__(self) -> None:
+        self._db = None
+        self._task: Optional[asyncio.Task] = None
+        self._schedule_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._last_run = 0.0
+        self.state: Dict[str, Any] = self._blank_state()
+
+    @staticmethod
+    def _blank_state() -> Dict[str, Any]:
+        return {
+            "status": "idle",
+            "trigger": "manual",
+            "channels": [],
+            "current_channel": None,
+            "synced": 0,
+            "counters": {**ScanManager._blank_counters(), "new": 0, "edited": 0, "deleted": 0, "purged": 0},
+            "catch_up": [],
+            "started_at": 0.0,
+            "finished_at": 0.0,
+            "error": None,
+        }
+
+    def bind_db(self, db) -> None:
+        self._db = db
+
+    def get_status(self) -> Dict[str, Any]:
+        s = self.state
+        elapsed = 0.0
+        if s["started_at"]:
+            end = s["finished_at"] or _now()
+            elapsed = max(0.0, end - s["started_at"])
+        interval = SettingsManager.current().channel_sync_interval
+        return {
+            "status": s["status"],
+            "is_running": s["status"] == "running",
+            "trigger": s["trigger"],
+            "channels": list(s["channels"]),
+            "current_channel": s["current_channel"],
+            "synced": s["synced"],
+            "counters": dict(s["counters"]),
+            "catch_up": list(s["catch_up"]),
+            "interval_minutes": interval,
+            "last_run_at": self._last_run,
+            "next_run_at": (self._last_run + interval * 60) if interval and self._last_run else 0.0,
+            "elapsed": _fmt_elapsed(elapsed),
+            "elapsed_seconds": int(elapsed),
+            "error": s["error"],
+        }
+
+    #----- ── Baselines (tracking.channel_sync: {_id: channel, pts, synced_at, last}) ──
+    async def get_baseline(self, ch_key: str) -> Optional[dict]:
+        return await self._db.dbs["tracking"][_SYNC_COLLECTION].find_one({"_id": str(ch_key)})
+
+    async def set_baseline(self, ch_key: str, pts: Optional[int]) -> None:
+        if self._db is None or not pts:
+            return
+        try:
+            await self._db.dbs["tracking"][_SYNC_COLLECTION].update_one(
+                {"_id": str(ch_key)}, {"$max": {"pts": int(pts)}}, upsert=True
+            )
+        except Exception as e:
+            LOGGER.error(f"[ChannelSync] Could not store baseline for {ch_key}: {e}")
+
+    #----- ── Control ───────────────────────────────────────────────────────────────
+    async def start(self, client, channels: Optional[List[str]] = None, trigger: str = "manual") -> Dict[str, Any]:
+        async with self._lock:
+            if self.state["status"] == "running":
+                return {"ok": False, "message": "A channel sync is already running."}
+            if scan_manager.state["status"] == "running":
+                return {"ok": False, "message": "A scan is running — sync after it finishes."}
+            channels = [str(c).strip() for c in (channels or SettingsManager.current().auth_channels) if str(c).strip()]
+            if not channels:
+                return {"ok": False, "message": "No channels to sync."}
+            self.state = self._blank_state()
+            self.state["status"] = "running"
+            self.state["trigger"] = trigger
+            self.state["channels"] = channels
+            self.state["started_at"] = _now()
+            self._task = asyncio.create_task(self._run(client, channels))
+            return {"ok": True, "message": "Channel sync started.", "status": self.get_status()}
+
+    #----- Periodic runner; the first tick after startup doubles as the downtime catch-up
+    def schedule(self, client) -> None:
+        if self._schedule_task is None or self._schedule_task.done():
+            self._schedule_task = asyncio.create_task(self._schedule_loop(client))
+
+    async def _schedule_loop(self, client) -> None:
+        while True:
+            await asyncio.sleep(SYNC_CHECK_EVERY)
+            interval = SettingsManager.current().channel_sync_interval
+            if not interval or _now() - self._last_run < interval * 60:
+                continue
+            if self.state["status"] == "running" or scan_manager.state["status"] == "running":
+                continue
+            try:
+                await self.start(client, trigger="schedule")
+            except Exception as e:
+                LOGGER.error(f"[ChannelSync] Scheduled sync failed to start: {e}")
+
+    async def _run(self, client, channels: List[str]) -> None:
+        s = self.state
+        try:
+            for ch in channels:
+                s["current_channel"] = ch
+                try:
+                    int(ch)
+                except ValueError:
+                    LOGGER.warning(f"[ChannelSync] invalid channel id: {ch}")
+                    continue
+                try:
+                    await self._sync_channel(client, ch)
+                    s["synced"] += 1
+                except Exception as e:
+                    s["counters"]["errors"] += 1
+                    LOGGER.error(f"[ChannelSync] Sync failed for {ch}: {e}")
+
+            #----- Channels whose gap can't be replayed are swept once from the scanner's cursor
+            if s["catch_up"] and scan_manager.state["status"] != "running":
+                result = await scan_manager.start(client, list(s["catch_up"]), mode="scan")
+                LOGGER.info(f"[ChannelSync] Catch-up scan for {len(s['catch_up'])} channel(s): {result.get('message')}")
+
+            s["status"] = "completed"
+            c = s["counters"]
+            LOGGER.info(
+                f"[ChannelSync] Synced {s['synced']}/{len(channels)} channel(s): "
+                f"{c['new']} new, {c['edited']} edited, {c['deleted']} deleted, {c['indexed']} indexed"
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            s["status"] = "error"
+            s["error"] = str(e)
+            LOGGER.error(f"[ChannelSync] Unexpected error: {e}")
+        finally:
+            s["current_channel"] = None
+            s["finished_at"] = _now()
+            self._last_run = _now()
+
+    #----- ── One channel ───────────────────────────────────────────────────────────
+    async def _sync_channel(self, client, ch_key: str) -> None:
+        s = self.state
+        counters = s["counters"]
+        chat_id = int(ch_key)
+
+        doc = await self.get_baseline(ch_key)
+        if not doc or not doc.get("pts"):
+            await self.set_baseline(ch_key, await channel_pts(client, chat_id))
+            if ch_key in scan_manager.state["cursors"]:
+                s["catch_up"].append(ch_key)
+            LOGGER.info(f"[ChannelSync] Recorded a sync baseline for {chat_id}")
+            return
+
+        channel = await _input_channel(client, chat_id)
+        pts = int(doc["pts"])
+        new_ids, edited_ids, deleted_ids = set(), set(), set()
+        while True:
+            diff = await _channel_difference(client, channel, pts, SYNC_DIFF_LIMIT)
+            if isinstance(diff, raw.types.updates.ChannelDifferenceEmpty):
+                pts = diff.pts
+                break
+            if isinstance(diff, raw.types.updates.ChannelDifferenceTooLong):
+                #----- Too far behind to replay event by event: re-baseline and sweep from the cursor
+                pts = getattr(diff.dialog, "pts", None) or await channel_pts(client, chat_id) or pts
+                s["catch_up"].append(ch_key)
+                LOGGER.warning(f"[ChannelSync] Update gap too long for {chat_id}; queued a catch-up scan")
+                break
+            for m in diff.new_messages:
+                if isinstance(m, raw.types.Message):
+                    new_ids.add(m.id)
+            for u in diff.other_updates:
+                if isinstance(u, raw.types.UpdateNewChannelMessage) and isinstance(u.message, raw.types.Message):
+                    new_ids.add(u.message.id)
+                elif isinstance(u, raw.types.UpdateEditChannelMessage) and isinstance(u.message, raw.types.Message):
+                    edited_ids.add(u.message.id)
+                elif isinstance(u, raw.types.UpdateDeleteChannelMessages):
+                    deleted_ids.update(u.messages)
+            pts = diff.pts
+            if diff.final:
+                break
+
+        new_ids -= deleted_ids
+        edited_ids -= deleted_ids | new_ids
+        counters["new"] += len(new_ids)
+        counters["edited"] += len(edited_ids)
+        counters["deleted"] += len(deleted_ids)
+
+        if deleted_ids:
+            await self._apply_deletes(chat_id, sorted(deleted_ids))
+        if new_ids:
+            await self._apply_new(client, chat_id, sorted(new_ids))
+        if edited_ids:
+            await self._apply_edits(client, chat_id, sorted(edited_ids))
+
+        await self._db.dbs["tracking"][_SYNC_COLLECTION].update_one(
+            {"_id": ch_key},
+            {"$set": {
+                "pts": pts,
+                "synced_at": _now(),
+                "last": {"new": len(new_ids), "edited": len(edited_ids), "deleted": len(deleted_ids)},
+            }},
+            upsert=True,
+        )
+
+        #----- Everything up to the newest synced id is covered; move the scan cursor past it
+        if new_ids and ch_key not in scan_manager.state["pending"]:
+            cursors = scan_manager.state["cursors"]
+            if ch_key in cursors and cursors[ch_key] <= max(new_ids):
+                cursors[ch_key] = max(new_ids) + 1
+                await scan_manager._persist()
+
+    async def _fetch(self, client, chat_id: int, ids: List[int]) -> list:
+        found = []
+        for i in range(0, len(ids), SCAN_BATCH_SIZE):
+            batch = ids[i:i + SCAN_BATCH_SIZE]
+            try:
+                messages = await client.get_messages(chat_id, batch)
+            except FloodWait as e:
+                LOGGER.info(f"[ChannelSync] FloodWait {e.value}s — sleeping…")
+                await asyncio.sleep(e.value)
+                messages = await client.get_messages(chat_id, batch)
+            if not isinstance(messages, list):
+                messages = [messages]
+            found += [m for m in messages if m is not None and not m.empty]
+        return found
+
+    async def _apply_deletes(self, chat_id: int, ids: List[int]) -> None:
+        counters = self.state["counters"]
+        channel_int = int(str(chat_id).replace("-100", ""))
+        try:
+            result = await self._db.dbs["tracking"]["subtitles"].delete_many(
+                {"chat_id": channel_int, "msg_id": {"$in": ids}}
+            )
+            counters["purged"] += result.deleted_count
+        except Exception as e:
+            LOGGER.warning(f"[ChannelSync] Subtitle purge failed for {chat_id}: {e}")
+
+        #----- Only ids the stream index knows about need the (expensive) per-part removal
+        try:
+            indexed = await self._db.indexed_msg_ids(channel_int, ids[0], ids[-1])
+        except Exception:
+            indexed = None
+        targets = [i for i in ids if i in indexed] if indexed is not None else ids
+        sem = asyncio.Semaphore(SCAN_PROCESS_CONCURRENCY)
+
+        async def _drop(msg_id):
+            async with sem:
+                try:
+                    if await self._db.remove_media_part(channel_int, msg_id):
+                        counters["purged"] += 1
+                except Exception as e:
+                    counters["errors"] += 1
+                    LOGGER.error(f"[ChannelSync] Failed to purge deleted message {msg_id}: {e}")
+
+        await asyncio.gather(*(_drop(i) for i in targets))
+
+    async def _apply_new(self, client, chat_id: int, ids: List[int]) -> None:
+        counters = self.state["counters"]
+        messages = await self._fetch(client, chat_id, ids)
+        counters["total_found"] += len(messages)
+        indexed = await scan_manager._prefetch_indexed(chat_id, ids[0], ids[-1])
+        sem = asyncio.Semaphore(SCAN_PROCESS_CONCURRENCY)
+
+        async def _worker(msg):
+            async with sem:
+                await scan_manager._process_message(client, msg, chat_id, indexed, counters)
+                counters["processed"] += 1
+
+        await asyncio.gather(*(_worker(m) for m in messages))
+
+    #----- Same rule as the live edit handler: only a caption override id re-indexes a file
+    async def _apply_edits(self, client, chat_id: int, ids: List[int]) -> None:
+        counters = self.state["counters"]
+        channel_int = int(str(chat_id).replace("-100", ""))
+        messages = await self._fetch(client, chat_id, ids)
+        sem = asyncio.Semaphore(SCAN_PROCESS_CONCURRENCY)
+
+        async def _worker(msg):
+            override_id = extract_default_id(msg.caption or "")
+            if not override_id:
+                return
+            async with sem:
+                try:
+                    existing = await self._db.get_media_ids_by_part(channel_int, msg.id)
+                    if existing and override_matches_indexed(override_id, existing[0], existing[1]):
+                        return
+                    if existing:
+                        await self._db.remove_media_part(channel_int, msg.id)
+                except Exception as e:
+                    counters["errors"] += 1
+                    LOGGER.error(f"[ChannelSync] Could not re-index edited message {msg.id}: {e}")
+                    return
+                await scan_manager._process_message(client, msg, chat_id, None, counters)
+                counters["processed"] += 1
+
+        await asyncio.gather(*(_worker(m) for m in messages))
+
+
 #----- ── Singletons ──────────────────────────────────────────────────────────────
 scan_manager = ScanManager()
 dbcheck_manager = DbCheckManager()
 duplicate_manager = DuplicateManager()
+channel_sync_manager = ChannelSyncManager()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hashlib
 import secrets
 from typing import Any, Dict, List
 
@@ -22,6 +23,8 @@ _DEFAULTS: Dict[str, Any] = {
     "admin_username": "admin",
     "admin_password": "admin",
     "session_secret": "",
+    "stream_id_key": "",
+    "stream_id_previous_keys": [],
     "subscription": False,
     "subscription_group_id": 0,
     "approver_ids": [],
@@ -53,6 +56,29 @@ _DEFAULTS: Dict[str, Any] = {
     "fanart_shuffle": False,
     "fanart_shuffle_interval": 5,
     "fanart_low_res_poster": True,
+    "episode_collection": False,
+    "storage_quota_mb": 512,
+    "tracking_max_pool_size": 100,
+    "tracking_min_pool_size": 0,
+    "storage_max_pool_size": 100,
+    "storage_min_pool_size": 0,
+    "db_wait_queue_timeout_ms": 0,
+    "db_compressors": "",
+    "db_retry_writes": True,
+    "storage_secondary_reads": False,
+    "loop_callback_timing": False,
+    "signed_stream_ids": False,
+    "require_signed_stream_ids": False,
+    "ingest_workers": 4,
+    "channel_sync_interval": 0,
+}
+
+#----- Replaced stream id keys still accepted when verifying ids already in the library
+_STREAM_ID_KEYS_KEPT = 8
+
+_DB_POOL_KEYS = {
+    "tracking_max_pool_size", "tracking_min_pool_size", "storage_max_pool_size", "storage_min_pool_size",
+    "db_wait_queue_timeout_ms", "db_compressors", "db_retry_writes", "storage_secondary_reads",
 }
 
 
@@ -71,6 +97,7 @@ def _seed_from_env() -> Dict[str, Any]:
         "admin_username":               Telegram.ADMIN_USERNAME,
         "admin_password":               hash_password(Telegram.ADMIN_PASSWORD),
         "session_secret":               secrets.token_hex(32),
+        "stream_id_key":                secrets.token_hex(32),
         "subscription":                 Telegram.SUBSCRIPTION,
         "subscription_group_id":        Telegram.SUBSCRIPTION_GROUP_ID,
         "approver_ids":                 list(Telegram.APPROVER_IDS),
@@ -121,6 +148,30 @@ class Settings:
     def global_search(self) -> bool:
         return bool(self._d.get("global_search", False))
 
+    @property
+    def episode_collection(self) -> bool:
+        return bool(self._d.get("episode_collection", False))
+
+    @property
+    def db_retry_writes(self) -> bool:
+        return bool(self._d.get("db_retry_writes", True))
+
+    @property
+    def storage_secondary_reads(self) -> bool:
+        return bool(self._d.get("storage_secondary_reads", False))
+
+    @property
+    def loop_callback_timing(self) -> bool:
+        return bool(self._d.get("loop_callback_timing", False))
+
+    @property
+    def signed_stream_ids(self) -> bool:
+        return bool(self._d.get("signed_stream_ids", False))
+
+    @property
+    def require_signed_stream_ids(self) -> bool:
+        return bool(self._d.get("require_signed_stream_ids", False))
+
     @property
     def global_search_channels(self):
         return list(self._d.get("global_search_channels") or [])
@@ -189,6 +240,14 @@ class Settings:
     def session_secret(self) -> str:
         return str(self._d.get("session_secret") or "")
 
+    @property
+    def stream_id_key(self) -> str:
+        return str(self._d.get("stream_id_key") or "")
+
+    @property
+    def stream_id_previous_keys(self) -> List[str]:
+        return [str(k) for k in (self._d.get("stream_id_previous_keys") or []) if k]
+
     @property
     def http_proxy_url(self) -> str:
         return str(self._d.get("http_proxy_url") or "")
@@ -257,6 +316,48 @@ class Settings:
         except (ValueError, TypeError):
             return 5
 
+    @property
+    def storage_quota_mb(self) -> int:
+        try:
+            return max(1, int(self._d.get("storage_quota_mb", 512)))
+        except (ValueError, TypeError):
+            return 512
+
+    def _int_setting(self, key: str, low: int, high: int) -> int:
+        try:
+            return max(low, min(high, int(self._d.get(key, _DEFAULTS[key]))))
+        except (ValueError, TypeError):
+            return _DEFAULTS[key]
+
+    @property
+    def tracking_max_pool_size(self) -> int:
+        return self._int_setting("tracking_max_pool_size", 1, 1000)
+
+    @property
+    def tracking_min_pool_size(self) -> int:
+        return self._int_setting("tracking_min_pool_size", 0, 1000)
+
+    @property
+    def storage_max_pool_size(self) -> int:
+        return self._int_setting("storage_max_pool_size", 1, 1000)
+
+    @property
+    def storage_min_pool_size(self) -> int:
+        return self._int_setting("storage_min_pool_size", 0, 1000)
+
+    @property
+    def db_wait_queue_timeout_ms(self) -> int:
+        return self._int_setting("db_wait_queue_timeout_ms", 0, 600000)
+
+    @property
+    def ingest_workers(self) -> int:
+        return self._int_setting("ingest_workers", 1, 32)
+
+    #----- Minutes between incremental channel syncs (0 = manual only)
+    @property
+    def channel_sync_interval(self) -> int:
+        return self._int_setting("channel_sync_interval", 0, 1440)
+
     #----- Lists
     @property
     def auth_channels(self) -> List[str]:
@@ -274,6 +375,17 @@ class Settings:
     def extra_databases(self) -> List[str]:
         return list(self._d.get("extra_databases") or [])
 
+    #----- Wire compressors, in preference order; unknown names are dropped
+    @property
+    def db_compressors(self) -> List[str]:
+        raw = self._d.get("db_compressors") or ""
+        names = raw if isinstance(raw, list) else str(raw).split(",")
+        picked = []
+        for name in (str(n).strip().lower() for n in names):
+            if name in ("zstd", "snappy", "zlib") and name not in picked:
+                picked.append(name)
+        return picked
+
     #----- Serialisation
     def to_dict(self) -> Dict[str, Any]:
         return dict(self._d)
@@ -304,6 +416,15 @@ class SettingsManager:
             cls._current = Settings(data)
             LOGGER.info("SettingsManager: generated and stored a new persistent session secret.")
 
+        #----- Stream ids get their own key so rotating the session secret can't orphan signed
+        #----- ids. Older installs signed with a key derived from the secret: keep that exact key.
+        if not cls._current.stream_id_key:
+            data = cls._current.to_dict()
+            data["stream_id_key"] = hashlib.sha256(b"stream-id:" + cls._current.session_secret.encode()).hexdigest()
+            await db.save_settings(data)
+            cls._current = Settings(data)
+            LOGGER.info("SettingsManager: stored a persistent stream id signing key.")
+
         LOGGER.info("SettingsManager: settings loaded successfully.")
 
     #----- Reload settings from DB (call after an external change)
@@ -384,6 +505,14 @@ class SettingsManager:
 
         await cls._sync_channel_titles(merged)
 
+        #----- Stream id key replaced (backup restore): ids signed with the old one must still verify
+        old_key = old.get("stream_id_key")
+        if old_key and merged.get("stream_id_key") != old_key:
+            previous = [old_key] + list(merged.get("stream_id_previous_keys") or []) + list(old.get("stream_id_previous_keys") or [])
+            merged["stream_id_previous_keys"] = list(dict.fromkeys(
+                k for k in previous if k and k != merged.get("stream_id_key")
+            ))[:_STREAM_ID_KEYS_KEPT]
+
         #----- Phase 1: validate/apply changes that can abort the save
         old_extra = old.get("extra_databases") or []
         new_extra = merged.get("extra_databases") or []
@@ -461,4 +590,65 @@ class SettingsManager:
         if old.get("global_search") != new.get("global_search") and "global_search" not in results:
             results["global_search"] = "enabled" if new.get("global_search") else "disabled"
 
+        #----- Signing key or mode changed: cached payloads were verified under the old one
+        if any(old.get(k) != new.get(k) for k in ("stream_id_key", "stream_id_previous_keys", "signed_stream_ids")):
+            from Backend.helper.encrypt import clear_decode_cache
+            results["stream_ids"] = f"decode cache cleared ({clear_decode_cache()} entries)"
+
+        #----- Storage quota changed: re-measure shard fill on the next write
+        if old.get("storage_quota_mb") != new.get("storage_quota_mb"):
+            try:
+                from Backend import db
+                db.reset_shard_fill()
+                results["storage_quota_mb"] = f"{new.get('storage_quota_mb')} MB per storage database"
+            except Exception as exc:
+                LOGGER.error(f"SettingsManager reinit storage_quota_mb: {exc}")
+                results["storage_quota_mb"] = f"error: {exc}"
+
+        #----- Connection pool / read preference settings changed: swap in re-tuned clients
+        if any(old.get(k) != new.get(k) for k in _DB_POOL_KEYS):
+            try:
+                from Backend import db
+                result = await db.apply_pool_settings()
+                rebuilt = ", ".join(result["rebuilt"]) or "no pools"
+                results["db_pools"] = f"rebuilt {rebuilt}; secondary reads {'on' if result['secondary_reads'] else 'off'}"
+            except Exception as exc:
+                LOGGER.error(f"SettingsManager reinit db_pools: {exc}")
+                results["db_pools"] = f"error: {exc}"
+
+        #----- Per-callback loop timing toggled: patch/unpatch the loop's handles in place
+        if bool(old.get("loop_callback_timing")) != bool(new.get("loop_callback_timing")):
+            try:
+                from Backend.helper.loop_monitor import loop_monitor
+                timed = loop_monitor.set_callback_timing(bool(new.get("loop_callback_timing")))
+                results["loop_callback_timing"] = "callback timing on" if timed else "stall sampling only"
+            except Exception as exc:
+                LOGGER.error(f"SettingsManager reinit loop_callback_timing: {exc}")
+                results["loop_callback_timing"] = f"error: {exc}"
+
+        #----- Ingest worker count changed: re-shard the pool once queued files have drained
+        if old.get("ingest_workers") != new.get("ingest_workers"):
+            try:
+                from Backend.helper.ingest_pool import ingest_pool
+                if ingest_pool.running:
+                    workers = await ingest_pool.resize(cls.current().ingest_workers)
+                    results["ingest_workers"] = f"{workers} ingest worker(s) running"
+            except Exception as exc:
+                LOGGER.error(f"SettingsManager reinit ingest_workers: {exc}")
+                results["ingest_workers"] = f"error: {exc}"
+
+        #----- Episode collection toggled: build the mirror on enable, retire it on disable
+        if bool(old.get("episode_collection")) != bool(new.get("episode_collection")):
+            try:
+                from Backend import db
+                if new.get("episode_collection"):
+                    started = db.start_episode_store_migration()
+                    results["episode_collection"] = "migration started" if started else "migration already running"
+                else:
+                    await db.retire_episode_store()
+                    results["episode_collection"] = "disabled — stream lookups read TV documents"
+            except Exception as exc:
+                LOGGER.error(f"SettingsManager reinit episode_collection: {exc}")
+                results["episode_collection"] = f"error: {exc}"
+
         return results
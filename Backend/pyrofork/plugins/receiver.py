@@ -1,5 +1,7 @@
-from asyncio import Lock, Queue, create_task
+import secrets
+from asyncio import Lock, create_task, gather
 from asyncio import sleep as asleep
+from typing import Optional
 
 from pyrogram import Client, filters
 from pyrogram.enums.parse_mode import ParseMode
@@ -11,10 +13,11 @@ from Backend import db
 from Backend.helper.announcer import announce_new_media
 from Backend.helper.auto_catalog import start_single_media_catalog_sync
 from Backend.helper.encrypt import encode_string
+from Backend.helper.ingest_pool import ingest_pool
 from Backend.helper.manual_add import resolve_telegram_message, stamp_caption_with_id
 from Backend.helper.requests_manager import auto_fulfill
-from Backend.helper.metadata import extract_default_id, metadata
-from Backend.helper.pyro import clean_filename, finalize_media_name, get_readable_file_size
+from Backend.helper.metadata import extract_default_id, metadata_batcher, override_matches_indexed, parse_pool
+from Backend.helper.pyro import finalize_media_name, get_readable_file_size
 from Backend.helper.settings_manager import SettingsManager
 from Backend.helper.skip_channel import is_skip_channel, route_to_skip_channel
 from Backend.helper.split_files import parse_split_info
@@ -22,10 +25,12 @@ from Backend.helper.subtitles import ingest_subtitle, is_subtitle_file, remove_s
 from Backend.helper.task_manager import delete_message
 from Backend.logger import LOGGER
 
-file_queue = Queue()
-db_lock = Lock()
 manual_session_lock = Lock()
 
+#----- Journal owner for this boot: jobs owned by an earlier boot are replayed on start
+JOURNAL_OWNER = secrets.token_hex(6)
+JOURNAL_POLL_INTERVAL = 15
+
 
 #----- True when the message carries a streamable video or a split-archive part
 def _is_supported_media(message: Message) -> bool:
@@ -64,40 +69,114 @@ def _finalize_title(title: str, metadata_info: dict) -> str:
     return finalize_media_name(title, bool(metadata_info.get('group_key')))
 
 
-#----- Serialize DB inserts from the queue and trigger catalog sync
-async def process_file():
+#----- Insert one queued file and trigger catalog sync (runs on the title's ingest worker)
+async def process_file(metadata_info: dict, channel: int, msg_id: int, size: str, raw_size: int, title: str):
+    insert_status: dict = {}
+    try:
+        updated_id = await db.insert_media(metadata_info, channel=channel, msg_id=msg_id, size=size, raw_size=raw_size, name=title, status=insert_status)
+    except Exception as e:
+        await db.fail_ingest(channel, msg_id, f"insert failed: {e}")
+        raise
+    if updated_id:
+        LOGGER.info(f"{metadata_info['media_type']} updated with ID: {updated_id}")
+        await db.complete_ingest(channel, msg_id, note="duplicate" if insert_status.get("duplicate_skipped") else "")
+    else:
+        LOGGER.info("Update failed due to validation errors.")
+        await db.fail_ingest(channel, msg_id, "validation failed", permanent=True)
+
+    if updated_id and insert_status.get("duplicate_skipped"):
+        LOGGER.info(f"Duplicate protection: deleting duplicate message {msg_id} from channel {channel}.")
+        create_task(delete_message(int(f"-100{channel}"), msg_id))
+        return updated_id
+
+    if updated_id:
+        start_single_media_catalog_sync(
+            db,
+            tmdb_id=metadata_info.get("tmdb_id"),
+            media_type=metadata_info.get("media_type"),
+        )
+        announce_new_media(metadata_info)
+        create_task(auto_fulfill(
+            tmdb_id=metadata_info.get("tmdb_id"),
+            imdb_id=metadata_info.get("imdb_id"),
+            media_type=metadata_info.get("media_type"),
+        ))
+    return updated_id
+
+
+#----- Hand a resolved file to the ingest pool, keyed by title
+async def enqueue_file(metadata_info: dict, channel: int, msg_id: int, size: str, raw_size: int, title: str):
+    key = ingest_pool.shard_key(metadata_info.get("media_type"), metadata_info.get("tmdb_id"))
+    return await ingest_pool.submit(
+        key,
+        lambda: process_file(metadata_info, channel, msg_id, size, raw_size, title),
+        label=f"{key} {channel}/{msg_id}",
+    )
+
+
+#----- Resolve metadata for a journaled message and queue its insert. Lookups are batched with
+#----- other files of the same release; misses back off in the journal and, once retries run
+#----- out, the file goes to the dead letters / skip channel.
+async def _ingest_message(client: Client, message: Message, override_id=None, season_hint=None) -> Optional[dict]:
+    _, title, msg_id, raw_size, size, channel = _extract_fields(message)
+    metadata_info = await metadata_batcher.resolve(await parse_pool.clean(title), int(channel), msg_id, override_id=override_id, season_hint=season_hint)
+    if metadata_info is None:
+        status = await db.fail_ingest(int(channel), msg_id, "metadata lookup failed")
+        if status == "dead":
+            LOGGER.warning(f"Metadata failed for file: {title} (ID: {msg_id}); moved to dead letters.")
+            await route_to_skip_channel(client, message)
+        else:
+            LOGGER.warning(f"Metadata failed for file: {title} (ID: {msg_id}); will retry.")
+        return None
+
+    title = _finalize_title(title, metadata_info)
+    await enqueue_file(metadata_info, int(channel), msg_id, size, raw_size, title)
+    return metadata_info
+
+
+#----- Re-run one journal entry: refetch the message, skip it if it's gone or already indexed
+async def _replay_job(client: Client, job: dict) -> None:
+    chat_id, msg_id = int(job["chat_id"]), int(job["msg_id"])
+    try:
+        message = await client.get_messages(int(f"-100{chat_id}"), msg_id)
+        if not message or message.empty or not _is_supported_media(message):
+            await db.complete_ingest(chat_id, msg_id, note="message gone")
+            return
+
+        override_id = job.get("override_id")
+        existing_ids = await db.get_media_ids_by_part(chat_id, msg_id)
+        if existing_ids:
+            if job.get("kind") != "edit" or override_matches_indexed(override_id, existing_ids[0], existing_ids[1]):
+                await db.complete_ingest(chat_id, msg_id, note="already indexed")
+                return
+            await db.remove_media_part(chat_id, msg_id)
+
+        LOGGER.info(f"[Ingest] Replaying journaled message {msg_id} from channel {chat_id} (attempt {int(job.get('attempts') or 0) + 1}).")
+        await _ingest_message(client, message, override_id, job.get("season_hint"))
+    except FloodWait as e:
+        await db.fail_ingest(chat_id, msg_id, f"FloodWait {e.value}s")
+        await asleep(e.value)
+    except Exception as e:
+        LOGGER.error(f"[Ingest] Replay of message {msg_id} from channel {chat_id} failed: {e}")
+        await db.fail_ingest(chat_id, msg_id, str(e))
+
+
+#----- Background replay of the ingest journal (earlier boots, retries, requeued dead letters)
+async def replay_ingest_journal():
+    from Backend.pyrofork.bot import StreamBot
+
     while True:
-        metadata_info, channel, msg_id, size, raw_size, title = await file_queue.get()
-        insert_status: dict = {}
-        async with db_lock:
-            updated_id = await db.insert_media(metadata_info, channel=channel, msg_id=msg_id, size=size, raw_size=raw_size, name=title, status=insert_status)
-            if updated_id:
-                LOGGER.info(f"{metadata_info['media_type']} updated with ID: {updated_id}")
-            else:
-                LOGGER.info("Update failed due to validation errors.")
-
-        if updated_id and insert_status.get("duplicate_skipped"):
-            LOGGER.info(f"Duplicate protection: deleting duplicate message {msg_id} from channel {channel}.")
-            create_task(delete_message(int(f"-100{channel}"), msg_id))
-            file_queue.task_done()
+        await asleep(JOURNAL_POLL_INTERVAL)
+        try:
+            jobs = await db.claim_ingest_jobs(JOURNAL_OWNER)
+        except Exception as e:
+            LOGGER.error(f"[Ingest] Could not read the ingest journal: {e}")
             continue
-
-        if updated_id:
-            start_single_media_catalog_sync(
-                db,
-                tmdb_id=metadata_info.get("tmdb_id"),
-                media_type=metadata_info.get("media_type"),
-            )
-            announce_new_media(metadata_info)
-            create_task(auto_fulfill(
-                tmdb_id=metadata_info.get("tmdb_id"),
-                imdb_id=metadata_info.get("imdb_id"),
-                media_type=metadata_info.get("media_type"),
-            ))
-        file_queue.task_done()
+        #----- Concurrently, so replayed episodes of one release share a metadata batch
+        await gather(*(_replay_job(StreamBot, job) for job in jobs))
 
 
-create_task(process_file())
+create_task(replay_ingest_journal())
 
 
 #----- Build a title-level metadata base from an existing media document
@@ -183,11 +262,16 @@ async def _handle_personal_session(client: Client, message: Message) -> None:
                 "episode_released": "",
             })
 
-        async with db_lock:
-            updated_id = await db.insert_media(
+        #----- Same title shard as channel ingest, so the two paths never interleave on one title
+        insert = await ingest_pool.submit(
+            ingest_pool.shard_key(media_type, tmdb_id),
+            lambda: db.insert_media(
                 metadata_info, channel=p_channel, msg_id=p_msg,
                 size=resolved["size"], name=name, raw_size=int(resolved.get("raw_size") or 0),
-            )
+            ),
+            label=f"manual {media_type}:{tmdb_id} {p_channel}/{p_msg}",
+        )
+        updated_id = await insert
 
         if updated_id:
             where = (f"S{metadata_info['season_number']:02d}E{metadata_info['episode_number']:02d} "
@@ -236,19 +320,17 @@ async def file_receive_handler(client: Client, message: Message):
             return
 
         _, title, msg_id, raw_size, size, channel = _extract_fields(message)
+        override_id = override_id or extract_default_id(message.caption or "")
 
-        metadata_info = await metadata(clean_filename(title), int(channel), msg_id, override_id=override_id or extract_default_id(message.caption or ""), season_hint=season_hint)
-        if metadata_info is None:
-            LOGGER.warning(f"Metadata failed for file: {title} (ID: {msg_id})")
-            await route_to_skip_channel(client, message)
+        #----- Journal first so a restart (or failure) before the insert replays this file
+        if not await db.journal_ingest(
+            int(channel), msg_id, owner=JOURNAL_OWNER, name=title,
+            override_id=override_id, season_hint=season_hint,
+        ):
             return
 
-        title = _finalize_title(title, metadata_info)
-
-        await file_queue.put((metadata_info, int(channel), msg_id, size, raw_size, title))
-
-        if is_real_session:
-            create_task(stamp_caption_with_id(message, metadata_info))
+        #----- Resolve off the handler so the rest of a season pack can join the same metadata batch
+        create_task(_ingest_live(client, message, override_id, season_hint, is_real_session))
     except FloodWait as e:
         LOGGER.info(f"Sleeping for {str(e.value)}s")
         await asleep(e.value)
@@ -259,13 +341,27 @@ async def file_receive_handler(client: Client, message: Message):
         )
 
 
-def _override_matches_indexed(override_id: str, imdb_id, tmdb_id) -> bool:
-    oid = str(override_id).strip().lower()
-    if oid.startswith("tt"):
-        return bool(imdb_id) and oid == str(imdb_id).strip().lower()
-    if oid.isdigit():
-        return tmdb_id not in (None, "") and oid == str(tmdb_id).strip()
-    return False
+#----- Live ingest of one journaled upload (runs as its own task)
+async def _ingest_live(client: Client, message: Message, override_id, season_hint, stamp: bool) -> None:
+    channel = int(str(message.chat.id).replace("-100", ""))
+    try:
+        metadata_info = await _ingest_message(client, message, override_id, season_hint)
+    except RuntimeError as e:
+        LOGGER.warning(f"Ingest deferred for message {message.id}: {e}")
+        await db.fail_ingest(channel, message.id, str(e))
+        return
+    except FloodWait as e:
+        LOGGER.info(f"Sleeping for {str(e.value)}s")
+        await db.fail_ingest(channel, message.id, f"FloodWait {e.value}s")
+        await asleep(e.value)
+        return
+    except Exception as e:
+        LOGGER.error(f"Ingest failed for message {message.id}: {e}")
+        await db.fail_ingest(channel, message.id, str(e))
+        return
+
+    if metadata_info and stamp:
+        create_task(stamp_caption_with_id(message, metadata_info))
 
 
 #----- Re-index an edited channel file only when it carries an override ID
@@ -283,19 +379,18 @@ async def file_edited_handler(client: Client, message: Message):
             return
 
         existing_ids = await db.get_media_ids_by_part(int(channel), msg_id)
-        if existing_ids and _override_matches_indexed(override_id, existing_ids[0], existing_ids[1]):
+        if existing_ids and override_matches_indexed(override_id, existing_ids[0], existing_ids[1]):
             return
 
         LOGGER.info(f"Detected override ID '{override_id}' in edited message {msg_id}")
+        await db.journal_ingest(int(channel), msg_id, owner=JOURNAL_OWNER, kind="edit", name=title, override_id=override_id, force=True)
         await db.remove_media_part(int(channel), msg_id)
 
-        metadata_info = await metadata(clean_filename(title), int(channel), msg_id, override_id=override_id)
-        if metadata_info is None:
-            LOGGER.warning(f"Metadata failed for edited file: {title} (ID: {msg_id})")
-            return
-
-        title = _finalize_title(title, metadata_info)
-        await file_queue.put((metadata_info, int(channel), msg_id, size, raw_size, title))
+        try:
+            await _ingest_message(client, message, override_id)
+        except Exception as e:
+            await db.fail_ingest(int(channel), msg_id, str(e))
+            raise
     except Exception as e:
         LOGGER.error(f"Error handling edited generic file {message.id}: {e}")
 